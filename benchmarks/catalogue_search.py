@@ -0,0 +1,96 @@
+"""Search latency of the gauge catalogue index over a synthetic catalogue.
+
+Builds a catalogue of the requested size with random names, states and
+coordinates across the continental US, checks radius results against a
+brute-force scan, then times name, state and radius searches.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/catalogue_search.py [--gauges 12000] [--queries 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water.catalogue import (  # noqa: E402
+    GaugeIndex,
+    _distance_km,
+    parse_listing,
+)
+
+RIVERS = ["Sacramento", "Colorado", "Snake", "Boulder Creek", "Clear Creek", "Red", "Green", "Platte"]
+STATES = ["CA", "CO", "ID", "OR", "WA", "TX", "NE", "MO", "KS", "WY"]
+
+
+def synthetic_listing(count: int, rng: random.Random) -> bytes:
+    """Return a /gauges listing body with count random gauges."""
+    gauges: List[Dict[str, Any]] = [
+        {
+            "lid": f"{rng.choice(RIVERS)[:3].upper()}{index:05d}",
+            "name": f"{rng.choice(RIVERS)} River near Town {index}",
+            "state": {"abbreviation": rng.choice(STATES)},
+            "latitude": rng.uniform(25, 49),
+            "longitude": rng.uniform(-125, -67),
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"gauges": gauges}).encode()
+
+
+def timed(label: str, queries: int, search: Callable[[], Any]) -> None:
+    """Run search queries times and print the mean latency."""
+    start = time.perf_counter()
+    for _ in range(queries):
+        search()
+    print(f"{label:<22} {(time.perf_counter() - start) / queries * 1000:8.3f} ms/search")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gauges", type=int, default=12000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    body = synthetic_listing(args.gauges, rng)
+    start = time.perf_counter()
+    index = GaugeIndex(parse_listing(body))
+    print(f"parse + index {len(index)} gauges: {(time.perf_counter() - start) * 1000:,.0f} ms")
+
+    for _ in range(20):
+        near = (rng.uniform(30, 45), rng.uniform(-120, -75))
+        radius = rng.choice((25, 100, 400))
+        found = {gauge.lid for gauge, _ in index.search(near=near, radius_km=radius, limit=args.gauges)}
+        expected = {
+            gauge.lid
+            for gauge in index.gauges
+            if _distance_km(near[0], near[1], gauge.latitude, gauge.longitude) <= radius
+        }
+        if found != expected:
+            raise SystemExit(f"radius search mismatch at {near} within {radius} km")
+    print("verified radius search against a brute-force scan")
+
+    timed("name prefix", args.queries, lambda: index.search(query="boul cre"))
+    timed("station id prefix", args.queries, lambda: index.search(query="sac001"))
+    timed("state", args.queries, lambda: index.search(state="CO"))
+    timed("radius 100 km", args.queries, lambda: index.search(near=(39.7, -105.0), radius_km=100))
+    timed(
+        "name + state + radius",
+        args.queries,
+        lambda: index.search(query="river", state="CO", near=(39.7, -105.0), radius_km=300),
+    )
+
+
+if __name__ == "__main__":
+    main()
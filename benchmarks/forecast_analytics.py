@@ -0,0 +1,95 @@
+"""Cost of one forecast analytics pass as the number of stations grows.
+
+Builds synthetic hydrographs (a week of observed 15-minute stage and a
+five-day forecast with a crest) for N stations. When NumPy is installed the
+batched NumPy pass is first checked against the per-station Python
+implementation, then both are timed.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/forecast_analytics.py [--stations 100 500 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water import analytics  # noqa: E402
+from custom_components.nwps_water.analytics import AnalyticsInput  # noqa: E402
+
+STEP = 900.0
+NOW = 1_760_000_000.0
+
+
+def synthetic_station(rng: random.Random) -> AnalyticsInput:
+    """Return one station with a rising observed stage and a forecast crest."""
+    base = rng.uniform(2, 10)
+    rise = rng.uniform(-0.2, 0.4)
+    observed = [NOW - STEP * k for k in range(12, -1, -1)]
+    observed_stage = [
+        base + rise * (t - NOW) / 3600 + rng.gauss(0, 0.02) if rng.random() > 0.05 else math.nan
+        for t in observed
+    ]
+    crest_at = rng.uniform(0.2, 0.8)
+    peak = rng.uniform(0, 12)
+    forecast = [NOW + 6 * 3600 * k for k in range(1, 21)]
+    forecast_stage = [
+        base + peak * math.exp(-(((k / 20) - crest_at) ** 2) / 0.02) for k in range(1, 21)
+    ]
+    minor = base + rng.uniform(1, 6)
+    thresholds = (minor, minor + 2, None if rng.random() < 0.3 else minor + 5)
+    return AnalyticsInput(
+        array("d", forecast),
+        array("f", forecast_stage),
+        array("d", observed),
+        array("f", observed_stage),
+        thresholds,
+    )
+
+
+def timed(compute: Callable[[List[AnalyticsInput]], object], inputs: List[AnalyticsInput]) -> float:
+    """Return the best of five pass times in milliseconds."""
+    best = math.inf
+    for _ in range(5):
+        start = time.perf_counter()
+        compute(inputs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    has_numpy = analytics.np is not None
+
+    if has_numpy:
+        sample = [synthetic_station(rng) for _ in range(200)]
+        if analytics._compute_numpy(sample) != analytics._compute_python(sample):
+            raise SystemExit("NumPy and Python analytics disagree")
+        print("verified NumPy pass against the per-station implementation")
+    else:
+        print("NumPy not installed; timing the per-station implementation only")
+
+    for count in args.stations:
+        inputs = [synthetic_station(rng) for _ in range(count)]
+        line = f"{count:>6} stations: python {timed(analytics._compute_python, inputs):8.2f} ms"
+        if has_numpy:
+            line += f"  numpy {timed(analytics._compute_numpy, inputs):8.2f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Offline load test: N coordinators against a local NWPS stand-in server.
+
+Starts benchmarks/standin_server.py in a child process, so its CPU does not
+distort the measurements. It then drives N NWPSDataCoordinator instances
+through the shared fetch hub for a number of refresh rounds and reports:
+
+- requests sent per round; with --bulk, stations take their status from
+  shared gauge listing queries after a first round of detail fetches
+- refresh latency percentiles, including time spent queued in the hub
+- event-loop lag, sampled by a ticker task
+- peak RSS and Python heap (tracemalloc)
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/loadtest.py --stations 2000 --rounds 3 --latency 0.2 \\
+        --server-error-rate 0.02 --timeout-rate 0.01 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from aiohttp import web  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.nwps_water.bulk import get_bulk_status  # noqa: E402
+from custom_components.nwps_water.const import (  # noqa: E402
+    CONF_BULK_STATUS,
+    CONF_STATION,
+    CONF_TIMESERIES,
+)
+from custom_components.nwps_water.coordinator import NWPSDataCoordinator  # noqa: E402
+from custom_components.nwps_water.hub import get_hub  # noqa: E402
+from standin_server import StandInServer, add_arguments, config_from_args  # noqa: E402
+
+
+class LoadTestEntry:
+    """Minimal stand-in for the ConfigEntry fields the coordinator reads."""
+
+    def __init__(self, station_id: str, options: Dict[str, Any]) -> None:
+        """Initialize the entry."""
+        self.entry_id = f"loadtest_{station_id}"
+        self.data = {CONF_STATION: station_id}
+        self.options = options
+        self._on_unload: List[Callable[[], None]] = []
+
+    def async_on_unload(self, func: Callable[[], None]) -> None:
+        """Record an unload callback."""
+        self._on_unload.append(func)
+
+
+def _serve(args: argparse.Namespace, port_queue: multiprocessing.Queue) -> None:
+    """Child process entry point running the stand-in server."""
+
+    async def serve() -> None:
+        runner = web.AppRunner(StandInServer(config_from_args(args)).build_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port_queue.put(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile of values."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _lag_monitor(samples: List[float], interval: float, stop: asyncio.Event) -> None:
+    """Record how late the loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def run(args: argparse.Namespace, base_url: str) -> None:
+    """Drive the coordinators and print a report."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = get_hub(
+            hass,
+            max_concurrent=args.concurrency,
+            base_url=base_url,
+            request_timeout=args.request_timeout,
+            # Rounds run back to back; without this they would be cache hits
+            cache_ttl=args.cache_ttl,
+        )
+        # Rounds run back to back; listing responses must not carry over either
+        get_bulk_status(hass).max_age = 0
+        options: Dict[str, Any] = {CONF_TIMESERIES: args.timeseries, CONF_BULK_STATUS: args.bulk}
+        coordinators = [
+            NWPSDataCoordinator(hass, station_id, LoadTestEntry(station_id, options))
+            for station_id in (f"SYN{index:05d}" for index in range(args.stations))
+        ]
+
+        latencies: List[float] = []
+        failures = 0
+        peak_queue = 0
+
+        async def timed_refresh(coordinator: NWPSDataCoordinator) -> None:
+            nonlocal failures, peak_queue
+            if args.spread:
+                await asyncio.sleep(hub.phase_fraction(coordinator.station_id) * args.spread)
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            latencies.append(time.perf_counter() - start)
+            peak_queue = max(peak_queue, hub.queue_depth)
+            if not coordinator.last_update_success:
+                failures += 1
+
+        lag: List[float] = []
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(_lag_monitor(lag, 0.01, stop))
+        tracemalloc.start()
+        wall = time.perf_counter()
+        for round_number in range(1, args.rounds + 1):
+            round_start = time.perf_counter()
+            requests = hub.requests
+            await asyncio.gather(*(timed_refresh(c) for c in coordinators))
+            print(
+                f"round {round_number}: {time.perf_counter() - round_start:.2f}s, "
+                f"{hub.requests - requests} requests"
+            )
+        wall = time.perf_counter() - wall
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stop.set()
+        await monitor
+
+        refreshes = len(latencies)
+        print(f"stations:           {args.stations}")
+        print(f"refreshes:          {refreshes} ({failures} failed) in {wall:.2f}s "
+              f"= {refreshes / wall:,.0f}/s")
+        print(f"server requests:    coalesced {hub.coalesced}, cache hits {hub.cache_hits}, "
+              f"peak queue {peak_queue}")
+        print("refresh latency:    " + "  ".join(
+            f"p{pct}={percentile(latencies, pct) * 1000:,.0f}ms" for pct in (50, 90, 99)
+        ) + f"  max={max(latencies) * 1000:,.0f}ms")
+        print("event-loop lag:     " + "  ".join(
+            f"p{pct}={percentile(lag, pct) * 1000:,.1f}ms" for pct in (50, 99)
+        ) + f"  max={max(lag, default=0) * 1000:,.1f}ms  mean={statistics.fmean(lag or [0]) * 1000:,.1f}ms")
+        print(f"peak memory:        rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MiB"
+              f"  python heap={heap_peak / 2**20:,.1f} MiB")
+
+        await hass.async_stop(force=True)
+
+
+def main() -> None:
+    """Parse arguments, start the stand-in server and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8, help="hub max_concurrent_requests")
+    parser.add_argument("--request-timeout", type=float, default=5.0)
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0.0,
+        help="hub response cache TTL in seconds (0 = disabled)",
+    )
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=0.0,
+        help="start each refresh at its hub phase within this many seconds (0 = all at once)",
+    )
+    parser.add_argument("--timeseries", action="store_true", help="also fetch /stageflow")
+    parser.add_argument(
+        "--bulk", action="store_true", help="refresh status through shared gauge listing queries"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(args, port_queue), daemon=True)
+    server.start()
+    try:
+        port = port_queue.get(timeout=30)
+        asyncio.run(run(args, f"http://127.0.0.1:{port}/nwps/v1/gauges"))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
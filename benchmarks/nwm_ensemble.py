@@ -0,0 +1,106 @@
+"""Cost and footprint of National Water Model ensemble ingestion.
+
+Builds synthetic medium- and long-range /streamflow payloads (several
+members, hourly and 6-hourly points), then per range reports the payload
+size, the bytes held in arrays afterwards and the time to decode, copy and
+summarise one issuance. When NumPy is installed the vectorised percentiles
+are first checked against the pure Python fallback. Re-ingesting the same
+issuance is timed too, as that is what most polls see.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/nwm_ensemble.py [--iterations 50]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water import nwm  # noqa: E402
+from custom_components.nwps_water.const import NWM_PERCENTILES  # noqa: E402
+
+ISSUED = datetime(2025, 3, 1, 6, tzinfo=timezone.utc)
+
+
+def synthetic_range(rng: random.Random, members: int, points: int, step_hours: int) -> Dict[str, Any]:
+    """Return a range block with a flood wave whose timing differs per member."""
+    block: Dict[str, Any] = {}
+    for member in range(1, members + 1):
+        crest = rng.uniform(0.3, 0.7) * points
+        peak = rng.uniform(500, 5000)
+        block[f"member{member}"] = {
+            "referenceTime": ISSUED.isoformat().replace("+00:00", "Z"),
+            "units": "ft³/s",
+            "data": [
+                {
+                    "validTime": (ISSUED + timedelta(hours=step_hours * (k + 1)))
+                    .isoformat()
+                    .replace("+00:00", "Z"),
+                    "flow": round(200 + peak * math.exp(-(((k - crest) / (points / 8)) ** 2)), 2),
+                }
+                for k in range(points)
+            ],
+        }
+    return block
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    payload = {
+        "mediumRange": synthetic_range(rng, 6, 204, 1),
+        "longRange": synthetic_range(rng, 4, 120, 6),
+    }
+    body = json.dumps(payload).encode()
+    print(f"payload: {len(body):,} bytes")
+
+    for key in ("mediumRange", "longRange"):
+        forecast = nwm.build_forecast(payload, key)
+        if nwm.np is not None:
+            fast = nwm._percentiles_numpy(forecast, NWM_PERCENTILES)
+            slow = nwm._percentiles_python(forecast, NWM_PERCENTILES)
+            for row_fast, row_slow in zip(fast, slow):
+                if any(abs(a - b) > 1e-3 * max(1.0, abs(b)) for a, b in zip(row_fast, row_slow)):
+                    raise SystemExit(f"NumPy and Python percentiles disagree for {key}")
+        held = len(forecast.times) * forecast.times.itemsize + len(forecast.values) * forecast.values.itemsize
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            nwm._decode_range(body, key, None)
+        new_issue = (time.perf_counter() - start) / args.iterations * 1000
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            if nwm._decode_range(body, key, forecast.reference_time) is not None:
+                raise SystemExit("unchanged issuance was rebuilt")
+        same_issue = (time.perf_counter() - start) / args.iterations * 1000
+
+        summary = nwm.summarize(forecast)
+        print(
+            f"{key:<12} {forecast.members} members x {len(forecast.times)} points: "
+            f"{held:,} bytes held, new issuance {new_issue:6.2f} ms, "
+            f"same issuance {same_issue:6.2f} ms, median peak {summary.peak} cfs"
+        )
+    if nwm.np is not None:
+        print("verified NumPy percentiles against the Python fallback")
+    else:
+        print("NumPy not installed; timings use the Python fallback")
+
+
+if __name__ == "__main__":
+    main()
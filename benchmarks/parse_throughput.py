@@ -0,0 +1,170 @@
+"""Parse throughput of the compiled field-spec parser over the fixture corpus.
+
+Before timing, every fixture is parsed and compared field by field with
+fixtures/expected_snapshots.json, so a spec-table change that alters
+output fails loudly. The hand-written parser the table replaced is timed
+alongside it for reference, and decode_station shows the cost including
+JSON decoding. parse_status is the status-only parse that runs on most
+polls, between metadata refreshes.
+
+The parsers are timed in alternating rounds and the median of each is
+reported, so drift in CPU clock speed affects them alike. The two full
+parsers run at about the same speed: the compiled one measures between
+0.9x and 1.1x the hand-written one. Its gain is the single declarative
+table, and parse_status, which runs on most polls, is several times faster
+than either full parse.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/parse_throughput.py [--seconds 0.5] [--rounds 7]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water.models import StationSnapshot  # noqa: E402
+from custom_components.nwps_water.parser import (  # noqa: E402
+    _is_valid_reading,
+    _k_prefix_to_multiplier,
+    _to_float_safe,
+    decode_station,
+    parse_station,
+    parse_status,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def handwritten_parse(station_json: Dict[str, Any]) -> StationSnapshot:
+    """The per-field .get() parser that FIELD_SPECS replaced."""
+    status = station_json.get("status") or {}
+    observed = status.get("observed") or {}
+    forecast = status.get("forecast") or {}
+    obs_primary = _to_float_safe(observed.get("primary"))
+    obs_secondary = _to_float_safe(observed.get("secondary"))
+    fcst_primary = _to_float_safe(forecast.get("primary"))
+    fcst_secondary = _to_float_safe(forecast.get("secondary"))
+    obs_mult = _k_prefix_to_multiplier(observed.get("secondaryUnit"))
+    fcst_mult = _k_prefix_to_multiplier(forecast.get("secondaryUnit"))
+    flood_categories = (station_json.get("flood") or {}).get("categories") or {}
+    images = station_json.get("images") or {}
+    hydrograph = images.get("hydrograph") or {}
+    probability = images.get("probability") or {}
+    weekint = probability.get("weekint") or {}
+    photos = [
+        {
+            "url": (feature.get("properties") or {}).get("image") or feature.get("image"),
+            "caption": (feature.get("properties") or {}).get("caption"),
+            "date": (feature.get("properties") or {}).get("photoDate"),
+        }
+        for feature in images.get("photos") or []
+        if isinstance(feature, dict)
+    ]
+    return StationSnapshot(
+        name=station_json.get("name") or station_json.get("description"),
+        stage=obs_primary if _is_valid_reading(obs_primary) else None,
+        flow=(obs_secondary * obs_mult) if _is_valid_reading(obs_secondary) else None,
+        forecast_stage=fcst_primary if _is_valid_reading(fcst_primary) else None,
+        forecast_flow=(fcst_secondary * fcst_mult) if _is_valid_reading(fcst_secondary) else None,
+        observed_flood_category=observed.get("floodCategory") or station_json.get("ObservedFloodCategory"),
+        forecast_flood_category=forecast.get("floodCategory") or station_json.get("ForecastFloodCategory"),
+        flood_minor_stage=_to_float_safe((flood_categories.get("minor") or {}).get("stage")),
+        flood_moderate_stage=_to_float_safe((flood_categories.get("moderate") or {}).get("stage")),
+        flood_major_stage=_to_float_safe((flood_categories.get("major") or {}).get("stage")),
+        latitude=_to_float_safe(station_json.get("latitude")),
+        longitude=_to_float_safe(station_json.get("longitude")),
+        elevation=_to_float_safe(station_json.get("elevation")),
+        river_mile=_to_float_safe(station_json.get("riverMile")),
+        state=(station_json.get("state") or {}).get("abbreviation"),
+        observed_time=observed.get("validTime"),
+        upstream_lid=station_json.get("upstreamLid"),
+        downstream_lid=station_json.get("downstreamLid"),
+        reach_id=station_json.get("reachId"),
+        hydrograph_image=hydrograph.get("default") or hydrograph.get("floodcat"),
+        floodcat_image=hydrograph.get("floodcat"),
+        probability_stage_week=weekint.get("stage"),
+        probability_flow_week=weekint.get("flow"),
+        short_range_probability_image=probability.get("shortrange"),
+        photos=[photo for photo in photos if photo["url"]] or None,
+    )
+
+
+def load_corpus() -> Dict[str, Dict[str, Any]]:
+    """Return every gauge fixture keyed by file name."""
+    return {
+        path.name: json.loads(path.read_text())
+        for path in sorted(FIXTURES.glob("gauge_*.json"))
+    }
+
+
+def verify(corpus: Dict[str, Dict[str, Any]]) -> None:
+    """Check both parsers against the recorded expected snapshots."""
+    expected = json.loads((FIXTURES / "expected_snapshots.json").read_text())
+    failures: List[str] = []
+    for name, payload in corpus.items():
+        for label, parse in (("compiled", parse_station), ("handwritten", handwritten_parse)):
+            got = parse(payload).as_dict()
+            for field, value in expected[name].items():
+                if got[field] != value:
+                    failures.append(f"{label} {name}: {field}={got[field]!r}, expected {value!r}")
+    if failures:
+        raise SystemExit("Parser output mismatch:\n  " + "\n  ".join(failures))
+    print(f"verified {len(corpus)} fixtures")
+
+
+def throughput(parse: Callable[[Dict[str, Any]], Any], payloads: List[Dict[str, Any]], seconds: float) -> float:
+    """Return payloads parsed per second."""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for payload in payloads:
+            parse(payload)
+        count += len(payloads)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=0.5, help="per parser and round")
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    verify(corpus)
+    payloads = list(corpus.values())
+    bodies = [json.dumps(p).encode() for p in payloads]
+    runs: Dict[str, List[float]] = {
+        "compiled": [],
+        "handwritten": [],
+        "status": [],
+        "decoded": [],
+    }
+    for _ in range(args.rounds):
+        runs["compiled"].append(throughput(parse_station, payloads, args.seconds))
+        runs["handwritten"].append(throughput(handwritten_parse, payloads, args.seconds))
+        runs["status"].append(throughput(parse_status, payloads, args.seconds))
+        # What the coordinator runs per changed payload, JSON decoding included
+        runs["decoded"].append(throughput(decode_station, bodies, args.seconds))
+    compiled, handwritten, status_only, decoded = (
+        statistics.median(runs[name]) for name in ("compiled", "handwritten", "status", "decoded")
+    )
+    print(f"compiled:    {compiled:>12,.0f} payloads/s")
+    print(f"handwritten: {handwritten:>12,.0f} payloads/s")
+    print(f"speedup:     {compiled / handwritten:.2f}x")
+    print(f"status only: {status_only:>12,.0f} payloads/s")
+    print(f"decode+parse:{decoded:>12,.0f} payloads/s")
+
+
+if __name__ == "__main__":
+    main()
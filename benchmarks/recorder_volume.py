@@ -0,0 +1,239 @@
+"""Recorder rows and bytes written per day by the station entities.
+
+Drives the real sensor and binary sensor classes through a simulated day of
+15 minute updates for many stations and models what the recorder writes:
+one `states` row per state write, one `state_attributes` row per distinct
+attribute set (the recorder deduplicates them by content), and 5 minute plus
+hourly statistics rows for every sensor with a state class.
+
+"Before" reproduces the 1.4.0 entities: attribution and flood thresholds
+in every stage and flood entity's attributes, and nothing excluded from
+recording. "After" is the current classes, with their
+_unrecorded_attributes left out. Both keep the same state classes, so
+statistics rows are equal.
+
+Byte counts use rough SQLite row sizes and are meant for comparison only.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/recorder_volume.py [--stations 200]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water.binary_sensor import NWPSBinarySensor  # noqa: E402
+from custom_components.nwps_water.models import StationSnapshot  # noqa: E402
+from custom_components.nwps_water.sensor import NWPSWaterSensor  # noqa: E402
+
+PARAMETERS = (
+    "stage",
+    "flow",
+    "forecast_stage",
+    "forecast_flow",
+    "observed_flood_category",
+    "forecast_flood_category",
+    "flood_minor_stage",
+    "flood_moderate_stage",
+    "flood_major_stage",
+)
+BINARY_SENSORS = (("observed_flood", "Observed Flood Active"), ("forecast_flood", "Forecast Flood Active"))
+LEGACY_STATISTICS = PARAMETERS[:4] + PARAMETERS[6:]
+UPDATES_PER_DAY = 96  # 15 minute polling
+SHORT_TERM_PER_DAY = 288  # 5 minute statistics
+HOURLY_PER_DAY = 24
+
+# Rough per-row sizes: ids, timestamps and index entries
+STATES_ROW = 120
+ATTRIBUTES_ROW = 48
+STATISTICS_ROW = 80
+
+RECORDER_EXCLUDED = frozenset({"attribution", "restored", "supported_features"})
+
+
+class FakeCoordinator:
+    """The parts of NWPSDataCoordinator the entities read."""
+
+    def __init__(self, station_id: str, data: StationSnapshot) -> None:
+        self.station_id = station_id
+        self.data = data
+        self.upstream = ()
+        self.stale = False
+        self.last_update_success = True
+
+    def get_device_name(self) -> str:
+        return f"{self.station_id} River Gauge"
+
+    def staleness_attributes(self) -> Dict[str, Any]:
+        return {}
+
+
+class Station:
+    """A gauge whose stage follows a slow random walk."""
+
+    def __init__(self, rng: random.Random, index: int) -> None:
+        self.rng = rng
+        self.station_id = f"ST{index:03d}"
+        self.minor = round(rng.uniform(8, 20), 1)
+        self.stage = self.minor * rng.uniform(0.3, 0.9)
+        self.forecast = self.stage
+
+    def snapshot(self, tick: int) -> StationSnapshot:
+        """Return the parsed data of one poll."""
+        rate = self.rng.gauss(0, 0.05)
+        self.stage = max(0.5, self.stage + rate)
+        if tick % 24 == 0:  # forecasts are issued every 6 hours
+            self.forecast = self.stage + self.rng.gauss(0, 1)
+        category = "minor" if self.stage >= self.minor else "no_flooding"
+        forecast_category = "minor" if self.forecast >= self.minor else "no_flooding"
+        return StationSnapshot(
+            name=f"{self.station_id} River Gauge",
+            stage=round(self.stage, 2),
+            flow=round(self.stage**2 * 40, 0),
+            forecast_stage=round(self.forecast, 2),
+            forecast_flow=round(self.forecast**2 * 40, 0),
+            observed_flood_category=category,
+            forecast_flood_category=forecast_category,
+            flood_minor_stage=self.minor,
+            flood_moderate_stage=round(self.minor + 3, 1),
+            flood_major_stage=round(self.minor + 6, 1),
+            stage_trend={"rate_of_rise": round(rate * 4, 3), "trend": "rising" if rate > 0 else "falling"},
+            flow_trend={"rate_of_rise": round(rate * 160, 3), "trend": "rising" if rate > 0 else "falling"},
+        )
+
+
+def base_attributes(entity: Any) -> Dict[str, Any]:
+    """Return the attributes Home Assistant adds to every state."""
+    attrs: Dict[str, Any] = {"friendly_name": entity._attr_name}
+    for key in ("state_class", "native_unit_of_measurement", "device_class", "icon"):
+        value = getattr(entity, f"_attr_{key}", None)
+        if value is not None:
+            attrs[key.replace("native_", "")] = str(value)
+    return attrs
+
+
+def legacy_attributes(entity: Any, data: StationSnapshot) -> Dict[str, Any]:
+    """Return the extra attributes the 1.4.0 entities wrote."""
+    attrs = dict(entity.extra_state_attributes)
+    if isinstance(entity, NWPSWaterSensor):
+        attrs["attribution"] = "Data provided by NOAA NWPS"
+        if entity._parameter not in ("stage", "forecast_stage"):
+            return attrs
+    for level in ("minor", "moderate", "major"):
+        value = getattr(data, f"flood_{level}_stage")
+        if value:
+            attrs[f"flood_{level}"] = value
+    return attrs
+
+
+def recorded_attributes(entity: Any, data: StationSnapshot, legacy: bool) -> str:
+    """Return the JSON the recorder stores for the entity's attributes."""
+    attrs = base_attributes(entity)
+    if legacy:
+        attrs.update(legacy_attributes(entity, data))
+        # 1.4.0 put attribution in the extra attributes, which are recorded
+        excluded = RECORDER_EXCLUDED - {"attribution"}
+    else:
+        attrs.update(entity.extra_state_attributes)
+        excluded = RECORDER_EXCLUDED | entity._unrecorded_attributes
+    return json.dumps(
+        {key: value for key, value in attrs.items() if key not in excluded},
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def state_of(entity: Any) -> str:
+    """Return the state string of an entity."""
+    if isinstance(entity, NWPSBinarySensor):
+        return "on" if entity.is_on else "off"
+    return str(entity._attr_native_value)
+
+
+def simulate(stations: int, seed: int, legacy: bool) -> Tuple[int, int, int, int, int]:
+    """Return states, attribute and statistics rows, then states and statistics bytes."""
+    rng = random.Random(seed)
+    gauges = [Station(rng, index) for index in range(stations)]
+    entities: List[Any] = []
+    coordinators: List[FakeCoordinator] = []
+    for gauge in gauges:
+        coordinator = FakeCoordinator(gauge.station_id, gauge.snapshot(0))
+        coordinators.append(coordinator)
+        for parameter in PARAMETERS:
+            entities.append(NWPSWaterSensor(coordinator, gauge.station_id, parameter))
+        for key, name in BINARY_SENSORS:
+            entities.append(NWPSBinarySensor(coordinator, gauge.station_id, key, name))
+
+    writes: List[Any] = []
+    for entity in entities:
+        entity.async_write_ha_state = lambda entity=entity: writes.append(entity)
+
+    seen_attributes = set()
+    states_rows = attribute_rows = states_bytes = attribute_bytes = 0
+    for tick in range(1, UPDATES_PER_DAY + 1):
+        for gauge, coordinator in zip(gauges, coordinators):
+            coordinator.data = gauge.snapshot(tick)
+        for entity in entities:
+            entity._handle_coordinator_update()
+        for entity in writes:
+            states_rows += 1
+            states_bytes += STATES_ROW + len(state_of(entity))
+            attrs = recorded_attributes(entity, entity.coordinator.data, legacy)
+            if attrs not in seen_attributes:
+                seen_attributes.add(attrs)
+                attribute_rows += 1
+                attribute_bytes += ATTRIBUTES_ROW + len(attrs)
+        writes.clear()
+
+    if legacy:
+        with_statistics = len(LEGACY_STATISTICS) * stations
+    else:
+        with_statistics = sum(
+            1 for entity in entities if getattr(entity, "_attr_state_class", None) is not None
+        )
+    statistics_rows = with_statistics * (SHORT_TERM_PER_DAY + HOURLY_PER_DAY)
+    return (
+        states_rows,
+        attribute_rows,
+        statistics_rows,
+        states_bytes + attribute_bytes,
+        statistics_rows * STATISTICS_ROW,
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results: Dict[str, Tuple[int, int, int, int, int]] = {}
+    for label, legacy in (("before", True), ("after", False)):
+        results[label] = simulate(args.stations, args.seed, legacy)
+    before, after = results["before"], results["after"]
+    if before[0] != after[0]:
+        raise SystemExit("state writes differ; only the recorded attributes should change")
+
+    print(f"{args.stations} stations, {len(PARAMETERS)} sensors and {len(BINARY_SENSORS)} binary sensors each, one day")
+    for label, (states, attributes, statistics, state_bytes, statistics_bytes) in results.items():
+        total = states + attributes + statistics
+        print(
+            f"{label:<7} rows: states {states:>7,}  attributes {attributes:>7,}  statistics {statistics:>8,}"
+            f"  total {total:>8,} | bytes: states+attributes {state_bytes:>11,}  statistics {statistics_bytes:>11,}"
+        )
+    saved_rows = 1 - sum(after[:3]) / sum(before[:3])
+    saved_bytes = 1 - (after[3] + after[4]) / (before[3] + before[4])
+    print(f"rows written {saved_rows:.0%} lower, bytes written {saved_bytes:.0%} lower")
+
+
+if __name__ == "__main__":
+    main()
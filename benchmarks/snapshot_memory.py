@@ -0,0 +1,128 @@
+"""Per-station resident memory of parsed NWPS data, before and after snapshots.
+
+"Before" reproduces the retention of the 1.4.0 coordinator: the decoded
+payload kept in `raw` plus a parsed dict that also referenced it via
+`_raw`. "After" keeps only the slotted StationSnapshot.
+
+Run from the repository root (Home Assistant must be importable):
+
+    python benchmarks/snapshot_memory.py [--stations 500]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.nwps_water.parser import (  # noqa: E402
+    _is_valid_reading,
+    _k_prefix_to_multiplier,
+    _to_float_safe,
+    parse_station,
+)
+
+FIXTURE = Path(__file__).parent / "fixtures" / "gauge_coco3.json"
+
+
+def legacy_retained(station_json: Dict[str, Any]) -> Any:
+    """Return what the 1.4.0 coordinator kept alive for one station."""
+    parsed: Dict[str, Any] = {}
+    status = station_json.get("status", {})
+    observed = status.get("observed") or {}
+    forecast = status.get("forecast") or {}
+    obs_primary = _to_float_safe(observed.get("primary"))
+    obs_secondary = _to_float_safe(observed.get("secondary"))
+    fcst_primary = _to_float_safe(forecast.get("primary"))
+    fcst_secondary = _to_float_safe(forecast.get("secondary"))
+    obs_mult = _k_prefix_to_multiplier(observed.get("secondaryUnit"))
+    fcst_mult = _k_prefix_to_multiplier(forecast.get("secondaryUnit"))
+    parsed["stage"] = obs_primary if _is_valid_reading(obs_primary) else None
+    parsed["stage_unit"] = observed.get("primaryUnit")
+    parsed["flow"] = obs_secondary * obs_mult if _is_valid_reading(obs_secondary) else None
+    parsed["flow_unit"] = "cfs"
+    parsed["forecast_stage"] = fcst_primary if _is_valid_reading(fcst_primary) else None
+    parsed["forecast_stage_unit"] = forecast.get("primaryUnit")
+    parsed["forecast_flow"] = fcst_secondary * fcst_mult if _is_valid_reading(fcst_secondary) else None
+    parsed["forecast_flow_unit"] = "cfs"
+    parsed["observed_flood_category"] = observed.get("floodCategory")
+    parsed["forecast_flood_category"] = forecast.get("floodCategory")
+    categories = station_json.get("flood", {}).get("categories", {})
+    parsed["flood_thresholds"] = categories
+    for level in ("minor", "moderate", "major"):
+        parsed[f"flood_{level}_stage"] = _to_float_safe(categories.get(level, {}).get("stage"))
+    for key, source in (
+        ("latitude", "latitude"),
+        ("longitude", "longitude"),
+        ("elevation", "elevation"),
+        ("river_mile", "riverMile"),
+    ):
+        parsed[key] = _to_float_safe(station_json.get(source))
+    images = station_json.get("images", {}) or {}
+    hydrograph = images.get("hydrograph", {}) or {}
+    parsed["hydrograph_image"] = hydrograph.get("default")
+    parsed["floodcat_image"] = hydrograph.get("floodcat")
+    weekint = (images.get("probability", {}) or {}).get("weekint", {}) or {}
+    parsed["probability_stage_week"] = weekint.get("stage")
+    parsed["probability_flow_week"] = weekint.get("flow")
+    parsed["short_range_probability_image"] = images.get("probability", {}).get("shortrange")
+    photos = images.get("photos") or []
+    if photos:
+        parsed["photo_url"] = photos[0]["properties"]["image"]
+        parsed["photo_caption"] = photos[0]["properties"]["caption"]
+    parsed["_device"] = {
+        "station_id": station_json.get("lid"),
+        "name": station_json.get("name"),
+        "latitude": station_json.get("latitude"),
+        "longitude": station_json.get("longitude"),
+        "description": station_json.get("description"),
+        "dataAttribution": station_json.get("dataAttribution"),
+    }
+    parsed["_raw"] = station_json
+    # coordinator.raw, coordinator.data and _cached_data all point at these
+    return (station_json, parsed)
+
+
+def measure(payloads: List[bytes], retain: Callable[[Dict[str, Any]], Any]) -> int:
+    """Return bytes still allocated after retaining one result per payload."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = [retain(json.loads(body)) for body in payloads]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=500)
+    args = parser.parse_args()
+
+    template = json.loads(FIXTURE.read_text())
+    payloads = []
+    for index in range(args.stations):
+        template["lid"] = f"ST{index:04d}"
+        template["status"]["observed"]["primary"] = 5.0 + index / 100
+        payloads.append(json.dumps(template).encode())
+
+    before = measure(payloads, legacy_retained)
+    after = measure(payloads, parse_station)
+    print(f"stations:            {args.stations}")
+    print(f"payload size:        {len(payloads[0]):,} bytes")
+    print(f"before (raw + dict): {before:>12,} bytes  {before / args.stations:>10,.0f} per station")
+    print(f"after (snapshot):    {after:>12,} bytes  {after / args.stations:>10,.0f} per station")
+    print(f"reduction:           {before / max(after, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
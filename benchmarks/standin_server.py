@@ -0,0 +1,238 @@
+"""Local stand-in for the NWPS gauges API, for offline load testing.
+
+Serves /nwps/v1/gauges/{lid} (and /stageflow) for any number of synthetic
+gauges built from fixtures/gauge_coco3.json, or replays recorded payloads
+from a directory of <LID>.json files. The /nwps/v1/gauges listing answers
+bounding box queries over the synthetic gauges SYN00000 and up, which are
+spread over an 8 x 8 degree area. Latency, 404, 5xx and timeouts can be
+injected. ETag / If-None-Match is honoured.
+
+Standalone use, pointing Home Assistant at it via configuration.yaml:
+
+    python benchmarks/standin_server.py --port 8089 --latency 0.2
+    nwps_water:
+      base_url: http://127.0.0.1:8089/nwps/v1/gauges
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aiohttp import web
+
+FIXTURE = Path(__file__).parent / "fixtures" / "gauge_coco3.json"
+LISTING_ROUTE = "/nwps/v1/gauges"
+GAUGE_ROUTE = LISTING_ROUTE + "/{lid}"
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server."""
+
+    latency: float = 0.05
+    jitter: float = 0.02
+    not_found_rate: float = 0.0
+    server_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    # How long a "timed out" request hangs before answering
+    hang: float = 60.0
+    # Seconds between synthetic observation changes; 0 changes every request
+    update_period: float = 900.0
+    replay_dir: Optional[Path] = None
+    seed: Optional[int] = None
+    # Synthetic gauges the listing knows about
+    listing_gauges: int = 5000
+
+
+class StandInServer:
+    """aiohttp application that imitates the NWPS gauge endpoints."""
+
+    def __init__(self, config: StandInConfig) -> None:
+        """Initialize the server."""
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.template = json.loads(FIXTURE.read_text())
+        self.replay: Dict[str, bytes] = {}
+        if config.replay_dir:
+            for path in Path(config.replay_dir).glob("*.json"):
+                self.replay[path.stem.upper()] = path.read_bytes()
+        self.requests = 0
+
+    def build_app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_get(LISTING_ROUTE, self.handle_listing)
+        app.router.add_get(GAUGE_ROUTE, self.handle_gauge)
+        app.router.add_get(GAUGE_ROUTE + "/stageflow", self.handle_stageflow)
+        return app
+
+    async def _inject(self) -> Optional[web.Response]:
+        """Apply latency and return an injected failure, if any."""
+        self.requests += 1
+        config = self.config
+        roll = self.random.random()
+        if roll < config.timeout_rate:
+            await asyncio.sleep(config.hang)
+        await asyncio.sleep(max(0.0, self.random.gauss(config.latency, config.jitter)))
+        roll = self.random.random()
+        if roll < config.not_found_rate:
+            return web.Response(status=404, text='{"code":5,"message":"gauge not found"}')
+        if roll < config.not_found_rate + config.server_error_rate:
+            return web.Response(status=503, text="upstream unavailable")
+        return None
+
+    def _epoch(self) -> int:
+        """Return the current synthetic observation number."""
+        if self.config.update_period <= 0:
+            return self.requests
+        return int(time.time() // self.config.update_period)
+
+    @staticmethod
+    def location(lid: str) -> Tuple[float, float]:
+        """Return a synthetic gauge's stable latitude and longitude."""
+        code = zlib.crc32(lid.encode())
+        return 38 + (code % 8000) / 1000, -124 + (code // 8000 % 8000) / 1000
+
+    def status(self, lid: str, epoch: int) -> Dict[str, Any]:
+        """Return a synthetic gauge's status block for an observation number."""
+        status = json.loads(json.dumps(self.template["status"]))
+        observed = status["observed"]
+        observed["primary"] = round(5 + (hash((lid, epoch)) % 1000) / 100, 2)
+        observed["validTime"] = time.strftime(
+            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch * max(self.config.update_period, 1))
+        )
+        return status
+
+    def gauge_body(self, lid: str) -> bytes:
+        """Return the payload for a gauge."""
+        if lid in self.replay:
+            return self.replay[lid]
+        payload = self.template
+        payload["lid"] = lid
+        payload["name"] = f"Synthetic gauge {lid}"
+        payload["latitude"], payload["longitude"] = self.location(lid)
+        payload["status"] = self.status(lid, self._epoch())
+        return json.dumps(payload).encode()
+
+    def listing_body(self, query: Mapping[str, str]) -> bytes:
+        """Return the listing rows of the synthetic gauges inside a bounding box."""
+        xmin = float(query.get("bbox.xmin", -180))
+        ymin = float(query.get("bbox.ymin", -90))
+        xmax = float(query.get("bbox.xmax", 180))
+        ymax = float(query.get("bbox.ymax", 90))
+        epoch = self._epoch()
+        rows = []
+        for index in range(self.config.listing_gauges):
+            lid = f"SYN{index:05d}"
+            latitude, longitude = self.location(lid)
+            if xmin <= longitude <= xmax and ymin <= latitude <= ymax:
+                rows.append(
+                    {
+                        "lid": lid,
+                        "name": f"Synthetic gauge {lid}",
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "state": {"abbreviation": "OR", "name": "Oregon"},
+                        "status": self.status(lid, epoch),
+                    }
+                )
+        return json.dumps({"gauges": rows}).encode()
+
+    def _respond(self, request: web.Request, body: bytes) -> web.Response:
+        """Return body with an ETag, or 304 if the client already has it."""
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'  # noqa: S324
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def handle_listing(self, request: web.Request) -> web.Response:
+        """Serve /gauges, filtered by bounding box."""
+        if (failure := await self._inject()) is not None:
+            return failure
+        return self._respond(request, self.listing_body(request.query))
+
+    async def handle_gauge(self, request: web.Request) -> web.Response:
+        """Serve /gauges/{lid}."""
+        if (failure := await self._inject()) is not None:
+            return failure
+        return self._respond(request, self.gauge_body(request.match_info["lid"].upper()))
+
+    async def handle_stageflow(self, request: web.Request) -> web.Response:
+        """Serve /gauges/{lid}/stageflow with a day of 15-minute points."""
+        if (failure := await self._inject()) is not None:
+            return failure
+        end = self._epoch() * max(self.config.update_period, 1)
+        points = [
+            {
+                "validTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(end - step * 900)),
+                "primary": round(5 + step / 100, 2),
+                "secondary": round(4 + step / 1000, 3),
+            }
+            for step in range(96, -1, -1)
+        ]
+        body = json.dumps(
+            {
+                "observed": {"primaryUnits": "ft", "secondaryUnits": "kcfs", "data": points},
+                "forecast": {"issuedTime": points[-1]["validTime"], "data": []},
+            }
+        ).encode()
+        return self._respond(request, body)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the stand-in server options to a parser."""
+    parser.add_argument("--latency", type=float, default=0.05, help="mean response latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="latency std deviation (s)")
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang", type=float, default=60.0, help="how long injected timeouts hang (s)")
+    parser.add_argument(
+        "--update-period",
+        type=float,
+        default=900.0,
+        help="seconds between synthetic observation changes (0 = every request)",
+    )
+    parser.add_argument("--replay-dir", type=Path, help="directory of recorded <LID>.json payloads")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--listing-gauges", type=int, default=5000, help="synthetic gauges in the /gauges listing"
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> StandInConfig:
+    """Build a StandInConfig from parsed arguments."""
+    return StandInConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        not_found_rate=args.not_found_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        update_period=args.update_period,
+        replay_dir=args.replay_dir,
+        seed=args.seed,
+        listing_gauges=args.listing_gauges,
+    )
+
+
+def main() -> None:
+    """Run the stand-in server in the foreground."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(StandInServer(config_from_args(args)).build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,103 @@
 from __future__ import annotations
 
 import logging
+
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
 
 # --- MISSING IMPORTS ADDED BELOW ---
-from .const import DOMAIN, CONF_STATION
+from .const import (
+    DOMAIN,
+    CONF_STATION,
+    CONF_STATIONS,
+    CONF_BASE_URL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    NWPS_BASE,
+    RELOAD_OPTIONS,
+    SERVICE_REFRESH_METADATA,
+)
 from .coordinator import NWPSDataCoordinator
+from .group import NWPSStationGroup, entry_coordinators, iter_coordinators
+from .hub import get_hub
+from .regions import get_region_summary
+from .store import async_get_snapshot_store
 # -----------------------------------
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = ["sensor", "binary_sensor"]
+PLATFORMS = ["sensor", "binary_sensor", "image"]
+
+# Stations are configured through the UI; YAML only tunes the shared fetch hub
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+                vol.Optional(CONF_BASE_URL, default=NWPS_BASE): cv.url,
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+REFRESH_METADATA_SCHEMA = vol.Schema(
+    {vol.Optional(CONF_STATION): vol.All(cv.ensure_list, [cv.string])}
+)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
-    """Set up the integration (no YAML)."""
+    """Set up the integration and its shared fetch hub."""
     hass.data.setdefault(DOMAIN, {})
+    conf = config.get(DOMAIN, {})
+    # The hub may already exist if a config flow ran before setup
+    get_hub(hass).async_configure(
+        max_concurrent=conf.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
+        base_url=conf.get(CONF_BASE_URL, NWPS_BASE),
+    )
+
+    async def async_refresh_metadata(call: ServiceCall) -> None:
+        """Refresh thresholds, location and images of some or all stations."""
+        coordinators = {
+            coordinator.station_id: coordinator for coordinator in iter_coordinators(hass)
+        }
+        requested = [station_id.upper() for station_id in call.data.get(CONF_STATION, [])]
+        if unknown := [station_id for station_id in requested if station_id not in coordinators]:
+            raise ServiceValidationError(f"Unknown NWPS station: {', '.join(unknown)}")
+        for station_id in requested or coordinators:
+            await coordinators[station_id].async_refresh_metadata()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH_METADATA, async_refresh_metadata, schema=REFRESH_METADATA_SCHEMA
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a config entry."""
+    if CONF_STATIONS in entry.data:
+        return await async_setup_group_entry(hass, entry)
+
     # station_id needs CONF_STATION imported from .const
     station_id = entry.data.get(CONF_STATION)
     
     # NWPSDataCoordinator needs to be imported from .coordinator
     coordinator = NWPSDataCoordinator(hass, station_id, entry)
-    await coordinator.async_config_entry_first_refresh()
+
+    # Hydrate from the last-good snapshot so startup does not wait on NOAA;
+    # only a station that has never been fetched blocks on its first refresh
+    snapshot_store = await async_get_snapshot_store(hass)
+    restored = coordinator.restore_snapshot(snapshot_store)
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -36,13 +107,72 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Forward setups to the platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {station_id}"
+        )
     
     return True
 
+async def async_setup_group_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a station group entry: one coordinator per station, one timer."""
+    group = NWPSStationGroup(hass, entry)
+    entry.async_on_unload(group.async_shutdown)
+    snapshot_store = await async_get_snapshot_store(hass)
+    restored = []
+    fetch = []
+    for station_id in entry.data[CONF_STATIONS]:
+        coordinator = group.async_add_station(station_id)
+        (restored if coordinator.restore_snapshot(snapshot_store) else fetch).append(coordinator)
+
+    # Stations never fetched before are fetched together. One failing
+    # station does not hold up the rest; it retries on its own schedule.
+    await group.async_refresh(fetch)
+    if not restored and not any(coordinator.last_update_success for coordinator in fetch):
+        raise ConfigEntryNotReady("No station in the group could be fetched from NWPS")
+
+    # Devices of stations taken out of the group
+    device_registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        station_ids = [ident for domain, ident in device.identifiers if domain == DOMAIN]
+        if station_ids and station_ids[0] not in group.coordinators:
+            device_registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+            snapshot_store.async_remove(station_ids[0])
+
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][entry.entry_id] = group
+
+    entry.async_on_unload(entry.add_update_listener(async_update_listener))
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if restored:
+        entry.async_create_background_task(
+            hass, group.async_refresh(restored), f"{DOMAIN} first refresh {entry.title}"
+        )
+
+    return True
+
 async def async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
-    # standard way to apply changes to scan interval or parameters
-    await hass.config_entries.async_reload(entry.entry_id)
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    coordinators = entry_coordinators(hass, entry)
+    if (
+        isinstance(runtime, NWPSStationGroup)
+        and entry.data.get(CONF_STATIONS) != runtime.station_ids
+    ) or any(
+        entry.options.get(key, default) != coordinators[0].options.get(key, default)
+        for key, default in RELOAD_OPTIONS.items()
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        # Regions only the removed stations were in
+        get_region_summary(hass).async_remove_orphans()
+        return
+    # Interval, parameters and the rest are applied in place, keeping the
+    # parsed data and every unaffected entity
+    for coordinator in coordinators:
+        coordinator.async_apply_options(entry.options)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
@@ -51,4 +181,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
         
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the persisted snapshots of a removed station or group."""
+    snapshot_store = await async_get_snapshot_store(hass)
+    for station_id in entry.data.get(CONF_STATIONS) or [entry.data.get(CONF_STATION)]:
+        snapshot_store.async_remove(station_id)
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""Forecast crest, flood onset and rate-of-rise, computed for all stations at once.
+
+Stations whose hydrograph series changed are collected over one polling
+cycle and then processed in a single pass. With NumPy available, every station's
+forecast is concatenated into one array and crests, threshold crossings
+and least-squares slopes are computed with segment reductions, so the cost
+of a pass grows with the number of samples rather than with Python-level
+work per station. Without NumPy the same results are computed per station.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import ANALYTICS_FIRST_PASS_DELAY, DATA_ANALYTICS, DOMAIN, SERIES_TREND_WINDOW
+from .timeseries import StationSeries
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ships with Home Assistant but is not a requirement
+    np = None
+
+if TYPE_CHECKING:
+    from .coordinator import NWPSDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Flood categories whose onset time is reported, in threshold order
+ONSET_CATEGORIES = ("minor", "moderate", "major")
+
+
+@dataclass(slots=True)
+class AnalyticsInput:
+    """One station's series and thresholds, as handed to compute_batch."""
+
+    forecast_times: array  # "d", POSIX seconds, oldest first
+    forecast_stage: array  # "f", NaN for missing readings
+    observed_times: array  # samples within SERIES_TREND_WINDOW of the newest
+    observed_stage: array
+    thresholds: Tuple[Optional[float], ...]  # stage per ONSET_CATEGORIES entry
+
+
+@dataclass(slots=True)
+class ForecastAnalytics:
+    """Derived forecast values for one station; field names match ANALYTICS_SENSORS."""
+
+    forecast_crest: Optional[float] = None
+    forecast_crest_time: Optional[datetime] = None
+    # First forecast time at or above each flood category's stage
+    minor_flood_time: Optional[datetime] = None
+    moderate_flood_time: Optional[datetime] = None
+    major_flood_time: Optional[datetime] = None
+    stage_rate_of_rise: Optional[float] = None  # ft/h
+
+
+def _as_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    """Return a POSIX timestamp as an aware UTC datetime."""
+    return None if timestamp is None else dt_util.utc_from_timestamp(timestamp)
+
+
+def _result(
+    crest: Optional[float],
+    crest_time: Optional[float],
+    onsets: List[Optional[float]],
+    slope: Optional[float],
+) -> ForecastAnalytics:
+    """Build a ForecastAnalytics from raw numbers."""
+    return ForecastAnalytics(
+        forecast_crest=None if crest is None else round(crest, 2),
+        forecast_crest_time=_as_datetime(crest_time),
+        minor_flood_time=_as_datetime(onsets[0]),
+        moderate_flood_time=_as_datetime(onsets[1]),
+        major_flood_time=_as_datetime(onsets[2]),
+        stage_rate_of_rise=None if slope is None else round(slope * 3600, 3),
+    )
+
+
+def _compute_python(inputs: List[AnalyticsInput]) -> List[ForecastAnalytics]:
+    """Compute analytics station by station; the fallback without NumPy."""
+    results: List[ForecastAnalytics] = []
+    for item in inputs:
+        crest = crest_time = None
+        onsets: List[Optional[float]] = [None] * len(ONSET_CATEGORIES)
+        for timestamp, stage in zip(item.forecast_times, item.forecast_stage):
+            if math.isnan(stage):
+                continue
+            if crest is None or stage > crest:
+                crest, crest_time = stage, timestamp
+            for category, threshold in enumerate(item.thresholds):
+                if onsets[category] is None and threshold is not None and stage >= threshold:
+                    onsets[category] = timestamp
+
+        slope = None
+        if item.observed_times:
+            end = item.observed_times[-1]
+            n = 0
+            sum_t = sum_v = sum_tt = sum_tv = 0.0
+            for timestamp, stage in zip(item.observed_times, item.observed_stage):
+                if math.isnan(stage):
+                    continue
+                t = timestamp - end
+                n += 1
+                sum_t += t
+                sum_v += stage
+                sum_tt += t * t
+                sum_tv += t * stage
+            denominator = n * sum_tt - sum_t * sum_t
+            if n >= 2 and denominator != 0:
+                slope = (n * sum_tv - sum_t * sum_v) / denominator
+
+        results.append(_result(crest, crest_time, onsets, slope))
+    return results
+
+
+def _segments(
+    times: List[array], values: List[array]
+) -> Tuple[Any, Any, Any, Any, Any]:
+    """Concatenate per-station series into flat arrays.
+
+    Returns (times, values, valid mask, segment id per sample, sample count
+    per segment).
+    """
+    lengths = np.fromiter((len(t) for t in times), dtype=np.intp, count=len(times))
+    if not lengths.sum():
+        empty = np.empty(0)
+        return empty, empty, empty.astype(bool), empty.astype(np.intp), lengths
+    flat_times = np.concatenate([np.frombuffer(t, dtype=np.float64) for t in times if len(t)])
+    flat_values = np.concatenate(
+        [np.frombuffer(v, dtype=np.float32) for v in values if len(v)]
+    ).astype(np.float64)
+    segment = np.repeat(np.arange(len(times)), lengths)
+    return flat_times, flat_values, ~np.isnan(flat_values), segment, lengths
+
+
+def _first_per_segment(mask: Any, segment: Any, count: int) -> Any:
+    """Return the index of the first True sample per segment, -1 if none."""
+    first = np.full(count, -1, dtype=np.intp)
+    hits = np.flatnonzero(mask)
+    if hits.size:
+        segments, positions = np.unique(segment[hits], return_index=True)
+        first[segments] = hits[positions]
+    return first
+
+
+def _compute_numpy(inputs: List[AnalyticsInput]) -> List[ForecastAnalytics]:
+    """Compute analytics for every station with whole-batch array operations."""
+    count = len(inputs)
+
+    # Forecast crest and flood onset
+    times, stage, valid, segment, _ = _segments(
+        [item.forecast_times for item in inputs], [item.forecast_stage for item in inputs]
+    )
+    masked = np.where(valid, stage, -np.inf)
+    crest = np.full(count, -np.inf)
+    np.maximum.at(crest, segment, masked)
+    crest_index = _first_per_segment(
+        valid & (masked == crest[segment]), segment, count
+    )
+    thresholds = np.array(
+        [[np.nan if t is None else t for t in item.thresholds] for item in inputs],
+        dtype=np.float64,
+    ).reshape(count, len(ONSET_CATEGORIES))
+    onset_index = [
+        # NaN thresholds compare False, so stations without one never match
+        _first_per_segment(valid & (stage >= thresholds[segment, category]), segment, count)
+        for category in range(len(ONSET_CATEGORIES))
+    ]
+
+    # Least-squares slope of the observed stage, relative to each station's
+    # newest sample
+    obs_times, obs_stage, obs_valid, obs_segment, lengths = _segments(
+        [item.observed_times for item in inputs], [item.observed_stage for item in inputs]
+    )
+    slope = np.full(count, np.nan)
+    if obs_times.size:
+        last = np.cumsum(lengths) - 1
+        end = np.zeros(count)
+        has_samples = lengths > 0
+        end[has_samples] = obs_times[last[has_samples]]
+        t = np.where(obs_valid, obs_times - end[obs_segment], 0.0)
+        v = np.where(obs_valid, obs_stage, 0.0)
+        n = np.bincount(obs_segment, weights=obs_valid, minlength=count)
+        sum_t = np.bincount(obs_segment, weights=t, minlength=count)
+        sum_v = np.bincount(obs_segment, weights=v, minlength=count)
+        sum_tt = np.bincount(obs_segment, weights=t * t, minlength=count)
+        sum_tv = np.bincount(obs_segment, weights=t * v, minlength=count)
+        denominator = n * sum_tt - sum_t * sum_t
+        ok = (n >= 2) & (denominator != 0)
+        slope[ok] = (n[ok] * sum_tv[ok] - sum_t[ok] * sum_v[ok]) / denominator[ok]
+
+    results: List[ForecastAnalytics] = []
+    for station in range(count):
+        index = crest_index[station]
+        results.append(
+            _result(
+                float(crest[station]) if index >= 0 else None,
+                float(times[index]) if index >= 0 else None,
+                [
+                    float(times[onset[station]]) if onset[station] >= 0 else None
+                    for onset in onset_index
+                ],
+                None if math.isnan(slope[station]) else float(slope[station]),
+            )
+        )
+    return results
+
+
+def analytics_input_from_series(
+    series: StationSeries, thresholds: Tuple[Optional[float], ...]
+) -> AnalyticsInput:
+    """Build a station's AnalyticsInput from its StationSeries."""
+    forecast_times, forecast_stage = series.forecast.ordered("stage")
+    newest = series.observed.last_time
+    observed_times, observed_stage = series.observed.ordered(
+        "stage", since=None if newest is None else newest - SERIES_TREND_WINDOW
+    )
+    return AnalyticsInput(forecast_times, forecast_stage, observed_times, observed_stage, thresholds)
+
+
+def compute_batch(inputs: List[AnalyticsInput]) -> List[ForecastAnalytics]:
+    """Return forecast analytics for each input, in order."""
+    if not inputs:
+        return []
+    if np is None:
+        return _compute_python(inputs)
+    return _compute_numpy(inputs)
+
+
+class ForecastAnalyticsBatcher:
+    """Collect stations with new series data and analyse them together.
+
+    Polls are spread across the update interval, so a pass runs once per
+    polling cycle: when every station with a series has queued, or else by
+    the deadline of the earliest queued station, one of its own scan
+    intervals after it queued. Stations whose series did not change never
+    queue, and stations on long intervals do not hold up short ones.
+    Stations without results yet are due ANALYTICS_FIRST_PASS_DELAY after
+    queuing, so their sensors fill in soon after setup.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the batcher."""
+        self.hass = hass
+        self._stations: Dict[str, NWPSDataCoordinator] = {}
+        self._pending: Dict[str, NWPSDataCoordinator] = {}
+        self._unsub: Optional[CALLBACK_TYPE] = None
+        # Loop time the armed pass runs at
+        self._deadline = 0.0
+        self.batches = 0
+        self.last_batch_size = 0
+
+    @callback
+    def async_register(self, coordinator: NWPSDataCoordinator) -> None:
+        """Add a station that keeps a hydrograph series."""
+        self._stations[coordinator.station_id] = coordinator
+
+    @callback
+    def async_unregister(self, station_id: str) -> None:
+        """Drop a station that is being unloaded."""
+        self._stations.pop(station_id, None)
+        self._pending.pop(station_id, None)
+        if not self._pending and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_schedule(self, coordinator: NWPSDataCoordinator) -> None:
+        """Queue a station for the pass at the end of this polling cycle."""
+        self._pending[coordinator.station_id] = coordinator
+        if len(self._pending) >= len(self._stations):
+            # The whole fleet has new data; no need to wait out the cycle
+            delay = 0.0
+        elif coordinator.analytics is None:
+            delay = ANALYTICS_FIRST_PASS_DELAY
+        else:
+            delay = coordinator.scan_interval
+        now = self.hass.loop.time()
+        if self._unsub is not None:
+            if self._deadline <= now + delay:
+                return
+            self._unsub()
+        self._deadline = now + delay
+        self._unsub = async_call_later(self.hass, delay, self._async_run)
+
+    @callback
+    def _async_run(self, _now: Any) -> None:
+        """Analyse every queued station and hand back the results."""
+        self._unsub = None
+        pending, self._pending = self._pending, {}
+        stations: List[Tuple[NWPSDataCoordinator, AnalyticsInput]] = []
+        for coordinator in pending.values():
+            if (item := coordinator.analytics_input()) is not None:
+                stations.append((coordinator, item))
+        if not stations:
+            return
+        results = compute_batch([item for _, item in stations])
+        self.batches += 1
+        self.last_batch_size = len(stations)
+        _LOGGER.debug("Computed forecast analytics for %s stations", len(stations))
+        for (coordinator, _), result in zip(stations, results):
+            coordinator.async_set_analytics(result)
+
+
+@callback
+def get_analytics_batcher(hass: HomeAssistant) -> ForecastAnalyticsBatcher:
+    """Return the domain forecast analytics batcher, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    batcher = domain_data.get(DATA_ANALYTICS)
+    if batcher is None:
+        batcher = domain_data[DATA_ANALYTICS] = ForecastAnalyticsBatcher(hass)
+    return batcher
@@ -4,13 +4,14 @@ from __future__ import annotations
 import logging
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, BINARY_SENSORS, CONF_STATION
+from .const import DOMAIN, ACTIVE_FLOOD_CATEGORIES, BINARY_SENSORS
 from .coordinator import NWPSDataCoordinator
+from .group import entry_coordinators
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,13 +21,11 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up binary sensors for a config entry."""
-    # RECOVERY: Get the coordinator created in __init__.py
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    station_id = entry.data.get(CONF_STATION)
-
+    # One coordinator per station; a group entry has several
     entities = []
-    for key, name in BINARY_SENSORS.items():
-        entities.append(NWPSBinarySensor(coordinator, station_id, key, name))
+    for coordinator in entry_coordinators(hass, entry):
+        for key, name in BINARY_SENSORS.items():
+            entities.append(NWPSBinarySensor(coordinator, coordinator.station_id, key, name))
     
     async_add_entities(entities)
 
@@ -38,6 +37,8 @@ class NWPSBinarySensor(CoordinatorEntity, BinarySensorEntity):
     _attr_has_entity_name = False
     # 'problem' makes the sensor turn Red in the UI when 'on'
     _attr_device_class = BinarySensorDeviceClass.PROBLEM 
+    # Static; the recorder would otherwise store them with every state
+    _unrecorded_attributes = frozenset({"station_id", "flood_minor", "flood_moderate", "flood_major"})
 
     def __init__(self, coordinator: NWPSDataCoordinator, station_id: str, key: str, name: str):
         super().__init__(coordinator)
@@ -54,6 +55,36 @@ class NWPSBinarySensor(CoordinatorEntity, BinarySensorEntity):
             name=coordinator.get_device_name(),
             manufacturer="NOAA NWPS",
         )
+        # What the last written state was built from; see _fingerprint
+        self._last_fingerprint = self._fingerprint()
+
+    def _fingerprint(self) -> tuple:
+        """Return the inputs of the state and attributes, cheap to compare."""
+        data = self.coordinator.data
+        if data is None:
+            return (self.available,)
+        if self._key == "observed_flood":
+            category, stage = data.observed_flood_category, data.stage
+        else:
+            category, stage = data.forecast_flood_category, data.forecast_stage
+        return (
+            self.available,
+            category,
+            stage,
+            data.flood_minor_stage,
+            data.flood_moderate_stage,
+            data.flood_major_stage,
+            self.coordinator.stale,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the flood state or its attributes changed."""
+        fingerprint = self._fingerprint()
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self.async_write_ha_state()
 
     def _category_active(self, category: str | None) -> bool:
         """Return True if category indicates any flooding."""
@@ -61,39 +92,39 @@ class NWPSBinarySensor(CoordinatorEntity, BinarySensorEntity):
             return False
         cat = str(category).lower()
         # 'action' is a pre-flood stage, 'minor/moderate/major' are active floods
-        return cat in ("minor", "moderate", "major", "action")
+        return cat in ACTIVE_FLOOD_CATEGORIES
 
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
-        data = self.coordinator.data or {}
+        data = self.coordinator.data
+        if data is None:
+            return False
         if self._key == "observed_flood":
-            return self._category_active(data.get("observed_flood_category"))
+            return self._category_active(data.observed_flood_category)
         if self._key == "forecast_flood":
-            return self._category_active(data.get("forecast_flood_category"))
+            return self._category_active(data.forecast_flood_category)
         return False
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return details about the flood state."""
-        data = self.coordinator.data or {}
+        data = self.coordinator.data
         attrs = {
             "station_id": self._station_id,
-            "flood_category": data.get(f"{self._key}_category"),
+            "flood_category": getattr(data, f"{self._key}_category", None),
         }
+        if data is None:
+            return attrs
         
         # Add flood thresholds if available
-        if data.get("flood_minor_stage"):
-            attrs["flood_minor"] = data.get("flood_minor_stage")
-        if data.get("flood_moderate_stage"):
-            attrs["flood_moderate"] = data.get("flood_moderate_stage")
-        if data.get("flood_major_stage"):
-            attrs["flood_major"] = data.get("flood_major_stage")
-        
+        attrs.update(data.flood_thresholds())
+
         # Add current stage if available for context
-        if self._key == "observed_flood" and data.get("stage"):
-            attrs["current_stage"] = data.get("stage")
-        elif self._key == "forecast_flood" and data.get("forecast_stage"):
-            attrs["forecast_stage"] = data.get("forecast_stage")
+        if self._key == "observed_flood" and data.stage:
+            attrs["current_stage"] = data.stage
+        elif self._key == "forecast_flood" and data.forecast_stage:
+            attrs["forecast_stage"] = data.forecast_stage
+        attrs.update(self.coordinator.staleness_attributes())
             
         return attrs
\ No newline at end of file
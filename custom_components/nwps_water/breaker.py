@@ -0,0 +1,169 @@
+"""Domain-wide circuit breaker that pauses NWPS requests during an outage."""
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any, Dict, Optional, Set
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    BREAKER_BASE_BACKOFF,
+    BREAKER_FAILURE_STATIONS,
+    BREAKER_FAILURE_WINDOW,
+    BREAKER_MAX_BACKOFF,
+    BREAKER_PROBE_TIMEOUT,
+    DATA_BREAKER,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class NWPSCircuitBreaker:
+    """Stop every station polling NOAA once failures are correlated.
+
+    The breaker opens when BREAKER_FAILURE_STATIONS different stations fail
+    within BREAKER_FAILURE_WINDOW seconds with no success in between. While
+    open, coordinators serve their last good data without a request. After
+    an exponentially growing, jittered delay the next station to poll is let
+    through alone as a probe; its success closes the breaker for everyone
+    and its failure reopens it with a longer delay.
+
+    Installs with a single station never open the breaker.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize a closed breaker."""
+        self.hass = hass
+        self.state = STATE_CLOSED
+        self._stations: Set[str] = set()
+        # station -> monotonic time of its last failure since a success
+        self._failures: Dict[str, float] = {}
+        self._opens = 0  # consecutive opens; the backoff exponent
+        self._retry_at = 0.0
+        self._prober: Optional[str] = None
+        self._probe_started = 0.0
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def retry_in(self) -> Optional[float]:
+        """Return seconds until the next probe while open."""
+        if self.state != STATE_OPEN:
+            return None
+        return max(0.0, self._retry_at - time.monotonic())
+
+    @callback
+    def async_register(self, station_id: str) -> None:
+        """Add a station whose failures count towards opening."""
+        self._stations.add(station_id)
+
+    @callback
+    def async_unregister(self, station_id: str) -> None:
+        """Remove a station, releasing the probe if it held it."""
+        self._stations.discard(station_id)
+        self._failures.pop(station_id, None)
+        if self._prober == station_id:
+            self.state = STATE_OPEN
+            self._prober = None
+            self._retry_at = time.monotonic()
+
+    @callback
+    def async_allow(self, station_id: str) -> bool:
+        """Return True if the station may send a request now."""
+        if self.state == STATE_CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == STATE_HALF_OPEN and (
+            self._prober == station_id or now - self._probe_started > BREAKER_PROBE_TIMEOUT
+        ):
+            # The prober retrying, or a probe that never reported back
+            self._prober, self._probe_started = station_id, now
+            return True
+        if self.state == STATE_OPEN and now >= self._retry_at:
+            _LOGGER.debug("Probing NWPS with station %s", station_id)
+            self.state = STATE_HALF_OPEN
+            self._prober, self._probe_started = station_id, now
+            return True
+        self.rejected += 1
+        return False
+
+    @callback
+    def async_record_success(self, station_id: str) -> None:
+        """Record a successful request, closing the breaker if it was open."""
+        self._failures.pop(station_id, None)
+        if self.state == STATE_CLOSED:
+            return
+        _LOGGER.info("NWPS is reachable again, resuming requests for all stations")
+        self.state = STATE_CLOSED
+        self._opens = 0
+        self._prober = None
+        self._failures.clear()
+
+    @callback
+    def async_record_failure(self, station_id: str) -> None:
+        """Record a request that failed in a way an outage would explain."""
+        now = time.monotonic()
+        if self.state == STATE_HALF_OPEN:
+            if station_id == self._prober:
+                self._async_open(now)
+            return
+        if self.state == STATE_OPEN:
+            return
+        self._failures[station_id] = now
+        for stale in [
+            key for key, at in self._failures.items() if now - at > BREAKER_FAILURE_WINDOW
+        ]:
+            del self._failures[stale]
+        needed = min(BREAKER_FAILURE_STATIONS, len(self._stations))
+        if needed >= 2 and len(self._failures) >= needed:
+            self._async_open(now)
+
+    @callback
+    def _async_open(self, now: float) -> None:
+        """Open the breaker until a jittered, exponentially growing delay."""
+        delay = min(BREAKER_MAX_BACKOFF, BREAKER_BASE_BACKOFF * 2**self._opens)
+        # Equal jitter: never less than half the delay, so probes stay spaced
+        delay = random.uniform(delay / 2, delay)
+        if self.state == STATE_CLOSED:
+            self.trips += 1
+            _LOGGER.warning(
+                "NWPS requests failing for %s stations, pausing requests for %.0f s",
+                len(self._failures),
+                delay,
+            )
+        else:
+            _LOGGER.debug("NWPS probe failed, next probe in %.0f s", delay)
+        self.state = STATE_OPEN
+        self._opens += 1
+        self._retry_at = now + delay
+        self._prober = None
+        self._failures.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        retry_in = self.retry_in
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "rejected_requests": self.rejected,
+            "consecutive_opens": self._opens,
+            "retry_in_seconds": None if retry_in is None else round(retry_in, 1),
+            "failing_stations": sorted(self._failures),
+        }
+
+
+@callback
+def get_circuit_breaker(hass: HomeAssistant) -> NWPSCircuitBreaker:
+    """Return the domain circuit breaker, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    breaker = domain_data.get(DATA_BREAKER)
+    if breaker is None:
+        breaker = domain_data[DATA_BREAKER] = NWPSCircuitBreaker(hass)
+    return breaker
@@ -0,0 +1,250 @@
+"""Gauge listing queries that refresh the status of many stations at once."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.json import json_loads
+
+from .const import (
+    BULK_CELL_DEGREES,
+    BULK_MARGIN_DEGREES,
+    BULK_MAX_AGE,
+    BULK_TIMEOUT,
+    DATA_BULK,
+    DECODE_EXECUTOR_THRESHOLD,
+    DOMAIN,
+)
+from .hub import get_hub
+from .parser import parse_status
+
+_LOGGER = logging.getLogger(__name__)
+
+# (xmin, ymin, xmax, ymax) in degrees
+BoundingBox = Tuple[float, float, float, float]
+
+
+def group_stations(
+    locations: Dict[str, Tuple[float, float]], cell: float = BULK_CELL_DEGREES
+) -> List[Tuple[BoundingBox, FrozenSet[str]]]:
+    """Group stations by grid cell, each with the bounding box of its stations.
+
+    A larger cell means fewer queries, but each listing then also carries
+    the unconfigured gauges between the stations; cells of a couple of
+    degrees keep a state's stations to a handful of modest responses.
+    """
+    cells: Dict[Tuple[int, int], List[str]] = {}
+    for station_id, (latitude, longitude) in locations.items():
+        cells.setdefault(
+            (math.floor(latitude / cell), math.floor(longitude / cell)), []
+        ).append(station_id)
+    groups: List[Tuple[BoundingBox, FrozenSet[str]]] = []
+    for members in cells.values():
+        latitudes = [locations[station_id][0] for station_id in members]
+        longitudes = [locations[station_id][1] for station_id in members]
+        box = (
+            min(longitudes) - BULK_MARGIN_DEGREES,
+            min(latitudes) - BULK_MARGIN_DEGREES,
+            max(longitudes) + BULK_MARGIN_DEGREES,
+            max(latitudes) + BULK_MARGIN_DEGREES,
+        )
+        groups.append((box, frozenset(members)))
+    return groups
+
+
+def parse_status_rows(body: bytes, wanted: FrozenSet[str]) -> Dict[str, Dict[str, Any]]:
+    """Parse the status of the wanted gauges in a listing response.
+
+    Rows without a status block are left out, so those stations fall back
+    to their detail payload.
+    """
+    payload = json_loads(body)
+    rows = payload.get("gauges", []) if isinstance(payload, dict) else payload
+    found: Dict[str, Dict[str, Any]] = {}
+    for row in rows or []:
+        if not isinstance(row, dict) or not isinstance(row.get("status"), dict):
+            continue
+        lid = str(row.get("lid") or "").upper()
+        if lid in wanted:
+            found[lid] = parse_status(row)
+    return found
+
+
+@dataclass(slots=True)
+class _Group:
+    """One listing query and the status it last returned."""
+
+    url: str
+    stations: FrozenSet[str]
+    rows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    etag: Optional[str] = None
+    fetched: float = -math.inf  # time.monotonic()
+
+
+class NWPSBulkStatus:
+    """Serve station status from shared gauge listing queries.
+
+    Stations are grouped by location (see group_stations), and one
+    conditional listing request per group refreshes every station in it.
+    A response is reused for BULK_MAX_AGE seconds and concurrent polls of a
+    group share one request, so stations polling on the same tick cost one
+    request per group. Stations without a known location, or missing from
+    their group's listing, get None and fetch their detail payload instead.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize with no stations."""
+        self.hass = hass
+        self.max_age = BULK_MAX_AGE
+        self._stations: Set[str] = set()
+        self._locations: Dict[str, Tuple[float, float]] = {}
+        # station -> its group; rebuilt lazily after stations change
+        self._groups: Optional[Dict[str, _Group]] = None
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.queries = 0
+        self.not_modified = 0
+        self.served = 0
+        self.missing = 0
+
+    @property
+    def group_count(self) -> int:
+        """Return the number of listing queries per refresh cycle."""
+        return len({group.url for group in (self._groups or {}).values()})
+
+    @callback
+    def async_register(self, station_id: str) -> None:
+        """Add a station; it is grouped once its location is known."""
+        self._stations.add(station_id)
+        if station_id in self._locations:
+            self._groups = None
+
+    @callback
+    def async_unregister(self, station_id: str) -> None:
+        """Remove a station from the listing queries."""
+        self._stations.discard(station_id)
+        self._locations.pop(station_id, None)
+        self._groups = None
+
+    @callback
+    def async_locate(
+        self, station_id: str, latitude: Optional[float], longitude: Optional[float]
+    ) -> None:
+        """Record a station's location from its detail payload."""
+        if latitude is None or longitude is None:
+            return
+        location = (latitude, longitude)
+        if self._locations.get(station_id) == location:
+            return
+        self._locations[station_id] = location
+        if station_id in self._stations:
+            self._groups = None
+
+    def _group_of(self, station_id: str) -> Optional[_Group]:
+        """Return a station's group, regrouping after station changes."""
+        if self._groups is None:
+            hub = get_hub(self.hass)
+            located = {
+                station_id: location
+                for station_id, location in self._locations.items()
+                if station_id in self._stations
+            }
+            self._groups = {}
+            for box, members in group_stations(located):
+                group = _Group(hub.listing_url(box), members)
+                for member in members:
+                    self._groups[member] = group
+            _LOGGER.debug(
+                "Grouped %s stations into %s listing queries", len(located), self.group_count
+            )
+        return self._groups.get(station_id)
+
+    async def async_status(
+        self, station_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return a station's status fields, or None to use its detail payload.
+
+        The flag is True if NOAA answered the listing request during this
+        call, rather than the rows being reused from an earlier one.
+        Raises the hub's errors if the listing request fails.
+        """
+        group = self._group_of(station_id)
+        if group is None:
+            return None, False
+        answered = False
+        if time.monotonic() - group.fetched >= self.max_age:
+            task = self._refreshing.get(group.url)
+            if task is None:
+                task = self.hass.async_create_background_task(
+                    self._async_fetch(group), f"{DOMAIN} listing {group.url}"
+                )
+                self._refreshing[group.url] = task
+                task.add_done_callback(lambda _task: self._refreshing.pop(group.url, None))
+            answered = await asyncio.shield(task)
+        status = group.rows.get(station_id)
+        if status is None:
+            self.missing += 1
+        else:
+            self.served += 1
+        return status, answered
+
+    async def _async_fetch(self, group: _Group) -> bool:
+        """Refresh a group's rows, conditionally once it has some.
+
+        Returns True unless the hub served the listing from its cache.
+        """
+        self.queries += 1
+        hub = get_hub(self.hass)
+        response = await hub.async_get(
+            group.url,
+            timeout=BULK_TIMEOUT,
+            etag=group.etag if group.rows else None,
+            cache=True,
+        )
+        if response.not_modified:
+            self.not_modified += 1
+        else:
+            if len(response.body) > DECODE_EXECUTOR_THRESHOLD:
+                group.rows = await self.hass.async_add_executor_job(
+                    parse_status_rows, response.body, group.stations
+                )
+            else:
+                group.rows = parse_status_rows(response.body, group.stations)
+            group.etag = response.etag
+        group.fetched = time.monotonic()
+        return not response.from_cache
+
+    @staticmethod
+    def next_poll_delay(delay: float, period: float) -> float:
+        """Push a poll delay out to the next multiple of period in wall-clock time.
+
+        Stations polling with the same period then land on the same tick and
+        share their group's listing request.
+        """
+        return delay + (-(time.time() + delay)) % period
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the listing state for diagnostics."""
+        return {
+            "stations": len(self._stations),
+            "located": sum(1 for station_id in self._stations if station_id in self._locations),
+            "listing_queries": self.group_count,
+            "requests": self.queries,
+            "not_modified": self.not_modified,
+            "statuses_served": self.served,
+            "missing_from_listing": self.missing,
+        }
+
+
+@callback
+def get_bulk_status(hass: HomeAssistant) -> NWPSBulkStatus:
+    """Return the domain bulk status refresher, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    bulk = domain_data.get(DATA_BULK)
+    if bulk is None:
+        bulk = domain_data[DATA_BULK] = NWPSBulkStatus(hass)
+    return bulk
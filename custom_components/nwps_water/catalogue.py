@@ -0,0 +1,334 @@
+"""Locally cached NWPS gauge catalogue, searchable by name, state and radius."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    CATALOGUE_GRID_DEGREES,
+    CATALOGUE_MAX_BYTES,
+    CATALOGUE_SEARCH_LIMIT,
+    CATALOGUE_TIMEOUT,
+    CATALOGUE_TTL,
+    DATA_CATALOGUE,
+    DOMAIN,
+    STORAGE_VERSION,
+)
+from .hub import get_hub
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.catalogue"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_EARTH_RADIUS_KM = 6371.0
+_KM_PER_DEGREE = 111.32
+
+
+@dataclass(slots=True, frozen=True)
+class CatalogueGauge:
+    """One gauge from the NWPS gauges listing."""
+
+    lid: str
+    name: str
+    state: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    """Return the lowercase words of a name or query."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_listing(body: bytes) -> List[CatalogueGauge]:
+    """Parse the /gauges listing into catalogue gauges, skipping bad rows."""
+    payload = json_loads(body)
+    rows = payload.get("gauges", []) if isinstance(payload, dict) else payload
+    gauges: List[CatalogueGauge] = []
+    for row in rows or []:
+        if not isinstance(row, dict) or not row.get("lid"):
+            continue
+        state = row.get("state")
+        if isinstance(state, dict):
+            state = state.get("abbreviation")
+        try:
+            latitude = float(row["latitude"])
+            longitude = float(row["longitude"])
+        except (KeyError, TypeError, ValueError):
+            latitude = longitude = None
+        gauges.append(
+            CatalogueGauge(
+                lid=str(row["lid"]).upper(),
+                name=str(row.get("name") or row["lid"]),
+                state=str(state).upper() if state else None,
+                latitude=latitude,
+                longitude=longitude,
+            )
+        )
+    return gauges
+
+
+class GaugeIndex:
+    """In-memory search indexes over a fixed list of gauges.
+
+    Names and LIDs are split into words held in one sorted list, so a prefix
+    lookup is two bisections. Coordinates are bucketed into a grid of
+    CATALOGUE_GRID_DEGREES cells, so a radius search only measures gauges in
+    the cells overlapping the search circle's bounding box.
+    """
+
+    __slots__ = ("gauges", "lids", "_cell", "_columns", "_words", "_word_ids", "_states", "_grid")
+
+    def __init__(self, gauges: List[CatalogueGauge], cell: float = CATALOGUE_GRID_DEGREES) -> None:
+        """Build the indexes."""
+        self.gauges = gauges
+        self.lids = frozenset(gauge.lid.upper() for gauge in gauges)
+        self._cell = cell
+        self._columns = max(1, round(360 / cell))
+
+        pairs = sorted(
+            (word, index)
+            for index, gauge in enumerate(gauges)
+            for word in {gauge.lid.lower(), *_tokens(gauge.name)}
+        )
+        self._words = [word for word, _ in pairs]
+        self._word_ids = array("I", (index for _, index in pairs))
+
+        self._states: Dict[str, List[int]] = {}
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for index, gauge in enumerate(gauges):
+            if gauge.state:
+                self._states.setdefault(gauge.state, []).append(index)
+            if gauge.latitude is not None and gauge.longitude is not None:
+                self._grid.setdefault(self._cell_of(gauge.latitude, gauge.longitude), []).append(index)
+
+    def __len__(self) -> int:
+        """Return the number of gauges."""
+        return len(self.gauges)
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Return the grid cell containing a point."""
+        return (
+            math.floor(latitude / self._cell),
+            math.floor((longitude + 180) / self._cell) % self._columns,
+        )
+
+    def _prefix(self, word: str) -> Set[int]:
+        """Return the gauges with a name word or LID starting with word."""
+        start = bisect_left(self._words, word)
+        end = bisect_left(self._words, word + "\uffff", start)
+        return set(self._word_ids[start:end])
+
+    def _within(self, latitude: float, longitude: float, radius_km: float) -> Dict[int, float]:
+        """Return the distance of every gauge within radius_km of a point."""
+        dlat = radius_km / _KM_PER_DEGREE
+        dlon = radius_km / (_KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+        rows = range(
+            math.floor((latitude - dlat) / self._cell), math.floor((latitude + dlat) / self._cell) + 1
+        )
+        first = math.floor((longitude - dlon + 180) / self._cell)
+        last = math.floor((longitude + dlon + 180) / self._cell)
+        columns = (
+            range(self._columns)
+            if last - first + 1 >= self._columns
+            else [column % self._columns for column in range(first, last + 1)]
+        )
+
+        found: Dict[int, float] = {}
+        for row in rows:
+            for column in columns:
+                for index in self._grid.get((row, column), ()):
+                    gauge = self.gauges[index]
+                    distance = _distance_km(latitude, longitude, gauge.latitude, gauge.longitude)
+                    if distance <= radius_km:
+                        found[index] = distance
+        return found
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        state: Optional[str] = None,
+        near: Optional[Tuple[float, float]] = None,
+        radius_km: Optional[float] = None,
+        limit: int = CATALOGUE_SEARCH_LIMIT,
+    ) -> List[Tuple[CatalogueGauge, Optional[float]]]:
+        """Return gauges matching every given criterion with their distance.
+
+        Each query word must prefix a word of the gauge name or its LID.
+        Results are nearest first when searching by radius, otherwise by
+        name. No criteria returns no results.
+        """
+        candidates: Optional[Set[int]] = None
+        for word in _tokens(query):
+            matches = self._prefix(word)
+            candidates = matches if candidates is None else candidates & matches
+        if state:
+            matches = set(self._states.get(state.strip().upper(), ()))
+            candidates = matches if candidates is None else candidates & matches
+
+        distances: Dict[int, float] = {}
+        if near is not None and radius_km:
+            distances = self._within(near[0], near[1], radius_km)
+            candidates = set(distances) if candidates is None else candidates & distances.keys()
+
+        if not candidates:
+            return []
+        if distances:
+            ordered = sorted(candidates, key=distances.__getitem__)
+        else:
+            ordered = sorted(candidates, key=lambda index: self.gauges[index].name.lower())
+        return [(self.gauges[index], distances.get(index)) for index in ordered[:limit]]
+
+
+def _build_index(body: bytes) -> GaugeIndex:
+    """Parse a listing and index it; runs in the executor."""
+    return GaugeIndex(parse_listing(body))
+
+
+class GaugeCatalogue:
+    """The NWPS gauges listing, persisted to disk and indexed in memory.
+
+    Downloaded once, then refreshed in the background when older than
+    CATALOGUE_TTL. Searches never touch the network.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the catalogue."""
+        self.hass = hass
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._index: Optional[GaugeIndex] = None
+        self._fetched: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Return True once a catalogue is available to search."""
+        return self._index is not None
+
+    @property
+    def stale(self) -> bool:
+        """Return True if the catalogue is missing or older than the TTL."""
+        return self._fetched is None or (
+            dt_util.utcnow() - self._fetched > timedelta(seconds=CATALOGUE_TTL)
+        )
+
+    async def async_load(self) -> None:
+        """Load and index the persisted catalogue, if any."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        rows = data.get("gauges", [])
+        self._index = await self.hass.async_add_executor_job(
+            GaugeIndex, [CatalogueGauge(*row) for row in rows]
+        )
+        self._fetched = dt_util.parse_datetime(data.get("fetched") or "")
+        _LOGGER.debug("Loaded NWPS gauge catalogue with %s gauges", len(self._index))
+
+    async def async_refresh(self) -> None:
+        """Download the catalogue now; concurrent callers share one download.
+
+        Raises the hub's errors if the download fails.
+        """
+        await asyncio.shield(self._async_start_refresh())
+
+    @callback
+    def async_schedule_refresh(self) -> None:
+        """Refresh the catalogue in the background if it is stale."""
+        if self.stale:
+            self._async_start_refresh()
+
+    @callback
+    def _async_start_refresh(self) -> asyncio.Task:
+        """Return the running refresh task, starting one if needed."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self.hass.async_create_background_task(
+                self._async_download(), f"{DOMAIN} gauge catalogue refresh"
+            )
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        """Log a failed refresh; the previous catalogue stays in use."""
+        if not task.cancelled() and (err := task.exception()) is not None:
+            _LOGGER.warning("Could not refresh the NWPS gauge catalogue: %s", err)
+
+    async def _async_download(self) -> None:
+        """Fetch, index and persist the gauges listing."""
+        hub = get_hub(self.hass)
+        response = await hub.async_get(
+            hub.base_url, timeout=CATALOGUE_TIMEOUT, max_bytes=CATALOGUE_MAX_BYTES
+        )
+        index = await self.hass.async_add_executor_job(_build_index, response.body)
+        if not len(index):
+            raise ValueError("NWPS gauges listing is empty")
+        self._index = index
+        self._fetched = dt_util.utcnow()
+        _LOGGER.debug("Downloaded NWPS gauge catalogue with %s gauges", len(index))
+        await self._store.async_save(
+            {
+                "fetched": self._fetched.isoformat(),
+                "gauges": [
+                    [g.lid, g.name, g.state, g.latitude, g.longitude] for g in index.gauges
+                ],
+            }
+        )
+
+    def __contains__(self, lid: str) -> bool:
+        """Return True if the loaded catalogue lists the gauge."""
+        return self._index is not None and lid.upper() in self._index.lids
+
+    def search(self, **criteria: Any) -> List[Tuple[CatalogueGauge, Optional[float]]]:
+        """Search the loaded catalogue; see GaugeIndex.search."""
+        if self._index is None:
+            return []
+        return self._index.search(**criteria)
+
+
+async def async_get_catalogue(hass: HomeAssistant) -> GaugeCatalogue:
+    """Return the domain gauge catalogue, ready to search.
+
+    The first call loads it from disk, downloading it if it was never
+    saved; that download's errors are raised. A stale catalogue is
+    returned as is and refreshed in the background.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    loader: Optional[asyncio.Future] = domain_data.get(DATA_CATALOGUE)
+    if loader is None:
+        catalogue = GaugeCatalogue(hass)
+        loader = hass.async_create_task(_async_load(catalogue))
+        domain_data[DATA_CATALOGUE] = loader
+    catalogue = await asyncio.shield(loader)
+    if not catalogue.loaded:
+        await catalogue.async_refresh()
+    else:
+        catalogue.async_schedule_refresh()
+    return catalogue
+
+
+async def _async_load(catalogue: GaugeCatalogue) -> GaugeCatalogue:
+    """Load a catalogue from disk and return it."""
+    await catalogue.async_load()
+    return catalogue
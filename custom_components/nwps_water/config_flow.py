@@ -8,7 +8,7 @@ import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
     DOMAIN, 
@@ -16,8 +16,28 @@ from .const import (
     CONF_PARAMETERS, 
     AVAILABLE_PARAMETERS, 
     DEFAULT_SCAN_INTERVAL,
-    NWPS_BASE
+    CONF_ADAPTIVE_POLLING,
+    CONF_KEEP_RAW,
+    CONF_PROFILE_UPDATES,
+    CONF_TIMESERIES,
+    CONF_TIMESERIES_RETENTION,
+    DEFAULT_TIMESERIES_RETENTION,
+    CONF_STAGE_DEADBAND,
+    CONF_FLOW_DEADBAND,
+    CONF_TRACK_UPSTREAM,
+    CONF_MAX_STALENESS,
+    DEFAULT_MAX_STALENESS,
+    CONF_IMPORT_STATISTICS,
+    CONF_NWM,
+    CONF_BULK_STATUS,
+    CONF_STATIONS,
+    CONF_CSV_FILE,
+    CONF_REGION,
+    GROUP_MAX_STATIONS,
 )
+from .catalogue import async_get_catalogue
+from .group import parse_station_list, read_station_csv
+from .hub import NWPSApiError, NWPSError, NWPSNotFoundError, get_hub
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,18 +47,19 @@ async def _validate_station_id(hass, station_id: str) -> dict[str, str] | None:
     
     Returns None if valid, or a dict with error key if invalid.
     """
-    session = async_get_clientsession(hass)
-    url = f"{NWPS_BASE}/{station_id}"
-    
+    hub = get_hub(hass)
+
     try:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-            if resp.status == 404:
-                return {"base": "invalid_station"}
-            elif resp.status != 200:
-                _LOGGER.error("NWPS API returned status %s for station %s", resp.status, station_id)
-                return {"base": "cannot_connect"}
-            # Station is valid
-            return None
+        # Only the status matters here; the body is left undecoded for the
+        # coordinator's first refresh to reuse from the hub's response cache
+        await hub.async_get(hub.station_url(station_id), timeout=10, cache=True)
+        # Station is valid
+        return None
+    except NWPSNotFoundError:
+        return {"base": "invalid_station"}
+    except NWPSApiError as err:
+        _LOGGER.error("NWPS API returned status %s for station %s", err.status, station_id)
+        return {"base": "cannot_connect"}
     except (asyncio.TimeoutError, aiohttp.ServerTimeoutError):
         _LOGGER.error("Timeout validating station ID %s", station_id)
         return {"base": "timeout"}
@@ -50,59 +71,276 @@ async def _validate_station_id(hass, station_id: str) -> dict[str, str] | None:
         return {"base": "unknown"}
 
 
+def _configured_stations(hass, exclude_entry_id: str | None = None) -> set[str]:
+    """Return the stations of every entry, single or group, but one."""
+    stations = set()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id == exclude_entry_id:
+            continue
+        if CONF_STATIONS in entry.data:
+            stations.update(entry.data[CONF_STATIONS])
+        elif entry.data.get(CONF_STATION):
+            stations.add(entry.data[CONF_STATION])
+    return stations
+
+
+async def _async_station_list(
+    hass,
+    user_input: dict,
+    errors: dict[str, str],
+    placeholders: dict[str, str],
+    entry_id: str | None = None,
+    known: list[str] | tuple = (),
+) -> list[str] | None:
+    """Read, check and validate the station list of a group.
+
+    Stations come from the pasted list and the optional CSV file. Those
+    not in known are looked up in the gauge catalogue; only the ones it
+    does not list are fetched from NWPS, concurrently in one pass.
+    Returns None and fills errors if the list cannot be used.
+    """
+    text = user_input.get(CONF_STATIONS, "")
+    path = user_input.get(CONF_CSV_FILE, "").strip()
+    if path:
+        try:
+            text += "\n" + await hass.async_add_executor_job(
+                read_station_csv, hass.config.path(path)
+            )
+        except (OSError, UnicodeDecodeError) as err:
+            _LOGGER.error("Could not read station CSV %s: %s", path, err)
+            errors["base"] = "csv_unreadable"
+            return None
+    station_ids = parse_station_list(text)
+    if not station_ids:
+        errors["base"] = "no_stations"
+        return None
+    if len(station_ids) > GROUP_MAX_STATIONS:
+        errors["base"] = "too_many_stations"
+        return None
+    configured = _configured_stations(hass, entry_id)
+    if duplicates := [station_id for station_id in station_ids if station_id in configured]:
+        placeholders["stations"] = ", ".join(duplicates)
+        errors["base"] = "stations_configured"
+        return None
+
+    new = [station_id for station_id in station_ids if station_id not in known]
+    # One catalogue download checks hundreds of IDs; fetching each gauge
+    # here would only repeat the stations' first refresh, as the hub's
+    # response cache is far smaller than a large group
+    try:
+        catalogue = await async_get_catalogue(hass)
+    except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+        _LOGGER.debug("Validating stations without the gauge catalogue: %s", err)
+    else:
+        new = [station_id for station_id in new if station_id not in catalogue]
+    # Gauges newer than the catalogue, or all of them without one; the
+    # hub bounds how many run at once
+    results = dict(
+        zip(new, await asyncio.gather(*(_validate_station_id(hass, station_id) for station_id in new)))
+    )
+    if invalid := [
+        station_id for station_id, error in results.items() if error == {"base": "invalid_station"}
+    ]:
+        placeholders["stations"] = ", ".join(invalid)
+        errors["base"] = "invalid_stations"
+        return None
+    if error := next((error for error in results.values() if error), None):
+        errors.update(error)
+        return None
+    return station_ids
+
+
+def _station_options_schema() -> dict:
+    """Return the per-station fields shared by the manual and search steps."""
+    # Create a simple dict mapping parameter keys to their display names
+    parameter_options = {
+        param_key: param_info.get("name", param_key)
+        for param_key, param_info in AVAILABLE_PARAMETERS.items()
+    }
+    return {
+        vol.Optional(CONF_PARAMETERS, default=list(AVAILABLE_PARAMETERS.keys())): cv.multi_select(parameter_options),
+        vol.Optional("scan_interval", default=DEFAULT_SCAN_INTERVAL): vol.All(
+            vol.Coerce(int), 
+            vol.Range(min=60, max=3600)
+        ),
+        vol.Optional(CONF_ADAPTIVE_POLLING, default=False): bool,
+    }
+
+
+def _gauge_label(gauge, distance: float | None) -> str:
+    """Return how a search result is shown in the station picker."""
+    label = f"{gauge.name} ({gauge.lid}"
+    if gauge.state:
+        label += f", {gauge.state}"
+    label += ")"
+    if distance is not None:
+        label += f" - {distance:.0f} km"
+    return label
+
+
 class NWPSConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for NWPS Water."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        # LID -> label of the gauges found by the last search
+        self._search_results: dict[str, str] = {}
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["search", "manual", "group"])
+
+    async def async_step_search(self, user_input=None):
+        """Search the local gauge catalogue by name, state or distance."""
         errors = {}
 
         if user_input is not None:
-            # Capitalize station ID for consistency
-            station_id = user_input[CONF_STATION].upper()
-            
-            # Validate station ID with NWPS API
-            validation_error = await _validate_station_id(self.hass, station_id)
-            if validation_error:
-                errors.update(validation_error)
+            query = user_input.get("query", "").strip()
+            state = user_input.get("state", "").strip()
+            radius = user_input.get("radius_km", 0)
+            if not (query or state or radius):
+                errors["base"] = "no_criteria"
             else:
-                # Check for duplicates
-                await self.async_set_unique_id(station_id)
-                self._abort_if_unique_id_configured()
+                try:
+                    catalogue = await async_get_catalogue(self.hass)
+                except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+                    _LOGGER.error("Could not download the NWPS gauge catalogue: %s", err)
+                    errors["base"] = "catalogue_unavailable"
+                else:
+                    results = catalogue.search(
+                        query=query,
+                        state=state,
+                        near=(self.hass.config.latitude, self.hass.config.longitude),
+                        radius_km=radius,
+                    )
+                    if not results:
+                        errors["base"] = "no_results"
+                    else:
+                        self._search_results = {
+                            gauge.lid: _gauge_label(gauge, distance)
+                            for gauge, distance in results
+                        }
+                        return await self.async_step_pick()
+
+        schema = vol.Schema(
+            {
+                vol.Optional("query", default=""): str,
+                vol.Optional("state", default=""): str,
+                vol.Optional("radius_km", default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=500)
+                ),
+            }
+        )
+
+        return self.async_show_form(step_id="search", data_schema=schema, errors=errors)
+
+    async def async_step_pick(self, user_input=None):
+        """Pick one of the gauges found by the search."""
+        errors = {}
+
+        if user_input is not None:
+            result = await self._async_create_station_entry(user_input, errors)
+            if result is not None:
+                return result
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_STATION): vol.In(self._search_results),
+                **_station_options_schema(),
+            }
+        )
+
+        return self.async_show_form(step_id="pick", data_schema=schema, errors=errors)
+
+    async def async_step_manual(self, user_input=None):
+        """Enter a station ID directly."""
+        errors = {}
+
+        if user_input is not None:
+            result = await self._async_create_station_entry(user_input, errors)
+            if result is not None:
+                return result
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_STATION): str,
+                **_station_options_schema(),
+            }
+        )
 
+        return self.async_show_form(
+            step_id="manual", 
+            data_schema=schema, 
+            errors=errors
+        )
+
+    async def async_step_group(self, user_input=None):
+        """Add many stations as one group entry, from a list or a CSV file."""
+        errors = {}
+        placeholders = {"stations": "", "max_stations": str(GROUP_MAX_STATIONS)}
+
+        if user_input is not None:
+            station_ids = await _async_station_list(self.hass, user_input, errors, placeholders)
+            if station_ids is not None:
                 return self.async_create_entry(
-                    title=f"NWPS {station_id}",
-                    data={CONF_STATION: station_id},
+                    title=user_input.get("name") or f"NWPS group ({len(station_ids)} stations)",
+                    data={CONF_STATIONS: station_ids},
                     options={
                         CONF_PARAMETERS: user_input.get(CONF_PARAMETERS, list(AVAILABLE_PARAMETERS.keys())),
                         "scan_interval": user_input.get("scan_interval", DEFAULT_SCAN_INTERVAL),
+                        CONF_ADAPTIVE_POLLING: user_input.get(CONF_ADAPTIVE_POLLING, False),
                     },
                 )
 
-        # 2. Define schema with parameter selection
-        # Create a simple dict mapping parameter keys to their display names
-        parameter_options = {
-            param_key: param_info.get("name", param_key)
-            for param_key, param_info in AVAILABLE_PARAMETERS.items()
-        }
-        
+        user_input = user_input or {}
         schema = vol.Schema(
             {
-                vol.Required(CONF_STATION): str,
-                vol.Optional(CONF_PARAMETERS, default=list(AVAILABLE_PARAMETERS.keys())): cv.multi_select(parameter_options),
-                vol.Optional("scan_interval", default=DEFAULT_SCAN_INTERVAL): vol.All(
-                    vol.Coerce(int), 
-                    vol.Range(min=60, max=3600)
-                ),
+                vol.Optional("name", default=user_input.get("name", "")): str,
+                vol.Optional(
+                    CONF_STATIONS, default=user_input.get(CONF_STATIONS, "")
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+                vol.Optional(CONF_CSV_FILE, default=user_input.get(CONF_CSV_FILE, "")): str,
+                **_station_options_schema(),
             }
         )
 
         return self.async_show_form(
-            step_id="user", 
-            data_schema=schema, 
-            errors=errors
+            step_id="group",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def _async_create_station_entry(self, user_input, errors):
+        """Validate the chosen station and create its entry.
+
+        Returns None and fills errors if the station is not valid.
+        """
+        # Capitalize station ID for consistency
+        station_id = user_input[CONF_STATION].upper()
+
+        # Validate station ID with NWPS API
+        validation_error = await _validate_station_id(self.hass, station_id)
+        if validation_error:
+            errors.update(validation_error)
+            return None
+
+        # Check for duplicates, including stations in a group
+        await self.async_set_unique_id(station_id)
+        self._abort_if_unique_id_configured()
+        if station_id in _configured_stations(self.hass):
+            return self.async_abort(reason="already_configured")
+
+        return self.async_create_entry(
+            title=f"NWPS {station_id}",
+            data={CONF_STATION: station_id},
+            options={
+                CONF_PARAMETERS: user_input.get(CONF_PARAMETERS, list(AVAILABLE_PARAMETERS.keys())),
+                "scan_interval": user_input.get("scan_interval", DEFAULT_SCAN_INTERVAL),
+                CONF_ADAPTIVE_POLLING: user_input.get(CONF_ADAPTIVE_POLLING, False),
+            },
         )
 
     @staticmethod
@@ -120,8 +358,27 @@ class NWPSOptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        group = CONF_STATIONS in self.config_entry.data
+        errors = {}
+        placeholders = {"stations": "", "max_stations": str(GROUP_MAX_STATIONS)}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if not group:
+                return self.async_create_entry(title="", data=user_input)
+            known = self.config_entry.data[CONF_STATIONS]
+            station_ids = await _async_station_list(
+                self.hass, user_input, errors, placeholders, self.config_entry.entry_id, known
+            )
+            if station_ids is not None:
+                options = {
+                    key: value
+                    for key, value in user_input.items()
+                    if key not in (CONF_STATIONS, CONF_CSV_FILE)
+                }
+                # One update, so the entry reloads once for a new station list
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry, data={CONF_STATIONS: station_ids}, options=options
+                )
+                return self.async_create_entry(title="", data=options)
 
         # Create a simple dict mapping parameter keys to their display names
         parameter_options = {
@@ -136,9 +393,40 @@ class NWPSOptionsFlow(config_entries.OptionsFlow):
         current_interval = self.config_entry.options.get(
             "scan_interval", DEFAULT_SCAN_INTERVAL
         )
+        current_adaptive = self.config_entry.options.get(CONF_ADAPTIVE_POLLING, False)
+        current_timeseries = self.config_entry.options.get(CONF_TIMESERIES, False)
+        current_keep_raw = self.config_entry.options.get(CONF_KEEP_RAW, False)
+        current_profile = self.config_entry.options.get(CONF_PROFILE_UPDATES, False)
+        current_retention = self.config_entry.options.get(
+            CONF_TIMESERIES_RETENTION, DEFAULT_TIMESERIES_RETENTION
+        )
+        current_upstream = self.config_entry.options.get(CONF_TRACK_UPSTREAM, False)
+        current_region = self.config_entry.options.get(CONF_REGION, "")
+        current_statistics = self.config_entry.options.get(CONF_IMPORT_STATISTICS, False)
+        current_nwm = self.config_entry.options.get(CONF_NWM, False)
+        current_bulk = self.config_entry.options.get(CONF_BULK_STATUS, False)
+        current_stage_deadband = self.config_entry.options.get(CONF_STAGE_DEADBAND, 0.0)
+        current_flow_deadband = self.config_entry.options.get(CONF_FLOW_DEADBAND, 0.0)
+        current_staleness = self.config_entry.options.get(
+            CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS
+        )
+
+        fields = {}
+        if group:
+            current_stations = (user_input or {}).get(
+                CONF_STATIONS, "\n".join(self.config_entry.data[CONF_STATIONS])
+            )
+            fields = {
+                vol.Optional(
+                    CONF_STATIONS,
+                    default=current_stations
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+                vol.Optional(CONF_CSV_FILE, default=""): str,
+            }
 
         schema = vol.Schema(
             {
+                **fields,
                 vol.Optional(
                     CONF_PARAMETERS, 
                     default=current_parameters
@@ -147,7 +435,64 @@ class NWPSOptionsFlow(config_entries.OptionsFlow):
                     "scan_interval", 
                     default=current_interval
                 ): vol.All(vol.Coerce(int), vol.Range(min=60, max=3600)),
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING,
+                    default=current_adaptive
+                ): bool,
+                vol.Optional(
+                    CONF_BULK_STATUS,
+                    default=current_bulk
+                ): bool,
+                vol.Optional(
+                    CONF_TIMESERIES,
+                    default=current_timeseries
+                ): bool,
+                vol.Optional(
+                    CONF_TIMESERIES_RETENTION,
+                    default=current_retention
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=30)),
+                vol.Optional(
+                    CONF_IMPORT_STATISTICS,
+                    default=current_statistics
+                ): bool,
+                vol.Optional(
+                    CONF_NWM,
+                    default=current_nwm
+                ): bool,
+                vol.Optional(
+                    CONF_TRACK_UPSTREAM,
+                    default=current_upstream
+                ): bool,
+                vol.Optional(
+                    CONF_REGION,
+                    default=current_region
+                ): str,
+                vol.Optional(
+                    CONF_STAGE_DEADBAND,
+                    default=current_stage_deadband
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Optional(
+                    CONF_FLOW_DEADBAND,
+                    default=current_flow_deadband
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+                vol.Optional(
+                    CONF_MAX_STALENESS,
+                    default=current_staleness
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.25, max=72)),
+                vol.Optional(
+                    CONF_KEEP_RAW,
+                    default=current_keep_raw
+                ): bool,
+                vol.Optional(
+                    CONF_PROFILE_UPDATES,
+                    default=current_profile
+                ): bool,
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=schema)
\ No newline at end of file
+        return self.async_show_form(
+            step_id="init",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders=placeholders,
+        )
\ No newline at end of file
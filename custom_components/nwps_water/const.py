@@ -4,7 +4,110 @@ DOMAIN = "nwps_water"
 DEFAULT_NAME = "NWPS Water"
 DEFAULT_SCAN_INTERVAL = 300  # seconds (5 minutes)
 CONF_STATION = "station_id"
+# Station group entries list many stations under one entry; each station
+# still gets its own device and entities
+CONF_STATIONS = "stations"
+# CSV of station ids, relative to the configuration directory
+CONF_CSV_FILE = "csv_file"
+GROUP_MAX_STATIONS = 500
+# CSV header names recognised as the station id column, lowercase
+STATION_ID_COLUMNS = ("lid", "station", "station_id", "gauge", "gauge_id", "nws_lid")
 CONF_PARAMETERS = "parameters"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+# Keep the raw gauge payload in memory (diagnostics only)
+CONF_KEEP_RAW = "keep_raw_payload"
+# Profile a sample of update cycles with cProfile
+CONF_PROFILE_UPDATES = "profile_updates"
+PROFILE_SAMPLE_EVERY = 10  # profile one cycle in this many
+PROFILE_TOP_N = 25
+# Samples kept per rolling metrics histogram
+METRICS_WINDOW = 256
+# Dispatcher signal sent after every update cycle, formatted with station id
+SIGNAL_METRICS_UPDATED = "nwps_water_metrics_{}"
+# Dispatcher signal sent after options were applied in place, formatted with
+# station id
+SIGNAL_OPTIONS_UPDATED = "nwps_water_options_{}"
+
+# Optional deadbands: smaller changes of a reading do not write a new state
+CONF_STAGE_DEADBAND = "stage_deadband"  # ft
+CONF_FLOW_DEADBAND = "flow_deadband"  # cfs
+DEADBAND_OPTIONS = {
+    "stage": CONF_STAGE_DEADBAND,
+    "forecast_stage": CONF_STAGE_DEADBAND,
+    "flow": CONF_FLOW_DEADBAND,
+    "forecast_flow": CONF_FLOW_DEADBAND,
+}
+
+# Adaptive polling bounds (seconds)
+ADAPTIVE_MIN_INTERVAL = 60
+ADAPTIVE_MAX_INTERVAL = 3600
+# Ceiling on the poll interval while a flood category is action or worse
+ADAPTIVE_FLOOD_INTERVAL = 120
+# NWPS usually publishes an observation a few minutes after its valid time
+ADAPTIVE_PUBLISH_LAG = 180
+# Observation timestamps remembered per station to learn its cadence
+ADAPTIVE_HISTORY = 8
+
+# Domain-wide tuning (optional YAML under `nwps_water:`)
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+# Alternate gauges endpoint, e.g. a local stand-in server for load tests
+CONF_BASE_URL = "base_url"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+# Images and photos queue on their own, so they never hold up gauge polls
+MEDIA_MAX_CONCURRENT_REQUESTS = 2
+REQUEST_TIMEOUT = 30  # seconds
+# Short-lived cache of gauge detail and listing responses shared by the
+# config flow and the coordinators, so adding or reloading a station does
+# not refetch it
+RESPONSE_CACHE_TTL = 30  # seconds; below the shortest poll interval
+RESPONSE_CACHE_MAX_ENTRIES = 64
+RESPONSE_CACHE_MAX_BYTES = 2 * 1024 * 1024  # bodies over a quarter of this are not cached
+# Payloads larger than this are decoded in the executor, off the event loop
+DECODE_EXECUTOR_THRESHOLD = 64 * 1024  # bytes
+
+# hass.data[DOMAIN] keys for domain-wide helpers
+DATA_HUB = "hub"
+DATA_SNAPSHOTS = "snapshots"
+DATA_CATALOGUE = "catalogue"
+DATA_ANALYTICS = "analytics"
+DATA_NETWORK = "network"
+DATA_IMAGES = "images"
+DATA_BREAKER = "breaker"
+DATA_STATISTICS = "statistics"
+DATA_BULK = "bulk"
+DATA_REGIONS = "regions"
+
+# Circuit breaker shared by all stations: opens when this many stations fail
+# within the window, then probes NOAA with one station at growing intervals
+BREAKER_FAILURE_STATIONS = 3
+BREAKER_FAILURE_WINDOW = 600  # seconds
+BREAKER_BASE_BACKOFF = 60  # seconds; doubled per failed probe, with jitter
+BREAKER_MAX_BACKOFF = 1800  # seconds
+BREAKER_PROBE_TIMEOUT = 2 * REQUEST_TIMEOUT  # a probe that never reports is replaced
+
+# How long the last good data is served while NWPS cannot be reached
+CONF_MAX_STALENESS = "max_staleness_hours"
+DEFAULT_MAX_STALENESS = 1  # hours
+
+# Persisted last-good snapshots
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30  # seconds; batches writes across stations
+
+# On-disk cache behind the image entities, shared by every station
+IMAGE_CACHE_DIR = ".cache/nwps_water/images"  # relative to the config dir
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # least recently served images go first
+# Larger images are refused while downloading, so one cannot empty the cache
+IMAGE_MAX_BYTES = 8 * 1024 * 1024
+IMAGE_TIMEOUT = 60  # seconds
+IMAGE_SAVE_DELAY = 60  # seconds; batches cache index writes
+
+# Gauge catalogue used to search for stations in the config flow
+CATALOGUE_TTL = 7 * 24 * 3600  # seconds before a background refresh
+CATALOGUE_TIMEOUT = 120  # seconds; the full listing is several MB
+# The listing is decoded whole, so larger ones are refused while downloading
+CATALOGUE_MAX_BYTES = 64 * 1024 * 1024
+CATALOGUE_GRID_DEGREES = 1.0  # spatial index cell size
+CATALOGUE_SEARCH_LIMIT = 50
 
 # Parameter keys exposed as sensors. Units are typical / normalized to more common units.
 AVAILABLE_PARAMETERS = {
@@ -23,6 +126,208 @@ AVAILABLE_PARAMETERS = {
     "river_mile": {"name": "River Mile", "unit": "mi"},
 }
 
+# Optional hydrograph time-series ingestion from /gauges/{id}/stageflow
+CONF_TIMESERIES = "timeseries"
+CONF_TIMESERIES_RETENTION = "timeseries_retention_days"
+DEFAULT_TIMESERIES_RETENTION = 7  # days
+# Expected spacing of series samples; sizes the ring buffers, which grow
+# for denser gauges (seconds)
+SERIES_SAMPLE_SPACING = 900
+# Window used for rate-of-rise and trend attributes (seconds)
+SERIES_TREND_WINDOW = 3 * 3600
+
+# Optional import of observed history into recorder long-term statistics,
+# as hourly mean/min/max under external ids like nwps_water:coco3_stage
+CONF_IMPORT_STATISTICS = "import_statistics"
+STATISTICS_IMPORT_INTERVAL = 3600  # seconds between incremental imports
+STATISTICS_TIMEOUT = 120  # seconds; the observed history can be large
+# Before the next station, wait while the recorder has more queued tasks
+# than this, polling every STATISTICS_BACKLOG_POLL seconds, up to a limit
+STATISTICS_MAX_BACKLOG = 20
+STATISTICS_BACKLOG_POLL = 1  # seconds
+STATISTICS_BACKLOG_MAX_WAIT = 60  # seconds
+STATISTICS_PARAMETERS = {
+    "stage": {"key": "primary", "name": "Stage", "unit": "ft"},
+    "flow": {"key": "secondary", "name": "Flow", "unit": "cfs"},
+}
+
+# Optional National Water Model streamflow forecasts for the gauge's reach.
+# Keys are the NWPS "series" names; "key" is the block in the payload and
+# "interval" the minimum seconds between (conditional) requests.
+CONF_NWM = "nwm_forecasts"
+NWM_RANGES = {
+    "short_range": {"key": "shortRange", "name": "Short Range", "interval": 1800},
+    "medium_range": {"key": "mediumRange", "name": "Medium Range", "interval": 3 * 3600},
+    "long_range": {"key": "longRange", "name": "Long Range", "interval": 6 * 3600},
+}
+NWM_PERCENTILES = (10, 50, 90)  # lower, median, upper
+# Caps on what one range may hold: members x points float32 values
+NWM_MAX_MEMBERS = 16
+NWM_MAX_POINTS = 720
+NWM_TIMEOUT = 120  # seconds; medium and long range payloads are large
+# Payloads are decoded whole, so larger ones are refused while downloading
+NWM_MAX_PAYLOAD_BYTES = 8 * 1024 * 1024
+# First retry of a failed range; doubles per failure up to its interval
+NWM_RETRY_BACKOFF = 300  # seconds
+
+# Optional bulk status refresh: stations take their observed and forecast
+# status from gauge listing queries by bounding box, shared with every other
+# opted-in station in the same grid cell, instead of their own detail payload
+CONF_BULK_STATUS = "bulk_status"
+BULK_CELL_DEGREES = 2.0  # stations in one grid cell share a listing query
+BULK_MARGIN_DEGREES = 0.01  # padding around each query's bounding box
+BULK_MAX_AGE = 30  # seconds a listing response also serves other stations' polls
+BULK_TICK = 60  # adaptive polls are aligned to this wall-clock period
+BULK_TIMEOUT = 60  # seconds
+
+# Optional upstream gauge tracking along the river network
+CONF_TRACK_UPSTREAM = "track_upstream"
+NETWORK_UPSTREAM_DEPTH = 2  # gauges followed upstream from each station
+# Gauges that are not configured stations are refetched at most this often,
+# so a basin shared by many stations costs one request per gauge per cycle
+NETWORK_REFRESH = 270  # seconds; just under the default scan interval
+
+# Options that add or remove whole groups of entities or shared-helper
+# registrations, with their defaults. Changing one reloads the entry; every
+# other option is applied to the running coordinator and entities in place.
+RELOAD_OPTIONS = {
+    CONF_TIMESERIES: False,
+    CONF_TIMESERIES_RETENTION: DEFAULT_TIMESERIES_RETENTION,
+    CONF_IMPORT_STATISTICS: False,
+    CONF_NWM: False,
+}
+
+# Forecast analytics sensors, created when hydrograph series are tracked
+# Wait before the first pass of a station without results, so the stations
+# of a setup or reload are analysed together
+ANALYTICS_FIRST_PASS_DELAY = 10  # seconds
+ANALYTICS_SENSORS = {
+    "forecast_crest": {"name": "Forecast Crest", "unit": "ft"},
+    "forecast_crest_time": {"name": "Forecast Crest Time", "unit": None},
+    "minor_flood_time": {"name": "Minor Flood Onset", "unit": None},
+    "moderate_flood_time": {"name": "Moderate Flood Onset", "unit": None},
+    "major_flood_time": {"name": "Major Flood Onset", "unit": None},
+    "stage_rate_of_rise": {"name": "Stage Rate of Rise", "unit": "ft/h"},
+}
+
+# Per-station fetch/parse metrics exposed as diagnostic sensors
+DIAGNOSTIC_SENSORS = {
+    "http_latency": {"name": "HTTP Latency", "unit": "ms"},
+    "payload_bytes": {"name": "Payload Size", "unit": "B"},
+    "parse_time": {"name": "Parse Time", "unit": "ms"},
+    "unchanged_hits": {"name": "Unchanged Payloads", "unit": None},
+    "stale_serves": {"name": "Stale Data Serves", "unit": None},
+    "consecutive_failures": {"name": "Consecutive Failures", "unit": None},
+}
+
+# Flood categories that count as active (action is a pre-flood stage)
+ACTIVE_FLOOD_CATEGORIES = ("action", "minor", "moderate", "major")
+# Categories from least to most severe; others (e.g. not_defined) rank below
+FLOOD_CATEGORY_ORDER = ("no_flooding", "action", "minor", "moderate", "major")
+
+# Regional flood summaries across every configured station. Stations are
+# grouped by their entry's region option, or by their state without one.
+# Names that slugify alike ("Upper Basin", "upper-basin") are one region.
+CONF_REGION = "region"
+# Categories counted as in flood; action is a pre-flood stage
+IN_FLOOD_CATEGORIES = ("minor", "moderate", "major")
+REGION_SENSORS = {
+    "observed_category": {"name": "Highest Observed Flood Category", "icon": "mdi:alert-circle"},
+    "forecast_category": {"name": "Highest Forecast Flood Category", "icon": "mdi:alert-circle-outline"},
+    "stations_in_flood": {"name": "Stations in Flood", "icon": "mdi:home-flood"},
+}
+
+# Declarative extraction table for the gauge payload, keyed by snapshot field.
+# "paths" are tried in order. "kind" selects the conversion:
+#   text    - raw value; with several paths the first truthy one wins
+#   float   - float() or None
+#   reading - float() with -999 sentinels dropped, scaled to base units when
+#             the value at "unit_path" has a kilo prefix (kcfs -> cfs)
+#   photos  - GeoJSON photo features reduced to url / caption / date dicts
+_OBSERVED = ("status", "observed")
+_FORECAST = ("status", "forecast")
+_HYDROGRAPH = ("images", "hydrograph")
+_PROBABILITY = ("images", "probability")
+FIELD_SPECS = {
+    "name": {"paths": (("name",), ("description",)), "kind": "text"},
+    "stage": {"paths": (_OBSERVED + ("primary",),), "kind": "reading"},
+    "flow": {
+        "paths": (_OBSERVED + ("secondary",),),
+        "kind": "reading",
+        "unit_path": _OBSERVED + ("secondaryUnit",),
+    },
+    "forecast_stage": {"paths": (_FORECAST + ("primary",),), "kind": "reading"},
+    "forecast_flow": {
+        "paths": (_FORECAST + ("secondary",),),
+        "kind": "reading",
+        "unit_path": _FORECAST + ("secondaryUnit",),
+    },
+    "observed_flood_category": {
+        "paths": (_OBSERVED + ("floodCategory",), ("ObservedFloodCategory",)),
+        "kind": "text",
+    },
+    "forecast_flood_category": {
+        "paths": (_FORECAST + ("floodCategory",), ("ForecastFloodCategory",)),
+        "kind": "text",
+    },
+    "flood_minor_stage": {"paths": (("flood", "categories", "minor", "stage"),), "kind": "float"},
+    "flood_moderate_stage": {"paths": (("flood", "categories", "moderate", "stage"),), "kind": "float"},
+    "flood_major_stage": {"paths": (("flood", "categories", "major", "stage"),), "kind": "float"},
+    "latitude": {"paths": (("latitude",),), "kind": "float"},
+    "longitude": {"paths": (("longitude",),), "kind": "float"},
+    "elevation": {"paths": (("elevation",),), "kind": "float"},
+    "river_mile": {"paths": (("riverMile",),), "kind": "float"},
+    "state": {"paths": (("state", "abbreviation"),), "kind": "text"},
+    "observed_time": {"paths": (_OBSERVED + ("validTime",),), "kind": "text"},
+    "upstream_lid": {"paths": (("upstreamLid",),), "kind": "text"},
+    "downstream_lid": {"paths": (("downstreamLid",),), "kind": "text"},
+    "reach_id": {"paths": (("reachId",),), "kind": "text"},
+    "hydrograph_image": {
+        "paths": (_HYDROGRAPH + ("default",), _HYDROGRAPH + ("floodcat",)),
+        "kind": "text",
+    },
+    "floodcat_image": {"paths": (_HYDROGRAPH + ("floodcat",),), "kind": "text"},
+    "probability_stage_week": {"paths": (_PROBABILITY + ("weekint", "stage"),), "kind": "text"},
+    "probability_flow_week": {"paths": (_PROBABILITY + ("weekint", "flow"),), "kind": "text"},
+    "short_range_probability_image": {"paths": (_PROBABILITY + ("shortrange",),), "kind": "text"},
+    "photos": {"paths": (("images", "photos"),), "kind": "photos"},
+}
+
+# Two refresh tiers. The status fields are parsed from every changed payload
+# (and are all the gauges listing carries); the other FIELD_SPECS fields are
+# metadata, parsed only on a metadata refresh every METADATA_TTL or on demand.
+STATUS_FIELDS = (
+    "stage",
+    "flow",
+    "forecast_stage",
+    "forecast_flow",
+    "observed_flood_category",
+    "forecast_flood_category",
+    "observed_time",
+)
+METADATA_TTL = 24 * 3600  # seconds; stretched by up to a quarter by poll phase
+# Sensor parameters backed by metadata fields
+METADATA_PARAMETERS = (
+    "flood_minor_stage",
+    "flood_moderate_stage",
+    "flood_major_stage",
+    "latitude",
+    "longitude",
+    "elevation",
+    "river_mile",
+)
+SERVICE_REFRESH_METADATA = "refresh_metadata"
+
+# Image entities proxying the NOAA graphics, keyed by snapshot field. Each
+# photo in the payload's photo list adds a "photo_<n>" entity.
+IMAGES = {
+    "hydrograph_image": {"name": "Hydrograph", "enabled": True},
+    "floodcat_image": {"name": "Flood Category Hydrograph", "enabled": False},
+    "probability_stage_week": {"name": "Weekly Stage Probability", "enabled": False},
+    "probability_flow_week": {"name": "Weekly Flow Probability", "enabled": False},
+    "short_range_probability_image": {"name": "Short Range Probability", "enabled": False},
+}
+
 # Binary sensor keys
 BINARY_SENSORS = {
     "observed_flood": "Observed Flood Active",
@@ -2,257 +2,722 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
+import math
+import statistics
+import time
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Mapping, Optional, Tuple, TypeVar
 
+import aiohttp
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .const import NWPS_BASE
+from .const import (
+    ACTIVE_FLOOD_CATEGORIES,
+    ADAPTIVE_FLOOD_INTERVAL,
+    ADAPTIVE_HISTORY,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_PUBLISH_LAG,
+    AVAILABLE_PARAMETERS,
+    BULK_TICK,
+    CONF_ADAPTIVE_POLLING,
+    CONF_BULK_STATUS,
+    CONF_IMPORT_STATISTICS,
+    CONF_KEEP_RAW,
+    CONF_NWM,
+    CONF_MAX_STALENESS,
+    CONF_PARAMETERS,
+    CONF_PROFILE_UPDATES,
+    CONF_REGION,
+    CONF_TIMESERIES,
+    CONF_TIMESERIES_RETENTION,
+    CONF_TRACK_UPSTREAM,
+    DECODE_EXECUTOR_THRESHOLD,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TIMESERIES_RETENTION,
+    METADATA_TTL,
+    NETWORK_UPSTREAM_DEPTH,
+    PROFILE_SAMPLE_EVERY,
+    SIGNAL_METRICS_UPDATED,
+    SIGNAL_OPTIONS_UPDATED,
+)
+from .breaker import STATE_CLOSED, get_circuit_breaker
+from .bulk import NWPSBulkStatus, get_bulk_status
+from .analytics import (
+    AnalyticsInput,
+    ForecastAnalytics,
+    analytics_input_from_series,
+    get_analytics_batcher,
+)
+from .hub import NWPSApiError, NWPSError, NWPSNotFoundError, get_hub
+from .instrumentation import CycleProfiler, StationMetrics
+from .models import StationSnapshot
+from .network import UpstreamGauge, get_river_network
+from .nwm import StationNWM
+from .parser import decode_station, parse_status
+from .regions import get_region_summary
+from .statistics import get_statistics_importer
+from .store import NWPSSnapshotStore
+from .timeseries import StationSeries
+
+if TYPE_CHECKING:
+    from .group import NWPSStationGroup
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def _to_float_safe(value: Any) -> Optional[float]:
-    try:
-        return float(value)
-    except Exception:
-        return None
-
-
-def _is_valid_reading(value: Optional[float]) -> bool:
-    """Check if a reading is valid (not a sentinel/error value).
-    
-    NWPS API uses -999 to indicate missing or invalid data.
-    """
-    if value is None:
-        return False
-    # Common NWPS sentinel values for missing/invalid data
-    if value in (-999, -999.0):
-        return False
-    return True
-
-
-def _k_prefix_to_multiplier(unit: Optional[str]) -> float:
-    """Return multiplier if unit includes a kilo prefix (e.g., 'kcfs' => 1000)."""
-    if not unit:
-        return 1.0
-    unit_lower = unit.lower()
-    # common NWPS example used "kcfs" for thousands of cfs
-    if "kcfs" in unit_lower or unit_lower.startswith("k"):
-        return 1000.0
-    return 1.0
+_T = TypeVar("_T")
 
 
 class NWPSDataCoordinator(DataUpdateCoordinator):
     """Fetch data from NWPS API and expose parsed results."""
 
-    def __init__(self, hass: HomeAssistant, station_id: str, entry: ConfigEntry):
-        """Initialize coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        station_id: str,
+        entry: ConfigEntry,
+        group: Optional[NWPSStationGroup] = None,
+    ):
+        """Initialize coordinator.
+
+        Stations of a group entry are polled by the group's shared timer.
+        """
         self.hass = hass
         self.station_id = station_id
         self.entry = entry
-        
-        # Pull parameters and interval directly from the entry options
-        from .const import CONF_PARAMETERS, DEFAULT_SCAN_INTERVAL, AVAILABLE_PARAMETERS
-        
-        self.parameters = entry.options.get(
-            CONF_PARAMETERS, 
-            list(AVAILABLE_PARAMETERS.keys())
-        )
-        update_interval = entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-
-        self.session = async_get_clientsession(hass)
+        self._group = group
+        # Parameters, interval and the other options that can change while
+        # running; see async_apply_options
+        self._load_options(entry.options)
+
+        # All requests go through the shared hub, which also staggers polls
+        self._hub = get_hub(hass)
+        self._hub.register_station(station_id)
+        entry.async_on_unload(partial(self._hub.unregister_station, station_id))
+        # Shared breaker that pauses every station's requests during an outage
+        self._breaker = get_circuit_breaker(hass)
+        self._breaker.async_register(station_id)
+        entry.async_on_unload(partial(self._breaker.async_unregister, station_id))
+        self.stale = False
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"nwps_{station_id}",
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=timedelta(seconds=self._scan_interval),
+            # Unchanged payloads return the previous dict, so skip the fan-out
+            always_update=False,
         )
 
-        self.raw: Dict[str, Any] = {}
+        self.raw: Optional[Dict[str, Any]] = None
         self._last_successful_update: Optional[datetime] = None
-        self._cached_data: Optional[Dict[str, Any]] = None
+        # Last good snapshot; the same object HA holds in self.data
+        self._cached_data: Optional[StationSnapshot] = None
+        # Validators and content hash of the payload behind _cached_data
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._payload_digest: Optional[bytes] = None
+        # Hash of the payload metadata was last parsed from
+        self._metadata_digest: Optional[bytes] = None
+        # Metadata tier: time.monotonic() of the last full parse, and
+        # whether one was requested before the TTL is up
+        self._metadata_fetched = -math.inf
+        self._metadata_requested = False
+        # Status from shared gauge listing queries instead of the detail payload
+        self._bulk: Optional[NWPSBulkStatus] = None
+        self._async_set_bulk(entry.options.get(CONF_BULK_STATUS, False))
+        # Once, whatever the option is toggled to while running
+        entry.async_on_unload(partial(self._async_set_bulk, False))
+        # Recent distinct observation times and polls since the last new one
+        self._observation_times: deque[datetime] = deque(maxlen=ADAPTIVE_HISTORY)
+        self._quiet_polls = 0
+        # Optional hydrograph series ingested from /stageflow
+        self.series: Optional[StationSeries] = None
+        if entry.options.get(CONF_TIMESERIES, False):
+            self.series = StationSeries(
+                entry.options.get(CONF_TIMESERIES_RETENTION, DEFAULT_TIMESERIES_RETENTION)
+            )
+        self._series_etag: Optional[str] = None
+        # Crest / flood onset / rate of rise, computed in batches across stations
+        self.analytics: Optional[ForecastAnalytics] = None
+        self._analytics_batcher = get_analytics_batcher(hass)
+        if self.series is not None:
+            self._analytics_batcher.async_register(self)
+            entry.async_on_unload(partial(self._analytics_batcher.async_unregister, station_id))
+        # Gauges upstream along the river, refreshed after each update
+        self._network = get_river_network(hass)
+        self.upstream: Tuple[UpstreamGauge, ...] = ()
+        self._upstream_task: Optional[asyncio.Task] = None
+        # National Water Model forecasts for the gauge's reach
+        self.nwm: Optional[StationNWM] = StationNWM() if entry.options.get(CONF_NWM, False) else None
+        self._nwm_task: Optional[asyncio.Task] = None
+        self._snapshot_store: Optional[NWPSSnapshotStore] = None
+        self.metrics = StationMetrics()
+        self._cycles = 0
+
+        self._network.async_register(self)
+        entry.async_on_unload(partial(self._network.async_unregister, station_id))
+        # Regional flood summary, told of every change in flood category
+        self._regions = get_region_summary(hass)
+        entry.async_on_unload(partial(self._regions.async_remove_station, station_id))
+
+        # Hourly long-term statistics imported from the observed history
+        if entry.options.get(CONF_IMPORT_STATISTICS, False) and "recorder" in hass.config.components:
+            importer = get_statistics_importer(hass)
+            importer.async_register(self)
+            entry.async_on_unload(partial(importer.async_unregister, station_id))
+
+    def _load_options(self, options: Mapping[str, Any]) -> None:
+        """Read the options that take effect without a reload."""
+        self.options = dict(options)
+        self.parameters = options.get(CONF_PARAMETERS, list(AVAILABLE_PARAMETERS.keys()))
+        self._scan_interval = options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+        self._adaptive = options.get(CONF_ADAPTIVE_POLLING, False)
+        self._keep_raw = options.get(CONF_KEEP_RAW, False)
+        self._profile_updates = options.get(CONF_PROFILE_UPDATES, False)
+        # Last good data is served for this long after updates start failing
+        self._max_staleness = 3600 * options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS)
+        self._track_upstream = options.get(CONF_TRACK_UPSTREAM, False)
+        # Region of the flood summaries; the station's state when empty
+        self._region = options.get(CONF_REGION, "").strip()
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options to the running coordinator.
+
+        The parsed data is kept and nothing is refetched: a new interval
+        only moves the next poll, and the sensor platform adds or removes
+        parameter sensors on SIGNAL_OPTIONS_UPDATED.
+        """
+        timing = (self._scan_interval, self._adaptive, self._bulk is not None)
+        self._load_options(options)
+        if not self._keep_raw:
+            self.raw = None
+        if not self._track_upstream and self.upstream:
+            self.upstream = ()
+            self.async_update_listeners()
+        self._async_set_bulk(options.get(CONF_BULK_STATUS, False))
+        self._async_update_region()
+        if (self._scan_interval, self._adaptive, self._bulk is not None) != timing:
+            self.update_interval = timedelta(seconds=self._next_poll_delay())
+            self._schedule_refresh()
+        async_dispatcher_send(self.hass, SIGNAL_OPTIONS_UPDATED.format(self.station_id))
+
+    @callback
+    def _async_set_bulk(self, enabled: bool) -> None:
+        """Join or leave the shared gauge listing queries."""
+        if enabled == (self._bulk is not None):
+            return
+        if not enabled:
+            self._bulk.async_unregister(self.station_id)
+            self._bulk = None
+            return
+        self._bulk = get_bulk_status(self.hass)
+        self._bulk.async_register(self.station_id)
+        if self._cached_data is not None:
+            self._bulk.async_locate(
+                self.station_id, self._cached_data.latitude, self._cached_data.longitude
+            )
+
+    @callback
+    def _async_update_region(self) -> None:
+        """Report the station's flood categories to the regional summary."""
+        data = self._cached_data
+        if data is None:
+            return
+        self._regions.async_update_station(
+            self.station_id,
+            self.entry.entry_id,
+            self._region or data.state or None,
+            data.observed_flood_category,
+            data.forecast_flood_category,
+        )
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll, on the group's timer for group stations."""
+        if self._group is None:
+            super()._schedule_refresh()
+        elif self.update_interval is not None:
+            self._group.async_schedule(self.station_id, self.update_interval.total_seconds())
+
+    @callback
+    def _unschedule_refresh(self) -> None:
+        """Cancel the next poll."""
+        if self._group is not None:
+            self._group.async_unschedule(self.station_id)
+        super()._unschedule_refresh()
+
+    @property
+    def scan_interval(self) -> float:
+        """Return the configured update interval in seconds."""
+        return self._scan_interval
+
+    @property
+    def last_successful_update(self) -> Optional[datetime]:
+        """Return when NWPS data was last fetched successfully."""
+        return self._last_successful_update
 
     def get_device_name(self) -> str:
         """Get the device name for this station."""
-        if self.data:
-            station_name = self.data.get("_device", {}).get("name")
-            if station_name:
-                return f"{self.station_id} - {station_name}"
+        if self.data and self.data.name:
+            return f"{self.station_id} - {self.data.name}"
         return self.station_id
 
-    async def _async_update_data(self) -> dict:
-        """Fetch and parse NWPS station JSON into a normalized dict."""
+    def restore_snapshot(self, store: NWPSSnapshotStore) -> bool:
+        """Hydrate from the persisted last-good snapshot.
+
+        Returns True if a snapshot was restored, in which case the first
+        network refresh can run in the background.
+        """
+        self._snapshot_store = store
+        snapshot = store.get(self.station_id)
+        if not snapshot:
+            return False
+        updated = dt_util.parse_datetime(snapshot.get("updated") or "")
+        if updated is None:
+            return False
+        self.data = self._cached_data = StationSnapshot.from_dict(snapshot["data"])
+        self._last_successful_update = updated
+        self._etag = snapshot.get("etag")
+        self._last_modified = snapshot.get("last_modified")
+        digest = snapshot.get("digest")
+        self._payload_digest = bytes.fromhex(digest) if digest else None
+        digest = snapshot.get("metadata_digest")
+        # Snapshots from before a metadata field was added are parsed again
+        if digest and all(f.name in snapshot["data"] for f in dataclasses.fields(StationSnapshot)):
+            self._metadata_digest = bytes.fromhex(digest)
+        self._network.async_learn(self.station_id, self._cached_data)
+        self._async_update_region()
+        if self._bulk is not None:
+            self._bulk.async_locate(
+                self.station_id, self._cached_data.latitude, self._cached_data.longitude
+            )
+        _LOGGER.debug(
+            "Restored NWPS station %s from snapshot taken %s", self.station_id, updated
+        )
+        return True
+
+    def _persist_snapshot(self, parsed: StationSnapshot) -> None:
+        """Queue the parsed data for the next batched snapshot write."""
+        if self._snapshot_store is None:
+            return
+        self._snapshot_store.async_save_snapshot(
+            self.station_id,
+            {
+                "data": parsed.as_dict(),
+                "updated": self._last_successful_update.isoformat(),
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "digest": self._payload_digest.hex() if self._payload_digest else None,
+                "metadata_digest": self._metadata_digest.hex() if self._metadata_digest else None,
+            },
+        )
+
+    async def _async_update_data(self) -> StationSnapshot:
+        """Fetch station data, then line the next poll up with its phase slot."""
+        self._cycles += 1
+        sampled = self._profile_updates and self._cycles % PROFILE_SAMPLE_EVERY == 1
         try:
-            url = f"{NWPS_BASE}/{self.station_id}"
-            _LOGGER.debug("Fetching NWPS station URL: %s", url)
-            
-            try:
-                async with asyncio.timeout(30):
-                    async with self.session.get(url) as resp:
-                        if resp.status == 404:
-                            raise UpdateFailed(
-                                f"Station {self.station_id} not found. "
-                                "Please verify the station ID is correct."
-                            )
-                        if resp.status != 200:
-                            text = await resp.text()
-                            raise UpdateFailed(
-                                f"NWPS API returned HTTP {resp.status}: {text[:200]}"
-                            )
-                        station_json = await resp.json()
-            except asyncio.TimeoutError as err:
-                raise UpdateFailed(
-                    f"Timeout while fetching NWPS data for station {self.station_id}"
-                ) from err
-            except UpdateFailed:
-                raise
-            except Exception as exc:
+            with CycleProfiler(self.metrics, self.name) if sampled else nullcontext():
+                data = await self._async_fetch_station()
+            if self._track_upstream:
+                self._async_schedule_upstream_refresh()
+            if self.nwm is not None and data.reach_id:
+                self._async_schedule_nwm_refresh(data.reach_id)
+            return data
+        finally:
+            async_dispatcher_send(self.hass, SIGNAL_METRICS_UPDATED.format(self.station_id))
+            self.update_interval = timedelta(seconds=self._next_poll_delay())
+
+    def _next_poll_delay(self) -> float:
+        """Return seconds until the next poll, lined up with the station's slot."""
+        if self._adaptive:
+            delay = self._adaptive_poll_delay()
+            if self._bulk is not None:
+                delay = self._bulk.next_poll_delay(delay, BULK_TICK)
+            return delay
+        if self._bulk is not None:
+            # Every bulk station with this interval polls on the same
+            # tick, so each listing query is sent once per interval
+            return self._bulk.next_poll_delay(self._scan_interval / 2, self._scan_interval)
+        return self._hub.next_poll_delay(self.station_id, self._scan_interval)
+
+    async def _async_update_series(self, parsed: StationSnapshot) -> None:
+        """Pull new hydrograph points and attach trend data to `parsed`.
+
+        Series failures are logged but never fail the station update.
+        """
+        url = f"{self._hub.station_url(self.station_id)}/stageflow"
+        try:
+            resp = await self._hub.async_get(url, etag=self._series_etag)
+            if not resp.not_modified:
+                added = self.series.ingest(await self._hub.async_decode(resp))
+                self._series_etag = resp.etag
+                if added:
+                    self._analytics_batcher.async_schedule(self)
+                _LOGGER.debug(
+                    "Ingested %s hydrograph points for station %s", added, self.station_id
+                )
+        except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+            _LOGGER.warning(
+                "Could not update hydrograph series for station %s: %s",
+                self.station_id,
+                err,
+            )
+        parsed.stage_trend = self.series.trend_attributes("stage")
+        parsed.flow_trend = self.series.trend_attributes("flow")
+
+    def analytics_input(self) -> Optional[AnalyticsInput]:
+        """Return this station's input for the forecast analytics batch."""
+        if self.series is None or self._cached_data is None:
+            return None
+        data = self._cached_data
+        return analytics_input_from_series(
+            self.series,
+            (data.flood_minor_stage, data.flood_moderate_stage, data.flood_major_stage),
+        )
+
+    @callback
+    def async_set_analytics(self, analytics: ForecastAnalytics) -> None:
+        """Store a batch result and let the entities pick it up."""
+        self.analytics = analytics
+        self.async_update_listeners()
+
+    @callback
+    def _async_schedule_upstream_refresh(self) -> None:
+        """Refresh the upstream gauges without holding up this update."""
+        if self._upstream_task is not None and not self._upstream_task.done():
+            return
+        self._upstream_task = self.entry.async_create_background_task(
+            self.hass,
+            self._async_update_upstream(),
+            f"{self.name} upstream gauges",
+        )
+
+    async def _async_update_upstream(self) -> None:
+        """Look up the upstream gauges and notify entities if they changed."""
+        upstream = await self._network.async_upstream(self.station_id, NETWORK_UPSTREAM_DEPTH)
+        # Tracking may have been switched off while the lookup ran
+        if self._track_upstream and upstream != self.upstream:
+            self.upstream = upstream
+            self.async_update_listeners()
+
+    @callback
+    def _async_schedule_nwm_refresh(self, reach_id: str) -> None:
+        """Refresh the NWM forecasts that are due without holding up this update."""
+        if self._nwm_task is not None and not self._nwm_task.done():
+            return
+        if self._breaker.state != STATE_CLOSED:
+            return
+        self._nwm_task = self.entry.async_create_background_task(
+            self.hass,
+            self._async_update_nwm(reach_id),
+            f"{self.name} NWM forecasts",
+        )
+
+    async def _async_update_nwm(self, reach_id: str) -> None:
+        """Fetch new NWM issuances and notify entities if a summary changed."""
+        if await self.nwm.async_update(self.hass, self._hub, reach_id):
+            self.async_update_listeners()
+
+    def _record_observation(self, valid_time: Optional[str]) -> None:
+        """Track observation timestamps so the gauge's cadence can be learned."""
+        observed_at = dt_util.parse_datetime(valid_time) if valid_time else None
+        if observed_at is None or (
+            self._observation_times and observed_at <= self._observation_times[-1]
+        ):
+            self._quiet_polls += 1
+            return
+        self._observation_times.append(observed_at)
+        self._quiet_polls = 0
+
+    def _observation_cadence(self) -> Optional[float]:
+        """Return the median seconds between observations, if known."""
+        times = self._observation_times
+        gaps = [
+            (later - earlier).total_seconds()
+            for earlier, later in zip(times, list(times)[1:])
+        ]
+        gaps = [gap for gap in gaps if gap > 0]
+        return statistics.median(gaps) if gaps else None
+
+    def _adaptive_poll_delay(self) -> float:
+        """Return seconds until the next poll in adaptive mode.
+
+        Polls land just after the next expected observation. Quiet gauges
+        back off exponentially, and an action-or-worse flood category caps
+        the interval at ADAPTIVE_FLOOD_INTERVAL.
+        """
+        cadence = self._observation_cadence()
+        # Spread stations that share a cadence across the publish window
+        lag = ADAPTIVE_PUBLISH_LAG * (1 + self._hub.phase_fraction(self.station_id))
+        delay: float = self._scan_interval
+        if cadence is not None:
+            next_expected = self._observation_times[-1] + timedelta(seconds=cadence + lag)
+            delay = (next_expected - dt_util.utcnow()).total_seconds()
+            if delay <= 0:
+                # Observation is overdue; back off while the gauge stays quiet
+                delay = self._scan_interval * 2 ** min(self._quiet_polls, 4)
+
+        data = self._cached_data
+        flooding = data is not None and any(
+            str(category or "").lower() in ACTIVE_FLOOD_CATEGORIES
+            for category in (data.observed_flood_category, data.forecast_flood_category)
+        )
+        if flooding:
+            delay = min(delay, ADAPTIVE_FLOOD_INTERVAL)
+
+        return max(ADAPTIVE_MIN_INTERVAL, min(delay, ADAPTIVE_MAX_INTERVAL))
+
+    @property
+    def data_age(self) -> Optional[float]:
+        """Return seconds since NWPS data was last fetched successfully."""
+        if self._last_successful_update is None:
+            return None
+        return (dt_util.utcnow() - self._last_successful_update).total_seconds()
+
+    def staleness_attributes(self) -> Dict[str, Any]:
+        """Return the attributes entities add while serving stale data."""
+        if not self.stale or self._last_successful_update is None:
+            return {}
+        return {"stale": True, "data_as_of": self._last_successful_update.isoformat()}
+
+    @callback
+    def _async_set_stale(self, stale: bool) -> None:
+        """Flag stale data and notify entities when that changes.
+
+        The snapshot object is the same either way, so the coordinator
+        would not notify entities on its own.
+        """
+        if stale != self.stale:
+            self.stale = stale
+            self.async_update_listeners()
+
+    async def _async_request(self, request: Awaitable[_T]) -> _T:
+        """Await a hub request, reporting failures to the circuit breaker.
+
+        Successes are recorded by the caller, and only for answers NOAA
+        sent just now: a cached response says nothing about an outage.
+        Raises UpdateFailed for every request error.
+        """
+        try:
+            return await request
+        except NWPSNotFoundError as err:
+            # Specific to this station: neither an outage nor a sign of recovery
+            raise UpdateFailed(
+                f"Station {self.station_id} not found. "
+                "Please verify the station ID is correct."
+            ) from err
+        except NWPSApiError as err:
+            # Other 4xx are about the request, not NOAA's health: neutral
+            if err.status >= 500 or err.status == 429:
+                self._breaker.async_record_failure(self.station_id)
+            raise UpdateFailed(str(err)) from err
+        except asyncio.TimeoutError as err:
+            self._breaker.async_record_failure(self.station_id)
+            raise UpdateFailed(
+                f"Timeout while fetching NWPS data for station {self.station_id}"
+            ) from err
+        except Exception as exc:
+            if isinstance(exc, aiohttp.ClientError):
+                self._breaker.async_record_failure(self.station_id)
+            raise UpdateFailed(
+                f"Error fetching NWPS station data: {exc}"
+            ) from exc
+
+    def _metadata_due(self) -> bool:
+        """Return True if this poll should parse the full payload.
+
+        Otherwise only the status fields are parsed. Metadata is refreshed
+        first, on request, and then every METADATA_TTL, stretched by up to a
+        quarter by the station's phase so stations do not all refresh at once.
+        """
+        if self._cached_data is None or self._metadata_requested:
+            return True
+        due = METADATA_TTL * (1 + self._hub.phase_fraction(self.station_id) / 4)
+        return time.monotonic() - self._metadata_fetched >= due
+
+    async def async_refresh_metadata(self) -> None:
+        """Refresh now, parsing thresholds, location and images again."""
+        self._metadata_requested = True
+        await self.async_request_refresh()
+
+    async def _async_fetch_station(self) -> StationSnapshot:
+        """Fetch and parse NWPS station JSON into a snapshot."""
+        try:
+            url = self._hub.station_url(self.station_id)
+
+            if not self._breaker.async_allow(self.station_id):
                 raise UpdateFailed(
-                    f"Error fetching NWPS station data: {exc}"
-                ) from exc
-
-            self.raw = station_json
-
-            parsed: Dict[str, Any] = {}
-
-            # Device / station metadata
-            device: Dict[str, Any] = {}
-            device["station_id"] = station_json.get("lid") or station_json.get("id")
-            device["name"] = station_json.get("name") or station_json.get("description")
-            device["latitude"] = station_json.get("latitude")
-            device["longitude"] = station_json.get("longitude")
-            device["description"] = station_json.get("description")
-            device["dataAttribution"] = station_json.get("dataAttribution")
-
-            # Status block contains observed and forecast values (as in sample JSON)
-            status = station_json.get("status", {})
-            observed = status.get("observed") or {}
-            forecast = status.get("forecast") or {}
-
-            # Observed primary/secondary
-            obs_primary = _to_float_safe(observed.get("primary"))
-            obs_primary_unit = observed.get("primaryUnit")
-            obs_secondary = _to_float_safe(observed.get("secondary"))
-            obs_secondary_unit = observed.get("secondaryUnit")
-
-            # Forecast primary/secondary
-            fcst_primary = _to_float_safe(forecast.get("primary"))
-            fcst_primary_unit = forecast.get("primaryUnit")
-            fcst_secondary = _to_float_safe(forecast.get("secondary"))
-            fcst_secondary_unit = forecast.get("secondaryUnit")
-
-            # Convert secondary (often flow) if unit uses kilo prefix
-            obs_secondary_multiplier = _k_prefix_to_multiplier(obs_secondary_unit)
-            fcst_secondary_multiplier = _k_prefix_to_multiplier(fcst_secondary_unit)
-
-            # Map to normalized keys - only include valid readings (not sentinel values)
-            parsed["stage"] = obs_primary if _is_valid_reading(obs_primary) else None
-            parsed["stage_unit"] = obs_primary_unit
-            parsed["flow"] = (obs_secondary * obs_secondary_multiplier) if (obs_secondary is not None and _is_valid_reading(obs_secondary)) else None
-            parsed["flow_unit"] = "cfs" if (obs_secondary is not None and _is_valid_reading(obs_secondary)) else obs_secondary_unit
-
-            parsed["forecast_stage"] = fcst_primary if _is_valid_reading(fcst_primary) else None
-            parsed["forecast_stage_unit"] = fcst_primary_unit
-            parsed["forecast_flow"] = (fcst_secondary * fcst_secondary_multiplier) if (fcst_secondary is not None and _is_valid_reading(fcst_secondary)) else None
-            parsed["forecast_flow_unit"] = "cfs" if (fcst_secondary is not None and _is_valid_reading(fcst_secondary)) else fcst_secondary_unit
-
-            # Flood categories and thresholds
-            parsed["observed_flood_category"] = observed.get("floodCategory") or station_json.get("ObservedFloodCategory")
-            parsed["forecast_flood_category"] = forecast.get("floodCategory") or station_json.get("ForecastFloodCategory")
-            parsed["flood_thresholds"] = station_json.get("flood", {}).get("categories", {})
-            
-            # Parse individual flood threshold values
-            flood_categories = station_json.get("flood", {}).get("categories", {})
-            parsed["flood_minor_stage"] = _to_float_safe(flood_categories.get("minor", {}).get("stage"))
-            parsed["flood_moderate_stage"] = _to_float_safe(flood_categories.get("moderate", {}).get("stage"))
-            parsed["flood_major_stage"] = _to_float_safe(flood_categories.get("major", {}).get("stage"))
-            
-            # GPS coordinates and other metadata
-            parsed["latitude"] = _to_float_safe(station_json.get("latitude"))
-            parsed["longitude"] = _to_float_safe(station_json.get("longitude"))
-            parsed["elevation"] = _to_float_safe(station_json.get("elevation"))
-            parsed["river_mile"] = _to_float_safe(station_json.get("riverMile"))
-
-            # Images (hydrograph, floodcat, probabilistic, short range)
-            images = station_json.get("images", {}) or {}
-            hydrograph = images.get("hydrograph", {}) or {}
-            parsed["hydrograph_image"] = hydrograph.get("default") or hydrograph.get("floodcat")
-            parsed["floodcat_image"] = hydrograph.get("floodcat")
-            # probabilistic images
-            prob = images.get("probability", {}) or {}
-            weekint = prob.get("weekint", {}) or {}
-            parsed["probability_stage_week"] = weekint.get("stage")
-            parsed["probability_flow_week"] = weekint.get("flow")
-            parsed["short_range_probability_image"] = images.get("probability", {}).get("shortrange") or images.get("probability", {}).get("shortrange")
-
-            # Photos - provide first photo url if available
-            photos = images.get("photos") or station_json.get("images", {}).get("photos") or []
-            if isinstance(photos, list) and photos:
-                first = photos[0]
-                # In sample photos are GeoJSON-like features with properties.image
-                photo_url = None
-                caption = None
-                if isinstance(first, dict):
-                    props = first.get("properties") or {}
-                    photo_url = props.get("image") or first.get("image")
-                    caption = props.get("caption")
-                parsed["photo_url"] = photo_url
-                parsed["photo_caption"] = caption
-
-            parsed["_device"] = device
-            parsed["_raw"] = station_json
-
-            _LOGGER.debug("Parsed NWPS data keys: %s", list(parsed.keys()))
-            _LOGGER.debug("Parsed flow value: %s", parsed.get("flow"))
-
-            # Update successful fetch tracking
-            self._last_successful_update = dt_util.utcnow()
-            self._cached_data = parsed
-
-            return parsed
+                    "NWPS requests are paused after failures across stations"
+                )
+
+            # The listing only has status, so metadata needs the detail payload
+            full = self._metadata_due()
+            if self._bulk is not None and not full:
+                status, answered = await self._async_request(
+                    self._bulk.async_status(self.station_id)
+                )
+                if answered:
+                    self._breaker.async_record_success(self.station_id)
+                if status is not None:
+                    return await self._async_apply_status(status)
+
+            # Only revalidate when there is a parsed snapshot to fall back on,
+            # and for a metadata refresh only if it was parsed from this payload
+            has_snapshot = self._cached_data is not None and (
+                not full or self._metadata_digest == self._payload_digest
+            )
+            started = time.perf_counter()
+            resp = await self._async_request(
+                self._hub.async_get(
+                    url,
+                    etag=self._etag if has_snapshot else None,
+                    last_modified=self._last_modified if has_snapshot else None,
+                    cache=True,
+                )
+            )
+            self.metrics.record_fetch(time.perf_counter() - started, len(resp.body))
+            if not resp.from_cache:
+                self._breaker.async_record_success(self.station_id)
+
+            if has_snapshot and (
+                resp.not_modified or resp.digest == self._payload_digest
+            ):
+                # Same payload as last time; returning the same object lets
+                # the coordinator skip notifying entities.
+                _LOGGER.debug(
+                    "NWPS payload for station %s unchanged, reusing parsed data",
+                    self.station_id,
+                )
+                if full:
+                    self._async_metadata_refreshed()
+                return self._reuse_snapshot()
+
+            started = time.perf_counter()
+            parser = decode_station if full else partial(decode_station, parser=parse_status)
+            if len(resp.body) > DECODE_EXECUTOR_THRESHOLD:
+                # Photo and impact trees make some payloads large enough to
+                # stall the event loop while decoding
+                station_json, parsed = await self.hass.async_add_executor_job(
+                    parser, resp.body
+                )
+            else:
+                station_json, parsed = parser(resp.body)
+            self.metrics.record_parse(time.perf_counter() - started)
+            # The raw payload is only retained when opted in for diagnostics;
+            # otherwise the decoded document is dropped right after parsing
+            self.raw = station_json if self._keep_raw else None
+            del station_json
+
+            self._etag = resp.etag
+            self._last_modified = resp.last_modified
+            self._payload_digest = resp.digest
+            if not full:
+                return await self._async_apply_status(parsed)
+
+            _LOGGER.debug("Parsed NWPS data for station %s: %s", self.station_id, parsed)
+            self._metadata_digest = resp.digest
+            self._async_metadata_refreshed(parsed)
+            return await self._async_accept_snapshot(parsed)
 
         except UpdateFailed as err:
-            # Check if we have cached data within the 1-hour retention window
-            if self._cached_data is not None and self._last_successful_update is not None:
-                time_since_last_update = dt_util.utcnow() - self._last_successful_update
-                if time_since_last_update < timedelta(hours=1):
-                    _LOGGER.warning(
-                        "NWPS API temporarily unavailable for station %s, using cached data from %s ago: %s",
-                        self.station_id,
-                        time_since_last_update,
-                        err
-                    )
-                    return self._cached_data
-                else:
-                    _LOGGER.error(
-                        "NWPS API unavailable for station %s for more than 1 hour, marking sensors unavailable: %s",
-                        self.station_id,
-                        err
-                    )
-            raise
-        except Exception as err: 
-            # Check if we have cached data within the 1-hour retention window
-            if self._cached_data is not None and self._last_successful_update is not None:
-                time_since_last_update = dt_util.utcnow() - self._last_successful_update
-                if time_since_last_update < timedelta(hours=1):
-                    _LOGGER.warning(
-                        "Unexpected error for station %s, using cached data from %s ago: %s",
-                        self.station_id,
-                        time_since_last_update,
-                        err
-                    )
-                    return self._cached_data
-                else:
-                    _LOGGER.error(
-                        "Error persisted for station %s for more than 1 hour, marking sensors unavailable: %s",
-                        self.station_id,
-                        err
-                    )
-            raise UpdateFailed(f"Unexpected error parsing NWPS data: {err}") from err
\ No newline at end of file
+            return self._serve_stale(err)
+        except Exception as err:
+            _LOGGER.debug("Unexpected error for station %s", self.station_id, exc_info=True)
+            return self._serve_stale(
+                UpdateFailed(f"Unexpected error parsing NWPS data: {err}"), err
+            )
+
+    @callback
+    def _async_metadata_refreshed(self, parsed: Optional[StationSnapshot] = None) -> None:
+        """Restart the metadata TTL, sharing new river links and location."""
+        self._metadata_fetched = time.monotonic()
+        self._metadata_requested = False
+        if parsed is None:
+            return
+        self._network.async_learn(self.station_id, parsed)
+        if self._bulk is not None:
+            self._bulk.async_locate(self.station_id, parsed.latitude, parsed.longitude)
+
+    async def _async_apply_status(self, status: Dict[str, Any]) -> StationSnapshot:
+        """Merge freshly parsed status fields into the last snapshot."""
+        parsed = dataclasses.replace(self._cached_data, **status)
+        if parsed == self._cached_data:
+            return self._reuse_snapshot()
+        return await self._async_accept_snapshot(parsed)
+
+    def _reuse_snapshot(self) -> StationSnapshot:
+        """Return the unchanged last snapshot after a successful request."""
+        self._last_successful_update = dt_util.utcnow()
+        # Persist the confirmation too, so a restart restores the right age
+        if self._snapshot_store is not None and not self._snapshot_store.async_confirm(
+            self.station_id, self._last_successful_update.isoformat()
+        ):
+            self._persist_snapshot(self._cached_data)
+        self._quiet_polls += 1
+        self.metrics.unchanged_hits += 1
+        self.metrics.consecutive_failures = 0
+        self._async_set_stale(False)
+        return self._cached_data
+
+    async def _async_accept_snapshot(self, parsed: StationSnapshot) -> StationSnapshot:
+        """Adopt a new snapshot, adding series trends, and persist it."""
+        self._record_observation(parsed.observed_time)
+        if self.series is not None:
+            await self._async_update_series(parsed)
+
+        # Update successful fetch tracking
+        self._last_successful_update = dt_util.utcnow()
+        self._cached_data = parsed
+        self._persist_snapshot(parsed)
+        self._async_update_region()
+        self.metrics.consecutive_failures = 0
+        self.stale = False
+
+        return parsed
+
+    def _serve_stale(
+        self, err: UpdateFailed, cause: Optional[BaseException] = None
+    ) -> StationSnapshot:
+        """Return the last good snapshot after a failed update, if young enough.
+
+        Raises err once the data is older than the configured ceiling, which
+        marks the entities unavailable.
+        """
+        self.metrics.consecutive_failures += 1
+        age = self.data_age
+        if self._cached_data is not None and age is not None and age < self._max_staleness:
+            # Warn once per outage; the breaker keeps these coming every poll
+            (_LOGGER.debug if self.stale else _LOGGER.warning)(
+                "NWPS data for station %s unavailable, using cached data from %s ago: %s",
+                self.station_id,
+                timedelta(seconds=round(age)),
+                err,
+            )
+            self.metrics.stale_serves += 1
+            self._async_set_stale(True)
+            return self._cached_data
+        if self._cached_data is not None:
+            _LOGGER.error(
+                "NWPS data for station %s unavailable for more than %s, "
+                "marking sensors unavailable: %s",
+                self.station_id,
+                timedelta(seconds=self._max_staleness),
+                err,
+            )
+        self.stale = False
+        if cause is not None:
+            raise err from cause
+        raise err
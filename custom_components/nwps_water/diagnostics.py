@@ -0,0 +1,109 @@
+"""Diagnostics support for NWPS Water."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .breaker import get_circuit_breaker
+from .bulk import get_bulk_status
+from .const import DOMAIN
+from .coordinator import NWPSDataCoordinator
+from .group import NWPSStationGroup
+from .hub import get_hub
+from .image_cache import async_get_image_cache
+from .network import get_river_network
+from .regions import get_region_summary
+from .statistics import get_statistics_importer
+
+
+def _station_diagnostics(coordinator: NWPSDataCoordinator) -> Dict[str, Any]:
+    """Return the diagnostics of one station's coordinator."""
+    last_success = coordinator.last_successful_update
+    return {
+        "coordinator": {
+            "station_id": coordinator.station_id,
+            "last_update_success": coordinator.last_update_success,
+            "last_successful_update": last_success.isoformat() if last_success else None,
+            "data_age_seconds": coordinator.data_age,
+            "stale": coordinator.stale,
+            "update_interval_seconds": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "nwm": (
+            {
+                "reach_id": coordinator.nwm.reach_id,
+                "array_bytes": coordinator.nwm.nbytes,
+                "ranges": {
+                    name: summary.attributes() | {"peak": summary.peak}
+                    for name in coordinator.nwm.ranges
+                    if (summary := coordinator.nwm.summary(name)) is not None
+                },
+            }
+            if coordinator.nwm is not None
+            else None
+        ),
+        "upstream": [gauge.as_dict() for gauge in coordinator.upstream],
+        "data": coordinator.data.as_dict() if coordinator.data else None,
+        # Only present when the keep_raw_payload option is enabled
+        "raw": coordinator.raw,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    hub = get_hub(hass)
+    network = get_river_network(hass)
+    images = await async_get_image_cache(hass)
+    diagnostics = {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "hub": {
+            "queue_depth": hub.queue_depth,
+            "in_flight": hub.in_flight,
+            "requests": hub.requests,
+            "coalesced": hub.coalesced,
+            "cache_hits": hub.cache_hits,
+            "cache_entries": hub.cache_entries,
+            "cache_bytes": hub.cache_bytes,
+        },
+        "statistics": {
+            "imports": get_statistics_importer(hass).imports,
+            "imported_hours": get_statistics_importer(hass).imported_hours,
+        },
+        "circuit_breaker": get_circuit_breaker(hass).as_dict(),
+        "bulk_status": get_bulk_status(hass).as_dict(),
+        "regions": get_region_summary(hass).as_dict(),
+        "network": {
+            "known_gauges": network.known_gauges,
+            "neighbours_held": network.neighbours,
+            "neighbour_fetches": network.fetches,
+        },
+        "images": {
+            "entries": images.entries,
+            "bytes": images.size,
+            "max_bytes": images.max_bytes,
+            "hits": images.hits,
+            "downloads": images.downloads,
+            "not_modified": images.not_modified,
+            "evictions": images.evictions,
+        },
+    }
+    if isinstance(runtime, NWPSStationGroup):
+        diagnostics["group"] = {"stations": len(runtime.coordinators), "polls": runtime.polls}
+        diagnostics["stations"] = {
+            station_id: _station_diagnostics(coordinator)
+            for station_id, coordinator in runtime.coordinators.items()
+        }
+    else:
+        station = _station_diagnostics(runtime)
+        diagnostics["network"]["upstream"] = station.pop("upstream")
+        diagnostics.update(station)
+    return diagnostics
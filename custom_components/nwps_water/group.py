@@ -0,0 +1,171 @@
+"""Station group entries: many stations served by one config entry."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import heapq
+import io
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, STATION_ID_COLUMNS
+from .coordinator import NWPSDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_station_list(text: str) -> List[str]:
+    """Return the unique station ids in a pasted list or CSV, in order.
+
+    Ids may be separated by commas, semicolons, tabs, spaces or new lines.
+    CSV content whose header row names a lid, station or gauge column (see
+    STATION_ID_COLUMNS) is read from that column. Without such a header,
+    rows that all have the same number of cells, more than one, are read
+    from their first column.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    delimiter = "\t" if "\t" in text else ";" if ";" in text and "," not in text else ","
+    rows = [
+        [cell.strip() for cell in row]
+        for row in csv.reader(io.StringIO(text), delimiter=delimiter)
+        if any(cell.strip() for cell in row)
+    ]
+    header = [cell.lower() for cell in rows[0]]
+    column = next((header.index(name) for name in STATION_ID_COLUMNS if name in header), None)
+    if column is not None:
+        cells = [row[column] for row in rows[1:] if len(row) > column]
+    elif len(rows) > 1 and len({len(row) for row in rows}) == 1 and len(rows[0]) > 1:
+        cells = [row[0] for row in rows]
+    else:
+        cells = [cell for row in rows for cell in row]
+    ids: Dict[str, None] = {}  # a dict as an ordered set
+    for cell in cells:
+        for token in cell.split():
+            ids[token.upper()] = None
+    return list(ids)
+
+
+def read_station_csv(path: str) -> str:
+    """Return the text of a station CSV; runs in the executor."""
+    with open(path, encoding="utf-8-sig") as csv_file:
+        return csv_file.read()
+
+
+class NWPSStationGroup:
+    """The coordinators of a group entry and the one timer that polls them.
+
+    Each station keeps its own coordinator, device and entities, but the
+    group shares the entry's options, its reload path and a single timer:
+    coordinators hand their next poll to async_schedule instead of each
+    arming a timer of their own. Due times sit in a heap, so scheduling a
+    poll is O(log n) and the loop only wakes for the earliest one.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize an empty group."""
+        self.hass = hass
+        self.entry = entry
+        self.coordinators: Dict[str, NWPSDataCoordinator] = {}
+        # (loop time, station); entries not matching _due_at are stale
+        self._heap: List[Tuple[float, str]] = []
+        self._due_at: Dict[str, float] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.polls = 0
+
+    @property
+    def station_ids(self) -> List[str]:
+        """Return the group's stations in configured order."""
+        return list(self.coordinators)
+
+    @callback
+    def async_add_station(self, station_id: str) -> NWPSDataCoordinator:
+        """Create the coordinator of one station in the group."""
+        coordinator = NWPSDataCoordinator(self.hass, station_id, self.entry, group=self)
+        self.coordinators[station_id] = coordinator
+        return coordinator
+
+    async def async_refresh(self, coordinators: List[NWPSDataCoordinator]) -> None:
+        """Refresh stations together; the hub bounds how many requests run."""
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+    @callback
+    def async_schedule(self, station_id: str, delay: float) -> None:
+        """Poll a station in delay seconds, replacing its pending poll."""
+        when = self.hass.loop.time() + delay
+        self._due_at[station_id] = when
+        heapq.heappush(self._heap, (when, station_id))
+        self._async_arm()
+
+    @callback
+    def async_unschedule(self, station_id: str) -> None:
+        """Drop a station's pending poll."""
+        if self._due_at.pop(station_id, None) is not None:
+            self._async_arm()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop polling every station."""
+        self._due_at.clear()
+        self._heap.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @callback
+    def _async_arm(self) -> None:
+        """Point the timer at the earliest pending poll."""
+        heap = self._heap
+        while heap and self._due_at.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        when = heap[0][0] if heap else None
+        if self._timer is not None:
+            if when is not None and self._timer.when() == when:
+                return
+            self._timer.cancel()
+            self._timer = None
+        if when is not None:
+            self._timer = self.hass.loop.call_at(when, self._async_fire)
+
+    @callback
+    def _async_fire(self) -> None:
+        """Start the refresh of every station that is due."""
+        self._timer = None
+        now = self.hass.loop.time()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            when, station_id = heapq.heappop(heap)
+            if self._due_at.get(station_id) != when:
+                continue
+            del self._due_at[station_id]
+            coordinator = self.coordinators.get(station_id)
+            if coordinator is None or self.hass.is_stopping:
+                continue
+            self.polls += 1
+            self.entry.async_create_background_task(
+                self.hass, coordinator.async_refresh(), f"{coordinator.name} poll"
+            )
+        self._async_arm()
+
+
+@callback
+def entry_coordinators(hass: HomeAssistant, entry: ConfigEntry) -> List[NWPSDataCoordinator]:
+    """Return the station coordinators of a single-station or group entry."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    if isinstance(runtime, NWPSStationGroup):
+        return list(runtime.coordinators.values())
+    return [runtime]
+
+
+@callback
+def iter_coordinators(hass: HomeAssistant) -> Iterator[NWPSDataCoordinator]:
+    """Yield the coordinator of every configured station."""
+    for runtime in list(hass.data.get(DOMAIN, {}).values()):
+        if isinstance(runtime, NWPSStationGroup):
+            yield from runtime.coordinators.values()
+        elif isinstance(runtime, NWPSDataCoordinator):
+            yield runtime
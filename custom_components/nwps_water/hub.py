@@ -0,0 +1,386 @@
+"""Shared fetch hub that every NWPS request goes through."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
+
+from .const import (
+    DATA_HUB,
+    DECODE_EXECUTOR_THRESHOLD,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DOMAIN,
+    MEDIA_MAX_CONCURRENT_REQUESTS,
+    NWPS_BASE,
+    REQUEST_TIMEOUT,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Golden ratio conjugate. Multiples of it modulo 1 form a low-discrepancy
+# sequence, so poll phases stay evenly spread however many stations exist.
+_PHASE_STEP = (math.sqrt(5) - 1) / 2
+
+# A poll due sooner than this fraction of the interval is pushed one interval
+# out, so scheduler rounding never causes two fetches back to back.
+_MIN_PHASE_FRACTION = 0.25
+
+
+class NWPSError(Exception):
+    """Base error raised by the fetch hub."""
+
+
+class NWPSNotFoundError(NWPSError):
+    """Raised when NWPS returns 404 for a resource."""
+
+
+class NWPSPayloadTooLargeError(NWPSError):
+    """Raised when a response body exceeds the caller's size limit."""
+
+
+class NWPSApiError(NWPSError):
+    """Raised when NWPS returns an unexpected HTTP status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"NWPS API returned HTTP {status}: {message}")
+        self.status = status
+
+
+@dataclass(slots=True)
+class NWPSResponse:
+    """A fetched NWPS payload plus the validators needed to revalidate it."""
+
+    status: int
+    body: bytes = b""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[bytes] = None
+    # Served from the response cache rather than answered by NOAA just now
+    from_cache: bool = False
+
+    @property
+    def not_modified(self) -> bool:
+        """Return True if the server answered 304 Not Modified."""
+        return self.status == 304
+
+
+class NWPSFetchHub:
+    """Coalesce, throttle and stagger requests against the NWPS API."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        base_url: str = NWPS_BASE,
+        request_timeout: float = REQUEST_TIMEOUT,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
+    ) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.base_url = base_url.rstrip("/")
+        self.request_timeout = request_timeout
+        self.cache_ttl = cache_ttl
+        self.session = async_get_clientsession(hass)
+        self._max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._media_semaphore = asyncio.Semaphore(MEDIA_MAX_CONCURRENT_REQUESTS)
+        # (url, etag, last_modified, cache, media, max_bytes) -> fetch
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._slots: Dict[str, int] = {}
+        self._queued = 0
+        self._active = 0
+        self.coalesced = 0
+        self.requests = 0
+        # url -> (monotonic expiry, response), least recently used first
+        self._cache: OrderedDict[str, Tuple[float, NWPSResponse]] = OrderedDict()
+        self._cache_bytes = 0
+        self.cache_hits = 0
+
+    @callback
+    def async_configure(self, max_concurrent: int, base_url: str) -> None:
+        """Apply the YAML settings to a hub that may already be in use.
+
+        The config flow or a platform can create the hub before async_setup
+        runs. Requests already waiting keep the limit they queued under.
+        """
+        self.base_url = base_url.rstrip("/")
+        if max_concurrent != self._max_concurrent:
+            self._max_concurrent = max_concurrent
+            self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a concurrency slot."""
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests currently on the wire."""
+        return self._active
+
+    @property
+    def cache_entries(self) -> int:
+        """Return the number of responses held in the response cache."""
+        return len(self._cache)
+
+    @property
+    def cache_bytes(self) -> int:
+        """Return the total body size held in the response cache."""
+        return self._cache_bytes
+
+    def station_url(self, station_id: str) -> str:
+        """Return the gauge detail URL for a station."""
+        return f"{self.base_url}/{station_id}"
+
+    def listing_url(self, box: Tuple[float, float, float, float]) -> str:
+        """Return the gauges listing URL for a (xmin, ymin, xmax, ymax) box in degrees."""
+        xmin, ymin, xmax, ymax = box
+        return (
+            f"{self.base_url}?bbox.xmin={xmin:.3f}&bbox.ymin={ymin:.3f}"
+            f"&bbox.xmax={xmax:.3f}&bbox.ymax={ymax:.3f}&srid=EPSG_4326"
+        )
+
+    def reach_url(self, reach_id: str, series: str) -> str:
+        """Return the NWM streamflow URL of a river reach for one forecast range."""
+        root = self.base_url.rsplit("/", 1)[0]
+        return f"{root}/reaches/{reach_id}/streamflow?series={series}"
+
+    @callback
+    def register_station(self, station_id: str) -> None:
+        """Assign a station the lowest free poll phase slot."""
+        if station_id in self._slots:
+            return
+        used = set(self._slots.values())
+        slot = 0
+        while slot in used:
+            slot += 1
+        self._slots[station_id] = slot
+
+    @callback
+    def unregister_station(self, station_id: str) -> None:
+        """Release the poll phase slot held by a station."""
+        self._slots.pop(station_id, None)
+
+    def phase_fraction(self, station_id: str) -> float:
+        """Return the station's poll phase as a fraction in [0, 1)."""
+        slot = self._slots.get(station_id)
+        if slot is None:
+            return 0.0
+        return (slot * _PHASE_STEP) % 1.0
+
+    def next_poll_delay(self, station_id: str, interval: float) -> float:
+        """Return seconds until the station's next phase-aligned poll.
+
+        Each station polls at a fixed offset within the interval so that
+        hundreds of gauges do not all hit NOAA on the same tick.
+        """
+        if station_id not in self._slots or interval <= 0:
+            return interval
+        phase = self.phase_fraction(station_id) * interval
+        delay = (phase - time.time()) % interval
+        if delay < interval * _MIN_PHASE_FRACTION:
+            delay += interval
+        return delay
+
+    async def async_get(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        *,
+        cache: bool = False,
+        media: bool = False,
+        max_bytes: Optional[int] = None,
+    ) -> NWPSResponse:
+        """Fetch a URL, sharing the response with identical in-flight requests.
+
+        With cache, meant for gauge detail and listing requests, a 200
+        response for the same URL from the last cache_ttl seconds is
+        returned without a request, whatever the validators, and a new one
+        is kept for later callers. Otherwise, when validators from a
+        previous response are given the request is conditional and may come
+        back as 304 Not Modified with an empty body. Media requests, such
+        as images, wait for their own concurrency limit. With max_bytes the
+        download stops as soon as the body grows past it.
+
+        Raises NWPSNotFoundError, NWPSApiError, NWPSPayloadTooLargeError,
+        asyncio.TimeoutError or aiohttp.ClientError.
+        """
+        if cache and (cached := self._cache_get(url)) is not None:
+            self.cache_hits += 1
+            _LOGGER.debug("Serving %s from the response cache", url)
+            return replace(cached, from_cache=True)
+
+        # Only requests with the same options share a fetch, so none skips
+        # a size limit or queues on the wrong semaphore
+        key = (url, etag, last_modified, cache, media, max_bytes)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            _LOGGER.debug("Coalescing request for %s", url)
+        else:
+            task = self.hass.async_create_background_task(
+                self._async_fetch(
+                    url,
+                    timeout or self.request_timeout,
+                    etag,
+                    last_modified,
+                    cache,
+                    media,
+                    max_bytes,
+                ),
+                f"{DOMAIN} fetch {url}",
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task: self._async_request_done(key, _task))
+        return await asyncio.shield(task)
+
+    def _cache_get(self, url: str) -> Optional[NWPSResponse]:
+        """Return the cached response for a URL if it has not expired."""
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            self._cache_discard(url)
+            return None
+        self._cache.move_to_end(url)
+        return response
+
+    def _cache_put(self, url: str, response: NWPSResponse) -> None:
+        """Cache a 200 response, evicting the least recently used ones."""
+        size = len(response.body)
+        if self.cache_ttl <= 0 or size > RESPONSE_CACHE_MAX_BYTES // 4:
+            return
+        self._cache_discard(url)
+        self._cache[url] = (time.monotonic() + self.cache_ttl, response)
+        self._cache_bytes += size
+        while (
+            len(self._cache) > RESPONSE_CACHE_MAX_ENTRIES
+            or self._cache_bytes > RESPONSE_CACHE_MAX_BYTES
+        ):
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted.body)
+
+    def _cache_discard(self, url: str) -> None:
+        """Drop a URL from the response cache."""
+        entry = self._cache.pop(url, None)
+        if entry is not None:
+            self._cache_bytes -= len(entry[1].body)
+
+    async def async_decode(self, response: NWPSResponse) -> Any:
+        """Decode a response body, in the executor when it is large.
+
+        The document is not kept on the response, so responses held in the
+        cache do not also hold a decoded copy.
+        """
+        if len(response.body) > DECODE_EXECUTOR_THRESHOLD:
+            return await self.hass.async_add_executor_job(json_loads, response.body)
+        return json_loads(response.body)
+
+    @staticmethod
+    async def _async_read_limited(
+        url: str, resp: aiohttp.ClientResponse, max_bytes: int
+    ) -> bytes:
+        """Read a body in chunks, giving up once it exceeds max_bytes."""
+        if resp.content_length is not None and resp.content_length > max_bytes:
+            raise NWPSPayloadTooLargeError(f"{url} is {resp.content_length} bytes")
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(65536):
+            body += chunk
+            if len(body) > max_bytes:
+                raise NWPSPayloadTooLargeError(f"{url} is over {max_bytes} bytes")
+        return bytes(body)
+
+    @callback
+    def _async_request_done(self, key: Tuple, task: asyncio.Task) -> None:
+        """Forget a finished request so the next caller fetches fresh data."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_fetch(
+        self,
+        url: str,
+        timeout: float,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        cache: bool,
+        media: bool,
+        max_bytes: Optional[int],
+    ) -> NWPSResponse:
+        """Perform one GET once a concurrency slot is free."""
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        # Released to the same semaphore even if async_configure replaces it
+        semaphore = self._media_semaphore if media else self._semaphore
+        self._queued += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._queued -= 1
+        self._active += 1
+        self.requests += 1
+        try:
+            _LOGGER.debug("Fetching NWPS URL: %s", url)
+            async with asyncio.timeout(timeout):
+                async with self.session.get(url, headers=headers) as resp:
+                    if resp.status == 304:
+                        return NWPSResponse(304, etag=etag, last_modified=last_modified)
+                    if resp.status == 404:
+                        raise NWPSNotFoundError(url)
+                    if resp.status != 200:
+                        text = await resp.text()
+                        raise NWPSApiError(resp.status, text[:200])
+                    if max_bytes is None:
+                        body = await resp.read()
+                    else:
+                        body = await self._async_read_limited(url, resp, max_bytes)
+                    response = NWPSResponse(
+                        resp.status,
+                        body,
+                        etag=resp.headers.get("ETag"),
+                        last_modified=resp.headers.get("Last-Modified"),
+                        digest=hashlib.blake2b(body, digest_size=16).digest(),
+                    )
+                    if cache:
+                        self._cache_put(url, response)
+                    return response
+        finally:
+            self._active -= 1
+            semaphore.release()
+
+
+@callback
+def get_hub(hass: HomeAssistant, **kwargs: Any) -> NWPSFetchHub:
+    """Return the domain fetch hub, creating it on first use.
+
+    Keyword arguments are passed to NWPSFetchHub and only apply when the hub
+    does not exist yet; async_setup uses async_configure for the YAML ones.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    hub = domain_data.get(DATA_HUB)
+    if hub is None:
+        hub = NWPSFetchHub(hass, **kwargs)
+        domain_data[DATA_HUB] = hub
+    return hub
@@ -0,0 +1,208 @@
+"""Image entities serving NOAA hydrographs and gauge photos through Home Assistant."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+from homeassistant.components.image import ImageEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, IMAGES
+from .coordinator import NWPSDataCoordinator
+from .group import entry_coordinators
+from .hub import NWPSError
+from .image_cache import NWPSImageCache, async_get_image_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up image entities for a config entry."""
+    cache = await async_get_image_cache(hass)
+
+    entities = []
+    # One coordinator per station; a group entry has several
+    for coordinator in entry_coordinators(hass, entry):
+        entities.extend(_station_images(entry, coordinator, cache, async_add_entities))
+    async_add_entities(entities)
+
+
+def _station_images(
+    entry: ConfigEntry,
+    coordinator: NWPSDataCoordinator,
+    cache: NWPSImageCache,
+    async_add_entities: AddEntitiesCallback,
+) -> list:
+    """Return a station's images and add photos the gauge gains later."""
+    station_id = coordinator.station_id
+
+    def photo_count() -> int:
+        return len((coordinator.data.photos if coordinator.data else None) or [])
+
+    def photo_images(first: int, last: int) -> list:
+        return [
+            NWPSImage(
+                coordinator, cache, entry, station_id, f"photo_{number}", f"Photo {number}", False
+            )
+            for number in range(first, last + 1)
+        ]
+
+    entities = [
+        NWPSImage(coordinator, cache, entry, station_id, key, info["name"], info["enabled"])
+        for key, info in IMAGES.items()
+    ]
+    # Photos dropped from the gauge keep their entity, unavailable
+    photos = photo_count()
+    entities.extend(photo_images(1, photos))
+
+    @callback
+    def async_add_new_photos() -> None:
+        """Add an image for each photo beyond those already created."""
+        nonlocal photos
+        count = photo_count()
+        if count > photos:
+            async_add_entities(photo_images(photos + 1, count))
+            photos = count
+
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_photos))
+    return entities
+
+
+class NWPSImage(CoordinatorEntity, ImageEntity):
+    """A NOAA graphic for a station, served from the local image cache.
+
+    Browsers load the image from Home Assistant rather than NOAA. The image
+    is revalidated when the coordinator delivers a new payload, and
+    image_last_updated only moves when the URL or the bytes change, so
+    dashboards do not reload an unchanged image.
+    """
+
+    # Entity naming is handled manually to create concise entity IDs
+    _attr_has_entity_name = False
+    _unrecorded_attributes = frozenset({"station_id", "source_url", "caption", "photo_date"})
+
+    def __init__(
+        self,
+        coordinator: NWPSDataCoordinator,
+        cache: NWPSImageCache,
+        entry: ConfigEntry,
+        station_id: str,
+        key: str,
+        name: str,
+        enabled: bool,
+    ) -> None:
+        CoordinatorEntity.__init__(self, coordinator)
+        ImageEntity.__init__(self, coordinator.hass)
+        self._cache = cache
+        self._entry = entry
+        self._station_id = station_id
+        self._key = key
+        self._photo_index = int(key[6:]) - 1 if key.startswith("photo_") else None
+        self._attr_name = f"{station_id} {name}"
+        self._attr_unique_id = f"nwps_{station_id}_{key}"
+        self._attr_entity_registry_enabled_default = enabled
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, station_id)},
+            name=coordinator.get_device_name(),
+            manufacturer="NOAA NWPS",
+        )
+        self._seen_data = coordinator.data
+        self._url = self._current_url()
+        self._last_available = self.available
+        self._attr_image_last_updated = dt_util.utcnow()
+
+    def _photo(self) -> Optional[Dict[str, Optional[str]]]:
+        """Return this entity's entry in the station's photo list."""
+        data = self.coordinator.data
+        photos = (data.photos if data else None) or []
+        if self._photo_index is None or self._photo_index >= len(photos):
+            return None
+        return photos[self._photo_index]
+
+    def _current_url(self) -> Optional[str]:
+        """Return the NOAA URL of the image in the current data."""
+        if self._photo_index is not None:
+            photo = self._photo()
+            return photo["url"] if photo else None
+        data = self.coordinator.data
+        return getattr(data, self._key, None) if data else None
+
+    @property
+    def available(self) -> bool:
+        """Return True if the station data names an image."""
+        return super().available and self._url is not None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the source URL and, for photos, the caption."""
+        attrs: Dict[str, Any] = {"station_id": self._station_id, "source_url": self._url}
+        if (photo := self._photo()) is not None:
+            attrs["caption"] = photo.get("caption")
+            attrs["photo_date"] = photo.get("date")
+        return attrs
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Revalidate the image when the coordinator has a new payload.
+
+        Listener calls without new data, such as analytics or upstream
+        updates, are ignored.
+        """
+        data = self.coordinator.data
+        if data is self._seen_data:
+            if self.available != self._last_available:
+                self._last_available = self.available
+                self.async_write_ha_state()
+            return
+        self._seen_data = data
+        url = self._current_url()
+        if url != self._url:
+            self._url = url
+            self._last_available = self.available
+            self._attr_image_last_updated = dt_util.utcnow()
+            self.async_write_ha_state()
+            return
+        if self.available != self._last_available:
+            self._last_available = self.available
+            self.async_write_ha_state()
+        if url is not None and url in self._cache:
+            # Images nobody has viewed yet are fetched on first view instead
+            self._entry.async_create_background_task(
+                self.hass, self._async_revalidate(url), f"{self.entity_id} revalidate"
+            )
+
+    async def _async_revalidate(self, url: str) -> None:
+        """Refresh the cached image and move the state if it changed."""
+        try:
+            changed = await self._cache.async_refresh(url)
+        except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, OSError) as err:
+            _LOGGER.debug("Could not revalidate image %s: %s", url, err)
+            return
+        if changed and url == self._url:
+            self._attr_image_last_updated = dt_util.utcnow()
+            self.async_write_ha_state()
+
+    async def async_image(self) -> Optional[bytes]:
+        """Return the image bytes from the cache, downloading them if needed."""
+        if self._url is None:
+            return None
+        try:
+            result = await self._cache.async_image(self._url)
+        except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, OSError) as err:
+            _LOGGER.warning("Could not fetch image %s: %s", self._url, err)
+            return None
+        if result is None:
+            return None
+        body, self._attr_content_type = result
+        return body
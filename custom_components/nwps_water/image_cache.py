@@ -0,0 +1,279 @@
+"""On-disk cache of the NOAA graphics served by the image entities."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_IMAGES,
+    DOMAIN,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_MAX_BYTES,
+    IMAGE_SAVE_DELAY,
+    IMAGE_TIMEOUT,
+    STORAGE_VERSION,
+)
+from .hub import get_hub
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.images"
+
+
+@dataclass(slots=True)
+class CachedImage:
+    """One cached image file and the validators to revalidate it."""
+
+    filename: str
+    size: int
+    content_type: str
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _content_type(url: str) -> str:
+    """Guess an image content type from its URL."""
+    content_type, _ = mimetypes.guess_type(url.split("?", 1)[0])
+    return content_type if content_type and content_type.startswith("image/") else "image/png"
+
+
+def _filename(url: str) -> str:
+    """Return the cache file name for a URL."""
+    suffix = os.path.splitext(url.split("?", 1)[0])[1][:5].lower()
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest() + suffix
+
+
+def _write_file(path: str, body: bytes) -> None:
+    """Write a file atomically; runs in the executor."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        file.write(body)
+    os.replace(temp, path)
+
+
+def _read_file(path: str) -> bytes:
+    """Read a file; runs in the executor."""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _remove_files(paths: List[str]) -> None:
+    """Delete files that may already be gone; runs in the executor."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _existing_files(directory: str) -> Dict[str, int]:
+    """Return the size of every file in the cache directory; runs in the executor."""
+    os.makedirs(directory, exist_ok=True)
+    with os.scandir(directory) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+
+class NWPSImageCache:
+    """Images fetched through the hub and kept on disk up to a size cap.
+
+    The index is ordered least recently served first; once the files exceed
+    max_bytes the oldest are deleted. Refreshes are conditional GETs with
+    the stored validators, so an unchanged image costs a 304 and no write,
+    and concurrent refreshes of one URL share a request.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes: int = IMAGE_CACHE_MAX_BYTES) -> None:
+        """Initialize an empty cache."""
+        self.hass = hass
+        self.directory = hass.config.path(IMAGE_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._entries: OrderedDict[str, CachedImage] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.downloads = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    @property
+    def entries(self) -> int:
+        """Return the number of cached images."""
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Return the total size of the cached images."""
+        return self._bytes
+
+    def __contains__(self, url: str) -> bool:
+        """Return True if an image is cached."""
+        return url in self._entries
+
+    def _path(self, entry: CachedImage) -> str:
+        """Return the file path of a cache entry."""
+        return os.path.join(self.directory, entry.filename)
+
+    async def async_load(self) -> None:
+        """Load the index, keeping only entries whose file still exists.
+
+        Files that are not in the index, such as leftovers of an interrupted
+        write, are deleted.
+        """
+        data = await self._store.async_load() or {}
+        files = await self.hass.async_add_executor_job(_existing_files, self.directory)
+        for url, raw in data.get("images", {}).items():
+            entry = CachedImage(**raw)
+            if files.get(entry.filename) == entry.size:
+                self._entries[url] = entry
+                self._bytes += entry.size
+        known = {entry.filename for entry in self._entries.values()}
+        orphans = [os.path.join(self.directory, name) for name in files if name not in known]
+        if orphans:
+            await self.hass.async_add_executor_job(_remove_files, orphans)
+        _LOGGER.debug("Loaded %s cached NWPS images (%s bytes)", len(self._entries), self._bytes)
+
+    async def async_image(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Return an image body and content type, downloading it if not cached.
+
+        Raises the hub's errors if a download is needed and fails.
+        """
+        for _ in range(2):
+            entry = self._entries.get(url)
+            if entry is None:
+                await self.async_refresh(url)
+                entry = self._entries.get(url)
+                if entry is None:
+                    return None
+            else:
+                self.hits += 1
+            self._entries.move_to_end(url)
+            self._async_schedule_save()
+            try:
+                body = await self.hass.async_add_executor_job(_read_file, self._path(entry))
+            except FileNotFoundError:
+                # Removed behind our back; forget it and download again
+                self._async_discard(url)
+                continue
+            return body, entry.content_type
+        return None
+
+    async def async_refresh(self, url: str) -> bool:
+        """Revalidate an image; return True if its content changed.
+
+        Raises the hub's errors if the request fails; the cached copy is kept.
+        """
+        task = self._refreshing.get(url)
+        if task is None:
+            task = self.hass.async_create_background_task(
+                self._async_download(url), f"{DOMAIN} image {url}"
+            )
+            self._refreshing[url] = task
+            task.add_done_callback(lambda _task: self._refreshing.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _async_download(self, url: str) -> bool:
+        """Fetch an image, conditionally when a copy is cached."""
+        entry = self._entries.get(url)
+        response = await get_hub(self.hass).async_get(
+            url,
+            timeout=IMAGE_TIMEOUT,
+            etag=entry.etag if entry else None,
+            last_modified=entry.last_modified if entry else None,
+            media=True,
+            max_bytes=IMAGE_MAX_BYTES,
+        )
+        if response.not_modified and entry is not None:
+            self.not_modified += 1
+            return False
+        digest = response.digest.hex() if response.digest else ""
+        if entry is not None and entry.digest == digest:
+            # Same bytes without validator support; only keep the new validators
+            entry.etag, entry.last_modified = response.etag, response.last_modified
+            self._async_schedule_save()
+            return False
+
+        new = CachedImage(
+            filename=_filename(url),
+            size=len(response.body),
+            content_type=_content_type(url),
+            digest=digest,
+            etag=response.etag,
+            last_modified=response.last_modified,
+        )
+        await self.hass.async_add_executor_job(_write_file, self._path(new), response.body)
+        self.downloads += 1
+        if (old := self._entries.pop(url, None)) is not None:
+            self._bytes -= old.size
+        self._entries[url] = new
+        self._bytes += new.size
+        await self._async_evict()
+        self._async_schedule_save()
+        return True
+
+    async def _async_evict(self) -> None:
+        """Delete the least recently served images until under the size cap."""
+        evicted: List[str] = []
+        # The newest entry is never evicted, even if it alone exceeds the cap
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            evicted.append(self._path(entry))
+        if evicted:
+            self.evictions += len(evicted)
+            await self.hass.async_add_executor_job(_remove_files, evicted)
+
+    @callback
+    def _async_discard(self, url: str) -> None:
+        """Forget an entry whose file is missing."""
+        if (entry := self._entries.pop(url, None)) is not None:
+            self._bytes -= entry.size
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule a batched write of the index."""
+        self._store.async_delay_save(self._data_to_save, IMAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the index to write to disk, least recently served first."""
+        return {"images": {url: asdict(entry) for url, entry in self._entries.items()}}
+
+
+async def async_get_image_cache(hass: HomeAssistant) -> NWPSImageCache:
+    """Return the loaded domain image cache.
+
+    Entries set up concurrently share one load from disk. A failed load is
+    retried by the next caller.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    loader: Optional[asyncio.Future] = domain_data.get(DATA_IMAGES)
+    if loader is None:
+        cache = NWPSImageCache(hass)
+        loader = hass.async_create_task(_async_load(cache))
+        domain_data[DATA_IMAGES] = loader
+    try:
+        return await asyncio.shield(loader)
+    except Exception:
+        if loader.done() and domain_data.get(DATA_IMAGES) is loader:
+            del domain_data[DATA_IMAGES]
+        raise
+
+
+async def _async_load(cache: NWPSImageCache) -> NWPSImageCache:
+    """Load a cache and return it."""
+    await cache.async_load()
+    return cache
@@ -0,0 +1,156 @@
+"""Per-station fetch/parse metrics and the optional update-cycle profiler."""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from .const import METRICS_WINDOW, PROFILE_TOP_N
+
+_LOGGER = logging.getLogger(__name__)
+
+# Only one cProfile profiler can be active per thread
+_profiler_busy = False
+
+
+class RollingHistogram:
+    """The last METRICS_WINDOW samples of a metric, in a fixed-size array."""
+
+    __slots__ = ("_samples", "_next", "_count")
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize an empty histogram."""
+        self._samples = array("d", bytes(8 * window))
+        self._next = 0
+        self._count = 0
+
+    def add(self, value: float) -> None:
+        """Record a sample, replacing the oldest once the window is full."""
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+
+    def summary(self, buckets: Tuple[float, ...]) -> Dict[str, Any]:
+        """Return count, percentiles and bucket counts for diagnostics."""
+        values = sorted(self._samples[: self._count])
+        if not values:
+            return {"count": 0}
+
+        def pct(p: float) -> float:
+            return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 3)
+
+        histogram: Dict[str, int] = {}
+        lower = 0.0
+        for upper in (*buckets, float("inf")):
+            label = f"<{upper:g}" if upper != float("inf") else f">={lower:g}"
+            histogram[label] = sum(1 for v in values if lower <= v < upper)
+            lower = upper
+        return {
+            "count": len(values),
+            "min": round(values[0], 3),
+            "p50": pct(50),
+            "p90": pct(90),
+            "p99": pct(99),
+            "max": round(values[-1], 3),
+            "histogram": histogram,
+        }
+
+
+@dataclass(slots=True)
+class StationMetrics:
+    """Hot-path counters recorded by a station coordinator."""
+
+    http_latency: Optional[float] = None  # ms, including time queued in the hub
+    payload_bytes: Optional[int] = None
+    parse_time: Optional[float] = None  # ms
+    consecutive_failures: int = 0
+    requests: int = 0
+    unchanged_hits: int = 0  # 304 or identical payload, parse skipped
+    stale_serves: int = 0  # failed update answered from _cached_data
+    latency_histogram: RollingHistogram = field(default_factory=RollingHistogram)
+    bytes_histogram: RollingHistogram = field(default_factory=RollingHistogram)
+    parse_histogram: RollingHistogram = field(default_factory=RollingHistogram)
+    last_profile: Optional[str] = None
+
+    def record_fetch(self, latency: float, payload_bytes: int) -> None:
+        """Record one completed HTTP request."""
+        self.requests += 1
+        self.http_latency = round(latency * 1000, 1)
+        self.latency_histogram.add(self.http_latency)
+        self.payload_bytes = payload_bytes
+        if payload_bytes:
+            self.bytes_histogram.add(payload_bytes)
+
+    def record_parse(self, duration: float) -> None:
+        """Record the time spent parsing a payload."""
+        self.parse_time = round(duration * 1000, 3)
+        self.parse_histogram.add(self.parse_time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics with histogram summaries for diagnostics."""
+        return {
+            "http_latency_ms": self.http_latency,
+            "payload_bytes": self.payload_bytes,
+            "parse_time_ms": self.parse_time,
+            "consecutive_failures": self.consecutive_failures,
+            "requests": self.requests,
+            "unchanged_hits": self.unchanged_hits,
+            "stale_serves": self.stale_serves,
+            "http_latency_ms_histogram": self.latency_histogram.summary(
+                (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+            ),
+            "payload_bytes_histogram": self.bytes_histogram.summary(
+                (1024, 4096, 16384, 65536, 262144, 1048576)
+            ),
+            "parse_time_ms_histogram": self.parse_histogram.summary(
+                (0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+            ),
+            "last_profile": self.last_profile,
+        }
+
+
+class CycleProfiler:
+    """Context manager that profiles one update cycle with cProfile.
+
+    The profile covers wall time across awaits, so it also includes work done
+    by other tasks on the event loop while this cycle was suspended.
+    """
+
+    def __init__(self, metrics: StationMetrics, label: str) -> None:
+        """Initialize the profiler."""
+        self._metrics = metrics
+        self._label = label
+        self._profile: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> CycleProfiler:
+        """Start profiling unless another cycle is already being profiled."""
+        global _profiler_busy
+        if _profiler_busy:
+            return self
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. the profiler integration) is running
+            return self
+        _profiler_busy = True
+        self._profile = profile
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop profiling and keep the top entries by cumulative time."""
+        global _profiler_busy
+        if self._profile is None:
+            return
+        self._profile.disable()
+        _profiler_busy = False
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(
+            PROFILE_TOP_N
+        )
+        self._metrics.last_profile = stream.getvalue()
+        _LOGGER.debug("Update cycle profile for %s:\n%s", self._label, self._metrics.last_profile)
@@ -0,0 +1,67 @@
+"""Typed data models for parsed NWPS station data."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class StationSnapshot:
+    """Parsed NWPS station state, limited to the fields the platforms read.
+
+    Slotted so hundreds of stations do not each carry a per-instance dict.
+    """
+
+    name: Optional[str] = None
+    stage: Optional[float] = None
+    flow: Optional[float] = None
+    forecast_stage: Optional[float] = None
+    forecast_flow: Optional[float] = None
+    observed_flood_category: Optional[str] = None
+    forecast_flood_category: Optional[str] = None
+    flood_minor_stage: Optional[float] = None
+    flood_moderate_stage: Optional[float] = None
+    flood_major_stage: Optional[float] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    elevation: Optional[float] = None
+    river_mile: Optional[float] = None
+    # Two-letter state code; the default region of the flood summaries
+    state: Optional[str] = None
+    # validTime of the observed reading, used by adaptive polling
+    observed_time: Optional[str] = None
+    # River network links; NWPS sends "" when there is no neighbour
+    upstream_lid: Optional[str] = None
+    downstream_lid: Optional[str] = None
+    reach_id: Optional[str] = None
+    # NOAA graphics URLs, proxied by the image platform
+    hydrograph_image: Optional[str] = None
+    floodcat_image: Optional[str] = None
+    probability_stage_week: Optional[str] = None
+    probability_flow_week: Optional[str] = None
+    short_range_probability_image: Optional[str] = None
+    # {"url", "caption", "date"} per gauge photo
+    photos: Optional[List[Dict[str, Optional[str]]]] = None
+    # Trend attributes from the optional hydrograph series
+    stage_trend: Optional[Dict[str, Any]] = None
+    flow_trend: Optional[Dict[str, Any]] = None
+
+    def flood_thresholds(self) -> Dict[str, float]:
+        """Return the known flood stage thresholds as entity attributes."""
+        thresholds = {}
+        if self.flood_minor_stage:
+            thresholds["flood_minor"] = self.flood_minor_stage
+        if self.flood_moderate_stage:
+            thresholds["flood_moderate"] = self.flood_moderate_stage
+        if self.flood_major_stage:
+            thresholds["flood_major"] = self.flood_major_stage
+        return thresholds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dict for persistence."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> StationSnapshot:
+        """Build a snapshot from persisted data, ignoring unknown keys."""
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
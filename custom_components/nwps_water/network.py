@@ -0,0 +1,226 @@
+"""River network graph linking stations to the gauges upstream of them."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+
+from .const import ACTIVE_FLOOD_CATEGORIES, DATA_NETWORK, DOMAIN, NETWORK_REFRESH
+from .hub import NWPSError, get_hub
+from .models import StationSnapshot
+from .parser import parse_station
+
+if TYPE_CHECKING:
+    from .coordinator import NWPSDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Neighbour entries unused for this long are forgotten
+_NEIGHBOUR_EXPIRY = 4 * NETWORK_REFRESH
+
+
+@dataclass(slots=True, frozen=True)
+class UpstreamGauge:
+    """Current state of a gauge upstream of a station."""
+
+    lid: str
+    name: Optional[str]
+    hops: int
+    stage: Optional[float]
+    forecast_stage: Optional[float]
+    observed_flood_category: Optional[str]
+    forecast_flood_category: Optional[str]
+
+    @property
+    def flooding(self) -> bool:
+        """Return True if the gauge is at or forecast to reach action stage."""
+        return any(
+            str(category).lower() in ACTIVE_FLOOD_CATEGORIES
+            for category in (self.observed_flood_category, self.forecast_flood_category)
+            if category
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the gauge as state attribute data."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class _Neighbour:
+    """A gauge that is not a configured station, as last fetched."""
+
+    fetched: float  # time.monotonic()
+    snapshot: Optional[StationSnapshot]  # None if the last fetch failed
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class RiverNetwork:
+    """Gauge graph built from the NWPS upstreamLid / downstreamLid links.
+
+    Configured stations add their links on every parse. Upstream gauges that
+    are not configured are fetched through the hub and reused for
+    NETWORK_REFRESH seconds, and concurrent lookups of the same gauge share
+    one request, so a basin costs one fetch per gauge per cycle however many
+    stations reference it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty network."""
+        self.hass = hass
+        self._stations: Dict[str, NWPSDataCoordinator] = {}
+        self._neighbours: Dict[str, _Neighbour] = {}
+        self._fetching: Dict[str, asyncio.Task] = {}
+        # lid -> its upstreamLid / downstreamLid, and the reverse of the latter
+        self._upstream_link: Dict[str, str] = {}
+        self._downstream_link: Dict[str, str] = {}
+        self._tributaries: Dict[str, Set[str]] = {}
+        self.fetches = 0
+
+    @property
+    def known_gauges(self) -> int:
+        """Return the number of gauges with known links."""
+        return len(self._upstream_link.keys() | self._downstream_link.keys())
+
+    @property
+    def neighbours(self) -> int:
+        """Return the number of non-station gauges currently held."""
+        return len(self._neighbours)
+
+    @callback
+    def async_register(self, coordinator: NWPSDataCoordinator) -> None:
+        """Add a configured station; its data is used instead of fetching it."""
+        self._stations[coordinator.station_id] = coordinator
+        if coordinator.data is not None:
+            self.async_learn(coordinator.station_id, coordinator.data)
+
+    @callback
+    def async_unregister(self, station_id: str) -> None:
+        """Remove a configured station."""
+        self._stations.pop(station_id, None)
+
+    @callback
+    def async_learn(self, lid: str, snapshot: StationSnapshot) -> None:
+        """Record the river links of a gauge."""
+        if snapshot.upstream_lid:
+            self._upstream_link[lid] = snapshot.upstream_lid
+        else:
+            self._upstream_link.pop(lid, None)
+        previous = self._downstream_link.get(lid)
+        downstream = snapshot.downstream_lid or None
+        if previous == downstream:
+            return
+        if previous is not None:
+            self._tributaries.get(previous, set()).discard(lid)
+            self._downstream_link.pop(lid)
+        if downstream is not None:
+            self._downstream_link[lid] = downstream
+            self._tributaries.setdefault(downstream, set()).add(lid)
+
+    def upstream_of(self, lid: str) -> List[str]:
+        """Return the known gauges directly upstream of a gauge."""
+        upstream = [self._upstream_link[lid]] if lid in self._upstream_link else []
+        upstream.extend(sorted(self._tributaries.get(lid, set()) - set(upstream)))
+        return upstream
+
+    async def async_upstream(self, station_id: str, depth: int) -> Tuple[UpstreamGauge, ...]:
+        """Return the gauges up to `depth` hops upstream of a station, nearest first."""
+        found: List[UpstreamGauge] = []
+        seen = {station_id}
+        frontier = [station_id]
+        for hops in range(1, depth + 1):
+            lids = list(
+                dict.fromkeys(
+                    upstream
+                    for lid in frontier
+                    for upstream in self.upstream_of(lid)
+                    if upstream not in seen
+                )
+            )
+            if not lids:
+                break
+            seen.update(lids)
+            snapshots = await asyncio.gather(*(self.async_snapshot(lid) for lid in lids))
+            frontier = []
+            for lid, snapshot in zip(lids, snapshots):
+                if snapshot is None:
+                    continue
+                frontier.append(lid)
+                found.append(
+                    UpstreamGauge(
+                        lid=lid,
+                        name=snapshot.name,
+                        hops=hops,
+                        stage=snapshot.stage,
+                        forecast_stage=snapshot.forecast_stage,
+                        observed_flood_category=snapshot.observed_flood_category,
+                        forecast_flood_category=snapshot.forecast_flood_category,
+                    )
+                )
+        return tuple(found)
+
+    async def async_snapshot(self, lid: str) -> Optional[StationSnapshot]:
+        """Return a gauge's current snapshot, fetching it only when due."""
+        coordinator = self._stations.get(lid)
+        if coordinator is not None and coordinator.data is not None:
+            return coordinator.data
+        neighbour = self._neighbours.get(lid)
+        if neighbour is not None and time.monotonic() - neighbour.fetched < NETWORK_REFRESH:
+            return neighbour.snapshot
+        task = self._fetching.get(lid)
+        if task is None:
+            task = self.hass.async_create_background_task(
+                self._async_fetch(lid, neighbour), f"{DOMAIN} upstream gauge {lid}"
+            )
+            self._fetching[lid] = task
+            task.add_done_callback(lambda _task: self._fetching.pop(lid, None))
+        return await asyncio.shield(task)
+
+    async def _async_fetch(
+        self, lid: str, previous: Optional[_Neighbour]
+    ) -> Optional[StationSnapshot]:
+        """Fetch a neighbour gauge, revalidating what is already held."""
+        hub = get_hub(self.hass)
+        has_snapshot = previous is not None and previous.snapshot is not None
+        self.fetches += 1
+        try:
+            resp = await hub.async_get(
+                hub.station_url(lid),
+                etag=previous.etag if has_snapshot else None,
+                last_modified=previous.last_modified if has_snapshot else None,
+                cache=True,
+            )
+            if resp.not_modified and has_snapshot:
+                snapshot = previous.snapshot
+            else:
+                snapshot = parse_station(await hub.async_decode(resp))
+        except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+            _LOGGER.debug("Could not fetch upstream gauge %s: %s", lid, err)
+            # Remember the failure so other stations do not retry this cycle
+            snapshot = previous.snapshot if previous is not None else None
+            self._neighbours[lid] = _Neighbour(time.monotonic(), snapshot)
+            return snapshot
+
+        now = time.monotonic()
+        self._neighbours[lid] = _Neighbour(now, snapshot, resp.etag, resp.last_modified)
+        self.async_learn(lid, snapshot)
+        for stale in [
+            key for key, entry in self._neighbours.items() if now - entry.fetched > _NEIGHBOUR_EXPIRY
+        ]:
+            del self._neighbours[stale]
+        return snapshot
+
+
+@callback
+def get_river_network(hass: HomeAssistant) -> RiverNetwork:
+    """Return the domain river network, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    network = domain_data.get(DATA_NETWORK)
+    if network is None:
+        network = domain_data[DATA_NETWORK] = RiverNetwork(hass)
+    return network
@@ -0,0 +1,327 @@
+"""National Water Model streamflow forecasts for a station's river reach.
+
+Each forecast range (short, medium and long) is fetched from the NWPS
+/reaches/{reachId}/streamflow endpoint on its own schedule with
+conditional requests. A payload is decoded whole in the executor, so
+payloads over NWM_MAX_PAYLOAD_BYTES are refused while downloading, which
+bounds the decode. When its issuance is new, every member is copied into
+one float32 array on a shared time axis. Both the array sizes are capped,
+and the document is dropped right after, so what a station holds stays
+small. Ensemble percentiles are computed over the whole member x time array
+at once.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import warnings
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    NWM_MAX_MEMBERS,
+    NWM_MAX_PAYLOAD_BYTES,
+    NWM_MAX_POINTS,
+    NWM_PERCENTILES,
+    NWM_RANGES,
+    NWM_RETRY_BACKOFF,
+    NWM_TIMEOUT,
+)
+from .hub import NWPSError
+from .timeseries import _parse_time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ships with Home Assistant but is not a requirement
+    np = None
+
+if TYPE_CHECKING:
+    from .hub import NWPSFetchHub
+
+_LOGGER = logging.getLogger(__name__)
+
+_NAN = float("nan")
+# NWM publishes ft³/s; convert the odd metric series
+_CMS_TO_CFS = 35.3147
+
+
+@dataclass(slots=True)
+class EnsembleForecast:
+    """One NWM issuance: every member on a shared time axis."""
+
+    reference_time: Optional[str]
+    times: array  # "d", POSIX seconds, ascending
+    values: array  # "f", member-major (members x len(times)), NaN where missing
+    members: int
+
+
+@dataclass(slots=True)
+class NWMSummary:
+    """Peak flows of an NWM forecast range, for the summary sensors."""
+
+    peak: Optional[float] = None  # peak of the ensemble median, cfs
+    peak_time: Optional[datetime] = None
+    peak_low: Optional[float] = None  # peak of the lower percentile
+    peak_high: Optional[float] = None  # peak of the upper percentile
+    reference_time: Optional[str] = None
+    members: int = 0
+
+    def attributes(self) -> Dict[str, Any]:
+        """Return the summary as state attributes."""
+        low, _, high = NWM_PERCENTILES
+        return {
+            "peak_time": self.peak_time.isoformat() if self.peak_time else None,
+            f"peak_p{low}": self.peak_low,
+            f"peak_p{high}": self.peak_high,
+            "reference_time": self.reference_time,
+            "members": self.members,
+        }
+
+
+def _member_series(block: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the member series of a range block.
+
+    Short range has a single "series"; the ensemble ranges have "member1"..
+    "memberN" next to a "mean", which is only used without members.
+    """
+    if isinstance(block.get("series"), dict):
+        return [block["series"]]
+    members = [
+        block[key]
+        for key in sorted(
+            (key for key in block if key.startswith("member")),
+            key=lambda key: int(key[6:]) if key[6:].isdigit() else 0,
+        )
+        if isinstance(block[key], dict)
+    ]
+    if not members and isinstance(block.get("mean"), dict):
+        members = [block["mean"]]
+    return members[:NWM_MAX_MEMBERS]
+
+
+def build_forecast(
+    payload: Any, range_key: str, previous_reference: Optional[str] = None
+) -> Optional[EnsembleForecast]:
+    """Copy one range of a streamflow payload into arrays.
+
+    Returns None if the range is missing or its issuance matches
+    previous_reference, so an unchanged issuance costs no array work.
+    """
+    block = payload.get(range_key) if isinstance(payload, dict) else None
+    if not isinstance(block, dict):
+        return None
+    members = _member_series(block)
+    if not members:
+        return None
+    reference = max((str(m.get("referenceTime") or "") for m in members), default="") or None
+    if reference is not None and reference == previous_reference:
+        return None
+
+    # Shared time axis: the earliest NWM_MAX_POINTS valid times of any member
+    points: List[Dict[float, float]] = []
+    axis = set()
+    for member in members:
+        units = str(member.get("units") or "").lower()
+        scale = _CMS_TO_CFS if units.startswith(("m", "cms")) else 1.0
+        series: Dict[float, float] = {}
+        for point in member.get("data") or []:
+            timestamp = _parse_time(point.get("validTime"))
+            if timestamp is None:
+                continue
+            try:
+                flow = float(point.get("flow"))
+            except (TypeError, ValueError):
+                continue
+            if flow < 0:  # -999 and other sentinels
+                continue
+            series[timestamp] = flow * scale
+        points.append(series)
+        axis.update(series)
+    times = array("d", sorted(axis)[:NWM_MAX_POINTS])
+    index = {timestamp: position for position, timestamp in enumerate(times)}
+    values = array("f", [_NAN]) * (len(members) * len(times))
+    for row, series in enumerate(points):
+        offset = row * len(times)
+        for timestamp, flow in series.items():
+            position = index.get(timestamp)
+            if position is not None:
+                values[offset + position] = flow
+    return EnsembleForecast(reference, times, values, len(members))
+
+
+def _percentiles_python(forecast: EnsembleForecast, qs: Tuple[int, ...]) -> List[List[float]]:
+    """Per-time percentiles with linear interpolation; the fallback without NumPy."""
+    count = len(forecast.times)
+    result: List[List[float]] = [[] for _ in qs]
+    for column in range(count):
+        samples = sorted(
+            value
+            for value in forecast.values[column::count]
+            if not math.isnan(value)
+        )
+        for row, q in enumerate(qs):
+            if not samples:
+                result[row].append(_NAN)
+                continue
+            rank = (len(samples) - 1) * q / 100
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(samples) - 1)
+            result[row].append(
+                samples[lower] + (samples[upper] - samples[lower]) * (rank - lower)
+            )
+    return result
+
+
+def _percentiles_numpy(forecast: EnsembleForecast, qs: Tuple[int, ...]) -> List[List[float]]:
+    """Per-time percentiles over the whole member x time array."""
+    matrix = np.frombuffer(forecast.values, dtype=np.float32).reshape(
+        forecast.members, len(forecast.times)
+    ).astype(np.float64)
+    with warnings.catch_warnings():
+        # Time steps no member covers are NaN, which is what we want
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(matrix, qs, axis=0).tolist()
+
+
+def ensemble_percentiles(
+    forecast: EnsembleForecast, qs: Tuple[int, ...] = NWM_PERCENTILES
+) -> List[List[float]]:
+    """Return, per percentile in qs, the value at every forecast time."""
+    if not forecast.times:
+        return [[] for _ in qs]
+    if np is None:
+        return _percentiles_python(forecast, qs)
+    return _percentiles_numpy(forecast, qs)
+
+
+def _peak(series: List[float]) -> Tuple[Optional[float], Optional[int]]:
+    """Return the largest value of a series and its index, ignoring NaN."""
+    best, best_index = None, None
+    for position, value in enumerate(series):
+        if not math.isnan(value) and (best is None or value > best):
+            best, best_index = value, position
+    return best, best_index
+
+
+def summarize(forecast: EnsembleForecast) -> NWMSummary:
+    """Return the peak flows of the ensemble percentiles."""
+    low, median, high = ensemble_percentiles(forecast)
+    peak, position = _peak(median)
+    peak_low, _ = _peak(low)
+    peak_high, _ = _peak(high)
+    return NWMSummary(
+        peak=None if peak is None else round(peak, 1),
+        peak_time=None if position is None else dt_util.utc_from_timestamp(forecast.times[position]),
+        peak_low=None if peak_low is None else round(peak_low, 1),
+        peak_high=None if peak_high is None else round(peak_high, 1),
+        reference_time=forecast.reference_time,
+        members=forecast.members,
+    )
+
+
+def _decode_range(
+    body: bytes, range_key: str, previous_reference: Optional[str]
+) -> Optional[Tuple[EnsembleForecast, NWMSummary]]:
+    """Decode, copy and summarise one range; runs in the executor."""
+    forecast = build_forecast(json_loads(body), range_key, previous_reference)
+    if forecast is None:
+        return None
+    return forecast, summarize(forecast)
+
+
+@dataclass(slots=True)
+class _RangeState:
+    """The latest issuance of one range and how to revalidate it."""
+
+    forecast: Optional[EnsembleForecast] = None
+    summary: Optional[NWMSummary] = None
+    etag: Optional[str] = None
+    # time.monotonic() of the last answered request, and of the next retry
+    # after failures
+    checked: float = -math.inf
+    failures: int = 0
+    retry_at: float = -math.inf
+
+
+@dataclass(slots=True)
+class StationNWM:
+    """NWM forecasts of one station's reach, one entry per NWM_RANGES key."""
+
+    reach_id: Optional[str] = None
+    ranges: Dict[str, _RangeState] = field(
+        default_factory=lambda: {name: _RangeState() for name in NWM_RANGES}
+    )
+
+    def summary(self, name: str) -> Optional[NWMSummary]:
+        """Return the summary of a range, if one was fetched."""
+        state = self.ranges.get(name)
+        return state.summary if state else None
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the held forecast arrays."""
+        return sum(
+            state.forecast.times.itemsize * len(state.forecast.times)
+            + state.forecast.values.itemsize * len(state.forecast.values)
+            for state in self.ranges.values()
+            if state.forecast is not None
+        )
+
+    async def async_update(
+        self, hass: HomeAssistant, hub: NWPSFetchHub, reach_id: str
+    ) -> bool:
+        """Refresh every range that is due; return True if any summary changed.
+
+        A range that fails to update keeps its previous issuance and is
+        retried after NWM_RETRY_BACKOFF, doubling up to its interval.
+        """
+        if reach_id != self.reach_id:
+            self.reach_id = reach_id
+            self.ranges = {name: _RangeState() for name in NWM_RANGES}
+        changed = False
+        now = time.monotonic()
+        for name, spec in NWM_RANGES.items():
+            state = self.ranges[name]
+            if now - state.checked < spec["interval"] or now < state.retry_at:
+                continue
+            try:
+                response = await hub.async_get(
+                    hub.reach_url(reach_id, name),
+                    timeout=NWM_TIMEOUT,
+                    etag=state.etag,
+                    max_bytes=NWM_MAX_PAYLOAD_BYTES,
+                )
+                if response.not_modified:
+                    state.checked, state.failures = now, 0
+                    continue
+                result = await hass.async_add_executor_job(
+                    _decode_range,
+                    response.body,
+                    spec["key"],
+                    state.forecast.reference_time if state.forecast else None,
+                )
+            except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+                _LOGGER.warning("Could not update NWM %s for reach %s: %s", name, reach_id, err)
+                state.failures += 1
+                state.retry_at = now + min(
+                    spec["interval"], NWM_RETRY_BACKOFF * 2 ** (state.failures - 1)
+                )
+                continue
+            state.checked, state.failures = now, 0
+            state.etag = response.etag
+            if result is None:
+                continue
+            state.forecast, summary = result
+            if summary != state.summary:
+                state.summary = summary
+                changed = True
+        return changed
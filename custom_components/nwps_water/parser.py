@@ -0,0 +1,165 @@
+"""Table-driven parser that turns NWPS gauge payloads into snapshots.
+
+FIELD_SPECS in const.py describes where each snapshot field lives in the
+payload. compile_parser turns that table into one generated function that
+walks every shared path prefix once and converts each value in a single
+pass, instead of repeating .get() chains per field.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.util.json import json_loads
+
+from .const import FIELD_SPECS, STATUS_FIELDS
+from .models import StationSnapshot
+
+_EMPTY: Dict[str, Any] = {}
+
+
+def _to_float_safe(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _is_valid_reading(value: Optional[float]) -> bool:
+    """Check if a reading is valid (not a sentinel/error value).
+
+    NWPS API uses -999 to indicate missing or invalid data.
+    """
+    if value is None:
+        return False
+    # Common NWPS sentinel values for missing/invalid data
+    if value in (-999, -999.0):
+        return False
+    return True
+
+
+def _k_prefix_to_multiplier(unit: Optional[str]) -> float:
+    """Return multiplier if unit includes a kilo prefix (e.g., 'kcfs' => 1000)."""
+    if not unit:
+        return 1.0
+    unit_lower = unit.lower()
+    # common NWPS example used "kcfs" for thousands of cfs
+    if "kcfs" in unit_lower or unit_lower.startswith("k"):
+        return 1000.0
+    return 1.0
+
+
+def _reading(value: Any, unit: Optional[str]) -> Optional[float]:
+    """Convert a reading, dropping sentinels and normalising kilo units."""
+    number = _to_float_safe(value)
+    if not _is_valid_reading(number):
+        return None
+    if unit:
+        return number * _k_prefix_to_multiplier(unit)
+    return number
+
+
+def _first(*values: Any) -> Any:
+    """Return the first value that is not None."""
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+def _photos(value: Any) -> Optional[List[Dict[str, Optional[str]]]]:
+    """Reduce the GeoJSON photo features to their URL, caption and date."""
+    if value.__class__ is not list:
+        return None
+    photos = []
+    for feature in value:
+        if not isinstance(feature, dict):
+            continue
+        props = feature.get("properties") or {}
+        url = props.get("image") or feature.get("image")
+        if url:
+            photos.append(
+                {"url": url, "caption": props.get("caption"), "date": props.get("photoDate")}
+            )
+    return photos or None
+
+
+def compile_parser(
+    specs: Dict[str, Dict[str, Any]],
+    factory: Callable[..., Any] = StationSnapshot,
+) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a field-spec table into a single extractor function."""
+    lines: List[str] = []
+    nodes: Dict[Tuple[str, ...], str] = {(): "payload"}
+
+    def node(prefix: Tuple[str, ...]) -> str:
+        """Return the local holding the dict at `prefix`, emitting it once."""
+        if prefix not in nodes:
+            parent = node(prefix[:-1])
+            name = f"n{len(nodes)}"
+            lines.append(f"    {name} = {parent}.get({prefix[-1]!r})")
+            lines.append(f"    if {name}.__class__ is not dict: {name} = _EMPTY")
+            nodes[prefix] = name
+        return nodes[prefix]
+
+    def lookup(path: Tuple[str, ...]) -> str:
+        return f"{node(tuple(path[:-1]))}.get({path[-1]!r})"
+
+    arguments: List[str] = []
+    for field, spec in specs.items():
+        values = [lookup(path) for path in spec["paths"]]
+        kind = spec["kind"]
+        if kind == "text":
+            arguments.append(f"        {field}={' or '.join(values)},")
+            continue
+        raw = values[0] if len(values) == 1 else f"_first({', '.join(values)})"
+        # Bind the raw value to a local so the common case, a JSON float,
+        # skips the generic conversion helpers entirely
+        local = f"v_{field}"
+        lines.append(f"    {local} = {raw}")
+        if kind == "float":
+            expr = f"{local} if {local}.__class__ is float else _to_float_safe({local})"
+        elif kind == "reading":
+            unit = lookup(spec["unit_path"]) if "unit_path" in spec else None
+            scaled = f"{local} * _scale({unit})" if unit else local
+            expr = (
+                f"{scaled} if {local}.__class__ is float and {local} != -999.0 "
+                f"else _reading({local}, {unit})"
+            )
+        elif kind == "photos":
+            expr = f"_photos({local})"
+        else:
+            raise ValueError(f"Unknown field kind {kind!r} for {field}")
+        arguments.append(f"        {field}=({expr}),")
+
+    source = "\n".join(
+        ["def extract(payload):", *lines, "    return _factory(", *arguments, "    )", ""]
+    )
+    namespace: Dict[str, Any] = {
+        "_EMPTY": _EMPTY,
+        "_factory": factory,
+        "_first": _first,
+        "_photos": _photos,
+        "_reading": _reading,
+        "_scale": _k_prefix_to_multiplier,
+        "_to_float_safe": _to_float_safe,
+    }
+    exec(compile(source, "<nwps field specs>", "exec"), namespace)  # noqa: S102
+    return namespace["extract"]
+
+
+# Compiled once at import; parses a gauge payload into a StationSnapshot
+parse_station = compile_parser(FIELD_SPECS)
+# Parses the status of a gauge payload or listing row into snapshot field
+# keyword arguments
+parse_status = compile_parser({field: FIELD_SPECS[field] for field in STATUS_FIELDS}, dict)
+
+
+def decode_station(
+    body: bytes, parser: Callable[[Dict[str, Any]], Any] = parse_station
+) -> Tuple[Dict[str, Any], Any]:
+    """Decode a gauge payload and parse it; safe to run in the executor.
+
+    Pass parse_status to parse only the status fields.
+    """
+    payload = json_loads(body)
+    return payload, parser(payload)
@@ -0,0 +1,323 @@
+"""Regional flood summaries, maintained incrementally as stations update."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.start import async_at_started
+from homeassistant.util import slugify
+
+from .const import (
+    DATA_REGIONS,
+    DOMAIN,
+    FLOOD_CATEGORY_ORDER,
+    IN_FLOOD_CATEGORIES,
+    REGION_SENSORS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# (region key, observed category, forecast category) last reported by a station
+_StationState = Tuple[str, Optional[str], Optional[str]]
+
+_UNIQUE_ID_PREFIX = "nwps_region_"
+
+
+def region_unique_id(key: str, sensor: str) -> str:
+    """Return the unique id of one of a region's REGION_SENSORS."""
+    return f"{_UNIQUE_ID_PREFIX}{key}_{sensor}"
+
+
+def _region_of_unique_id(unique_id: str) -> Optional[str]:
+    """Return the region key of a region sensor's unique id, else None."""
+    if not unique_id.startswith(_UNIQUE_ID_PREFIX):
+        return None
+    for sensor in REGION_SENSORS:
+        if unique_id.endswith(f"_{sensor}"):
+            return unique_id[len(_UNIQUE_ID_PREFIX) : -len(sensor) - 1]
+    return None
+
+
+class CategoryIndex:
+    """The stations of a region in each flood category.
+
+    Moving a station between categories and reading the highest category
+    both cost O(1): the ranked categories are a fixed, short list.
+    """
+
+    __slots__ = ("members",)
+
+    def __init__(self) -> None:
+        """Initialize with no stations."""
+        # category -> stations, a dict as an ordered set; no empty sets
+        self.members: Dict[str, Dict[str, None]] = {}
+
+    def move(self, station_id: str, old: Optional[str], new: Optional[str]) -> None:
+        """Move a station from one category to another; None is neither."""
+        if old == new:
+            return
+        if old is not None:
+            stations = self.members.get(old)
+            if stations is not None:
+                stations.pop(station_id, None)
+                if not stations:
+                    del self.members[old]
+        if new is not None:
+            self.members.setdefault(new, {})[station_id] = None
+
+    def highest(self) -> Optional[str]:
+        """Return the most severe category any station is in."""
+        for category in reversed(FLOOD_CATEGORY_ORDER):
+            if category in self.members:
+                return category
+        # Only unranked categories such as not_defined
+        return next(iter(self.members), None)
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of stations in each category."""
+        return {category: len(stations) for category, stations in self.members.items()}
+
+    def in_flood_count(self) -> int:
+        """Return the number of stations at minor flood or worse."""
+        return sum(len(self.members.get(category, ())) for category in IN_FLOOD_CATEGORIES)
+
+    def in_flood(self) -> List[str]:
+        """Return the stations at minor flood or worse, most severe first."""
+        return [
+            station_id
+            for category in reversed(IN_FLOOD_CATEGORIES)
+            for station_id in self.members.get(category, ())
+        ]
+
+
+@dataclass(slots=True)
+class FloodRegion:
+    """The stations of one region and the sensors summarising them."""
+
+    # Slug of the name, which keys the region and its unique ids
+    key: str
+    # As first configured; names with the same slug share the region
+    name: str
+    stations: Dict[str, None] = field(default_factory=dict)
+    observed: CategoryIndex = field(default_factory=CategoryIndex)
+    forecast: CategoryIndex = field(default_factory=CategoryIndex)
+    entities: List[Any] = field(default_factory=list)
+    # Entry whose sensor platform added the entities
+    host: Optional[str] = None
+
+
+def _category(value: Optional[str]) -> Optional[str]:
+    """Normalise a flood category as reported by NWPS."""
+    return str(value).lower() if value else None
+
+
+class NWPSRegionSummary:
+    """Flood category tallies per region across every configured station.
+
+    Coordinators report each station's categories after every new snapshot.
+    Unchanged categories return at once; a change moves the station between
+    the CategoryIndex sets of its region, so an update is O(1) however many
+    stations are configured, and only that region's sensors write state.
+
+    A region's sensors are added through the sensor platform of an entry
+    that has stations in it. They move to another such entry when that one
+    unloads. When the region has no stations left they are removed, and so
+    are their registry entries unless the stations are only unloading:
+    a reload brings them back. Registry entries of regions that did not
+    come back are removed by async_remove_orphans.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize with no regions."""
+        self.hass = hass
+        self._regions: Dict[str, FloodRegion] = {}
+        self._stations: Dict[str, _StationState] = {}
+        self._station_entries: Dict[str, str] = {}
+        # entry id -> (add entities callback, region sensor factory)
+        self._hosts: Dict[str, Tuple[AddEntitiesCallback, Callable[[FloodRegion], List[Any]]]] = {}
+        self.updates = 0
+
+    @property
+    def regions(self) -> Dict[str, FloodRegion]:
+        """Return the regions with at least one station, by key."""
+        return self._regions
+
+    @callback
+    def async_update_station(
+        self,
+        station_id: str,
+        entry_id: str,
+        region: Optional[str],
+        observed: Optional[str],
+        forecast: Optional[str],
+    ) -> None:
+        """Record a station's region and categories; None region drops it."""
+        if region is None:
+            self._async_drop(station_id, unloading=False)
+            return
+        key = slugify(region)
+        current = (key, _category(observed), _category(forecast))
+        previous = self._stations.get(station_id)
+        if previous == current:
+            return
+        self.updates += 1
+        self._stations[station_id] = current
+        self._station_entries[station_id] = entry_id
+        if previous is not None and previous[0] != key:
+            self._async_leave(station_id, previous, unloading=False)
+            previous = None
+        target = self._regions.get(key)
+        if target is None:
+            target = self._regions[key] = FloodRegion(key, region)
+        target.stations[station_id] = None
+        target.observed.move(station_id, previous[1] if previous else None, current[1])
+        target.forecast.move(station_id, previous[2] if previous else None, current[2])
+        self._async_publish(target)
+
+    @callback
+    def async_remove_station(self, station_id: str) -> None:
+        """Drop the station of an entry that is unloading."""
+        self._async_drop(station_id, unloading=True)
+
+    @callback
+    def async_remove_orphans(self) -> None:
+        """Remove the registry entries of regions that no station is in.
+
+        Only runs once every enabled entry is loaded, so a region whose
+        stations are still being set up is kept.
+        """
+        if any(
+            entry.state is not ConfigEntryState.LOADED
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.disabled_by is None
+        ):
+            return
+        registry = er.async_get(self.hass)
+        for entity in list(registry.entities.values()):
+            if entity.platform != DOMAIN:
+                continue
+            key = _region_of_unique_id(entity.unique_id)
+            if key is not None and key not in self._regions:
+                _LOGGER.debug("Removing %s of a region with no stations", entity.entity_id)
+                registry.async_remove(entity.entity_id)
+
+    @callback
+    def _async_drop(self, station_id: str, unloading: bool) -> None:
+        """Take a station out of the summary."""
+        self._station_entries.pop(station_id, None)
+        previous = self._stations.pop(station_id, None)
+        if previous is not None:
+            self._async_leave(station_id, previous, unloading)
+
+    @callback
+    def async_add_host(
+        self,
+        entry_id: str,
+        async_add_entities: AddEntitiesCallback,
+        factory: Callable[[FloodRegion], List[Any]],
+    ) -> None:
+        """Let an entry's sensor platform add region sensors."""
+        self._hosts[entry_id] = (async_add_entities, factory)
+        for region in self._regions.values():
+            if not region.entities:
+                self._async_host(region)
+
+    @callback
+    def async_remove_host(self, entry_id: str) -> None:
+        """Move the region sensors of an unloaded entry to another entry.
+
+        The entry's platforms have already removed its entities.
+        """
+        self._hosts.pop(entry_id, None)
+        for region in self._regions.values():
+            if region.host == entry_id:
+                region.entities = []
+                region.host = None
+                self._async_host(region)
+
+    @callback
+    def _async_leave(self, station_id: str, previous: _StationState, unloading: bool) -> None:
+        """Take a station out of the region it was last reported in."""
+        region = self._regions[previous[0]]
+        del region.stations[station_id]
+        region.observed.move(station_id, previous[1], None)
+        region.forecast.move(station_id, previous[2], None)
+        if region.stations:
+            self._async_publish(region)
+            return
+        del self._regions[region.key]
+        registry = None if unloading else er.async_get(self.hass)
+        for entity in region.entities:
+            if registry is not None and entity.registry_entry is not None:
+                # Also removes the entity from the state machine
+                registry.async_remove(entity.entity_id)
+            elif entity.hass is not None:
+                self.hass.async_create_task(entity.async_remove())
+
+    @callback
+    def _async_publish(self, region: FloodRegion) -> None:
+        """Write the region's sensors, adding them first if needed."""
+        if not region.entities:
+            self._async_host(region)
+            return
+        for entity in region.entities:
+            if entity.hass is not None:
+                entity.async_write_ha_state()
+
+    @callback
+    def _async_host(self, region: FloodRegion) -> None:
+        """Add a region's sensors through an entry with stations in it."""
+        entry_id = next(
+            (
+                self._station_entries[station_id]
+                for station_id in region.stations
+                if self._station_entries.get(station_id) in self._hosts
+            ),
+            None,
+        )
+        if entry_id is None:
+            # Added once the sensor platform of one of its entries is set up
+            return
+        async_add_entities, factory = self._hosts[entry_id]
+        region.host = entry_id
+        region.entities = factory(region)
+        _LOGGER.debug("Adding flood summary sensors for region %s", region.name)
+        async_add_entities(region.entities)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the region tallies for diagnostics."""
+        return {
+            "updates": self.updates,
+            "regions": {
+                region.name: {
+                    "stations": len(region.stations),
+                    "observed": region.observed.counts(),
+                    "forecast": region.forecast.counts(),
+                    "host": region.host,
+                }
+                for region in self._regions.values()
+            },
+        }
+
+
+@callback
+def get_region_summary(hass: HomeAssistant) -> NWPSRegionSummary:
+    """Return the domain regional flood summary, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    summary = domain_data.get(DATA_REGIONS)
+    if summary is None:
+        summary = domain_data[DATA_REGIONS] = NWPSRegionSummary(hass)
+        # Regions renamed or emptied while Home Assistant was stopped
+        async_at_started(hass, _async_remove_orphans)
+    return summary
+
+
+@callback
+def _async_remove_orphans(hass: HomeAssistant) -> None:
+    """Remove the registry entries of regions no station is in any more."""
+    get_region_summary(hass).async_remove_orphans()
@@ -1,8 +1,11 @@
 """Sensors for NWPS Water integration."""
 from __future__ import annotations
 from .coordinator import NWPSDataCoordinator
+from .group import entry_coordinators
+from .regions import FloodRegion, get_region_summary, region_unique_id
 
 import logging
+from functools import partial
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -11,12 +14,25 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, AVAILABLE_PARAMETERS, CONF_PARAMETERS, CONF_STATION
+from .const import (
+    DOMAIN,
+    ANALYTICS_SENSORS,
+    AVAILABLE_PARAMETERS,
+    DEADBAND_OPTIONS,
+    DIAGNOSTIC_SENSORS,
+    METADATA_PARAMETERS,
+    NWM_RANGES,
+    REGION_SENSORS,
+    SIGNAL_METRICS_UPDATED,
+    SIGNAL_OPTIONS_UPDATED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,18 +42,84 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors for a config entry."""
-    # Retrieve the coordinator created in __init__.py
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    station_id = entry.data.get(CONF_STATION)
-    parameters = entry.options.get(CONF_PARAMETERS, list(AVAILABLE_PARAMETERS.keys()))
+    # One coordinator per station; a group entry has several
+    entities = []
+    for coordinator in entry_coordinators(hass, entry):
+        entities.extend(_station_sensors(hass, entry, coordinator, async_add_entities))
+    async_add_entities(entities)
 
-    entities = [
-        NWPSWaterSensor(coordinator, station_id, param)
-        for param in parameters
-    ]
+    # Flood summaries of the regions this entry's stations are in
+    regions = get_region_summary(hass)
+    regions.async_add_host(
+        entry.entry_id,
+        async_add_entities,
+        lambda region: [NWPSRegionSensor(region, key) for key in REGION_SENSORS],
+    )
+    entry.async_on_unload(partial(regions.async_remove_host, entry.entry_id))
 
-    async_add_entities(entities)
+
+def _station_sensors(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: NWPSDataCoordinator,
+    async_add_entities: AddEntitiesCallback,
+) -> list:
+    """Return a station's sensors and follow its parameter options."""
+    station_id = coordinator.station_id
+
+    def parameter_sensor(param: str) -> NWPSWaterSensor:
+        return NWPSWaterSensor(
+            coordinator,
+            station_id,
+            param,
+            coordinator.options.get(DEADBAND_OPTIONS.get(param), 0.0),
+        )
+
+    # Kept current as parameters are added or removed in the options
+    sensors = {param: parameter_sensor(param) for param in coordinator.parameters}
+    entities = list(sensors.values())
+    if coordinator.series is not None:
+        # Forecast analytics need the hydrograph series
+        entities.extend(
+            NWPSForecastSensor(coordinator, station_id, key)
+            for key in ANALYTICS_SENSORS
+        )
+    if coordinator.nwm is not None:
+        entities.extend(
+            NWPSNWMSensor(coordinator, station_id, name) for name in NWM_RANGES
+        )
+    entities.extend(
+        NWPSMetricSensor(coordinator, station_id, key)
+        for key in DIAGNOSTIC_SENSORS
+    )
+
+    @callback
+    def async_options_updated() -> None:
+        """Add and remove parameter sensors without reloading the entry."""
+        registry = er.async_get(hass)
+        for param in [param for param in sensors if param not in coordinator.parameters]:
+            sensor = sensors.pop(param)
+            # Removing the registry entry removes the entity from the state
+            # machine too, instead of leaving it restored as unavailable
+            if sensor.entity_id is not None:
+                registry.async_remove(sensor.entity_id)
+        added = []
+        for param in coordinator.parameters:
+            deadband = coordinator.options.get(DEADBAND_OPTIONS.get(param), 0.0)
+            if param in sensors:
+                sensors[param].set_deadband(deadband)
+            else:
+                sensors[param] = parameter_sensor(param)
+                added.append(sensors[param])
+        if added:
+            async_add_entities(added)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(station_id), async_options_updated
+        )
+    )
+    return entities
 
 
 class NWPSWaterSensor(CoordinatorEntity, SensorEntity):
@@ -45,11 +127,31 @@ class NWPSWaterSensor(CoordinatorEntity, SensorEntity):
 
     # Entity naming is handled manually to create concise entity IDs
     _attr_has_entity_name = False
+    # Excluded from recorder by default, so it is not stored with every state
+    _attr_attribution = "Data provided by NOAA NWPS"
+    # Static or bulky attributes; the recorder would copy them into each
+    # new attribute row. Upstream gauges are recorded on their own sensors,
+    # thresholds on the flood stage sensors when those are selected.
+    _unrecorded_attributes = frozenset(
+        {"station_id", "parameter", "upstream", "flood_minor", "flood_moderate", "flood_major"}
+    )
 
-    def __init__(self, coordinator: NWPSDataCoordinator, station_id: str, parameter: str):
+    def __init__(
+        self,
+        coordinator: NWPSDataCoordinator,
+        station_id: str,
+        parameter: str,
+        deadband: float = 0.0,
+    ):
         super().__init__(coordinator)
         self._station_id = station_id
         self._parameter = parameter
+        # Thresholds and location only change on a metadata refresh
+        self._metadata = parameter in METADATA_PARAMETERS
+        self._deadband = deadband or 0.0
+        self._attr_native_value = self._current_value()
+        # What the last written state was built from; see _fingerprint
+        self._last_fingerprint = self._fingerprint(self._attr_native_value)
         
         info = AVAILABLE_PARAMETERS.get(parameter, {})
         
@@ -60,8 +162,10 @@ class NWPSWaterSensor(CoordinatorEntity, SensorEntity):
         self._attr_unique_id = f"nwps_{station_id}_{parameter}"
         self._attr_native_unit_of_measurement = info.get("unit")
         
-        # Set state class for numeric sensors that measure values
-        if parameter in ("stage", "flow", "forecast_stage", "forecast_flow", 
+        # Set state class for numeric sensors that measure values. Kept on
+        # thresholds and metadata too: removing it would orphan their
+        # existing long-term statistics and raise a repair issue for each.
+        if parameter in ("stage", "flow", "forecast_stage", "forecast_flow",
                          "flood_minor_stage", "flood_moderate_stage", "flood_major_stage",
                          "elevation", "river_mile"):
             self._attr_state_class = SensorStateClass.MEASUREMENT
@@ -103,31 +207,283 @@ class NWPSWaterSensor(CoordinatorEntity, SensorEntity):
             configuration_url="https://api.water.noaa.gov/nwps/v1/docs/",
         )
 
-    @property
-    def native_value(self) -> Any:
-        """Return the state of the sensor."""
+    def set_deadband(self, deadband: float) -> None:
+        """Change the deadband; it applies from the next update."""
+        self._deadband = deadband or 0.0
+
+    def _current_value(self) -> Any:
+        """Return the parameter's value in the coordinator's snapshot."""
         if not self.coordinator.data:
             return None
-        return self.coordinator.data.get(self._parameter)
+        return getattr(self.coordinator.data, self._parameter, None)
+
+    def _fingerprint(self, value: Any) -> tuple:
+        """Return the inputs of the state and attributes, cheap to compare."""
+        data = self.coordinator.data
+        if data is None or self._metadata:
+            # Metadata does not go stale, so an outage writes no new state
+            return (self.available, value)
+        stale = self.coordinator.stale
+        if self._parameter in ("stage", "forecast_stage"):
+            thresholds = (data.flood_minor_stage, data.flood_moderate_stage, data.flood_major_stage)
+        else:
+            thresholds = None
+        upstream = ()
+        if self._parameter == "stage":
+            trend = data.stage_trend
+            upstream = self.coordinator.upstream
+        elif self._parameter == "flow":
+            trend = data.flow_trend
+        else:
+            trend = None
+        return (self.available, value, thresholds, trend, upstream, stale)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value or its attributes changed."""
+        value = self._current_value()
+        previous = self._attr_native_value
+        if (
+            self._deadband
+            and isinstance(value, float)
+            and isinstance(previous, float)
+            and abs(value - previous) < self._deadband
+        ):
+            # Within the deadband: keep reporting the last written reading
+            value = previous
+        fingerprint = self._fingerprint(value)
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self._attr_native_value = value
+        self.async_write_ha_state()
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return entity specific state attributes."""
-        data = self.coordinator.data or {}
+        data = self.coordinator.data
         attrs = {
             "station_id": self._station_id,
             "parameter": self._parameter,
-            "attribution": "Data provided by NOAA NWPS",
         }
-        
-        # Add relevant metadata based on parameter type
+        if data is None or self._metadata:
+            return attrs
+        # Marks last good data served while NWPS cannot be reached
+        attrs.update(self.coordinator.staleness_attributes())
+
+        # Flood thresholds for stage readings; shown but not recorded
         if self._parameter in ("stage", "forecast_stage"):
-            # Include flood thresholds for stage readings
-            if data.get("flood_minor_stage"):
-                attrs["flood_minor"] = data.get("flood_minor_stage")
-            if data.get("flood_moderate_stage"):
-                attrs["flood_moderate"] = data.get("flood_moderate_stage")
-            if data.get("flood_major_stage"):
-                attrs["flood_major"] = data.get("flood_major_stage")
+            attrs.update(data.flood_thresholds())
+
+        # Trend / rate of rise from the optional hydrograph series
+        if self._parameter == "stage":
+            attrs.update(data.stage_trend or {})
+            # Gauges upstream along the river, when tracking is enabled
+            if self.coordinator.upstream:
+                attrs["upstream"] = [gauge.as_dict() for gauge in self.coordinator.upstream]
+                attrs["upstream_crest_arriving"] = any(
+                    gauge.flooding for gauge in self.coordinator.upstream
+                )
+        elif self._parameter == "flow":
+            attrs.update(data.flow_trend or {})
         
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class NWPSForecastSensor(CoordinatorEntity, SensorEntity):
+    """Crest, flood onset or rate of rise derived from the forecast series."""
+
+    _attr_has_entity_name = False
+
+    def __init__(self, coordinator: NWPSDataCoordinator, station_id: str, key: str):
+        super().__init__(coordinator)
+        self._station_id = station_id
+        self._key = key
+
+        info = ANALYTICS_SENSORS[key]
+        self._attr_name = f"{station_id} {info['name']}"
+        self._attr_unique_id = f"nwps_{station_id}_{key}"
+        self._attr_native_unit_of_measurement = info["unit"]
+
+        if key.endswith("_time"):
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+            self._attr_icon = "mdi:clock-alert-outline"
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_icon = "mdi:trending-up" if key == "stage_rate_of_rise" else "mdi:waves-arrow-up"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, station_id)},
+            name=coordinator.get_device_name(),
+            manufacturer="NOAA NWPS",
+        )
+        self._last_fingerprint = (self.available, self.native_value)
+
+    @property
+    def native_value(self) -> Any:
+        """Return the latest batch result for this value."""
+        analytics = self.coordinator.analytics
+        if analytics is None:
+            return None
+        return getattr(analytics, self._key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the derived value changed."""
+        fingerprint = (self.available, self.native_value)
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+
+class NWPSNWMSensor(CoordinatorEntity, SensorEntity):
+    """Peak flow of the ensemble median of one National Water Model range."""
+
+    _attr_has_entity_name = False
+    _attr_native_unit_of_measurement = "cfs"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
+    _unrecorded_attributes = frozenset({"station_id", "reference_time", "members"})
+
+    def __init__(self, coordinator: NWPSDataCoordinator, station_id: str, range_name: str):
+        super().__init__(coordinator)
+        self._station_id = station_id
+        self._range = range_name
+        self._attr_name = f"{station_id} NWM {NWM_RANGES[range_name]['name']} Peak Flow"
+        self._attr_unique_id = f"nwps_{station_id}_nwm_{range_name}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, station_id)},
+            name=coordinator.get_device_name(),
+            manufacturer="NOAA NWPS",
+        )
+        self._last_fingerprint = (self.available, self.coordinator.nwm.summary(range_name))
+
+    @property
+    def native_value(self) -> Any:
+        """Return the peak of the ensemble median."""
+        summary = self.coordinator.nwm.summary(self._range)
+        return summary.peak if summary else None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the peak time, percentile peaks and issuance."""
+        summary = self.coordinator.nwm.summary(self._range)
+        attrs = {"station_id": self._station_id}
+        if summary is not None:
+            attrs.update(summary.attributes())
+        return attrs
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when a new issuance changed the summary."""
+        fingerprint = (self.available, self.coordinator.nwm.summary(self._range))
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+
+class NWPSMetricSensor(SensorEntity):
+    """Fetch/parse metric of a station's coordinator, as a diagnostic sensor.
+
+    Updated from a dispatcher signal after every update cycle, including
+    unchanged and failed ones that do not notify the data entities.
+    """
+
+    _attr_has_entity_name = False
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # Hundreds of stations would add thousands of recorder rows; opt in
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: NWPSDataCoordinator, station_id: str, key: str):
+        self._metrics = coordinator.metrics
+        self._station_id = station_id
+        self._key = key
+
+        info = DIAGNOSTIC_SENSORS[key]
+        self._attr_name = f"{station_id} {info['name']}"
+        self._attr_unique_id = f"nwps_{station_id}_{key}"
+        self._attr_native_unit_of_measurement = info["unit"]
+
+        if key in ("http_latency", "parse_time"):
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        elif key == "payload_bytes":
+            self._attr_device_class = SensorDeviceClass.DATA_SIZE
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        elif key in ("unchanged_hits", "stale_serves"):
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_icon = "mdi:speedometer" if key != "consecutive_failures" else "mdi:alert-octagon"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, station_id)},
+            name=coordinator.get_device_name(),
+            manufacturer="NOAA NWPS",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the coordinator's metrics signal."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_METRICS_UPDATED.format(self._station_id),
+                self.async_write_ha_state,
+            )
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the latest value of the metric."""
+        return getattr(self._metrics, self._key)
+
+
+class NWPSRegionSensor(SensorEntity):
+    """Flood summary across the configured stations of one region.
+
+    Written by the regional summary when a station's category changes, so
+    it reads the region's category index rather than any one coordinator.
+    """
+
+    _attr_has_entity_name = False
+    _attr_should_poll = False
+    _attr_attribution = "Data provided by NOAA NWPS"
+    _unrecorded_attributes = frozenset({"region"})
+
+    def __init__(self, region: FloodRegion, key: str):
+        self._region = region
+        self._key = key
+
+        info = REGION_SENSORS[key]
+        self._attr_name = f"{region.name} {info['name']}"
+        self._attr_unique_id = region_unique_id(region.key, key)
+        self._attr_icon = info["icon"]
+        if key == "stations_in_flood":
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> Any:
+        """Return the highest category, or the number of stations in flood."""
+        region = self._region
+        if self._key == "observed_category":
+            return region.observed.highest()
+        if self._key == "forecast_category":
+            return region.forecast.highest()
+        return region.observed.in_flood_count()
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the station count per category, or the stations in flood."""
+        region = self._region
+        attrs = {"region": region.name, "stations": len(region.stations)}
+        if self._key == "observed_category":
+            attrs["categories"] = region.observed.counts()
+        elif self._key == "forecast_category":
+            attrs["categories"] = region.forecast.counts()
+        else:
+            attrs["observed_stations"] = region.observed.in_flood()
+            attrs["forecast_stations"] = region.forecast.in_flood()
+        return attrs
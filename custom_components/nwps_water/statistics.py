@@ -0,0 +1,285 @@
+"""Backfill of NWPS observed history into recorder long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .breaker import STATE_CLOSED, get_circuit_breaker
+from .const import (
+    DATA_STATISTICS,
+    DOMAIN,
+    STATISTICS_BACKLOG_MAX_WAIT,
+    STATISTICS_BACKLOG_POLL,
+    STATISTICS_IMPORT_INTERVAL,
+    STATISTICS_MAX_BACKLOG,
+    STATISTICS_PARAMETERS,
+    STATISTICS_TIMEOUT,
+)
+from .hub import NWPSError, get_hub
+from .parser import _k_prefix_to_multiplier
+from .timeseries import _parse_time, _reading
+
+# The recorder is imported where it is used: the importer only runs for
+# stations that opted in, with the recorder loaded.
+
+if TYPE_CHECKING:
+    from .coordinator import NWPSDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = 3600
+
+# (hour start, mean, min, max), oldest first
+HourlyRow = Tuple[float, float, float, float]
+
+
+def statistic_id(station_id: str, field: str) -> str:
+    """Return the external statistic id of a station's stage or flow."""
+    return f"{DOMAIN}:{station_id.lower()}_{field}"
+
+
+def hourly_statistics(
+    payload: Any, after: Dict[str, Optional[float]], now: float
+) -> Dict[str, List[HourlyRow]]:
+    """Aggregate observed points into hourly mean, min and max per field.
+
+    Accepts a /stageflow or /stageflow/observed payload. Only complete hours
+    that start after after[field] are returned; the current hour is left
+    for a later run.
+    """
+    observed = payload.get("observed", payload) if isinstance(payload, dict) else {}
+    if not isinstance(observed, dict):
+        return {field: [] for field in STATISTICS_PARAMETERS}
+    multipliers = {"primary": 1.0, "secondary": _k_prefix_to_multiplier(observed.get("secondaryUnits"))}
+    current_hour = now - now % _HOUR
+    # field -> hour -> [sum, count, min, max]
+    buckets: Dict[str, Dict[float, List[float]]] = {field: {} for field in STATISTICS_PARAMETERS}
+    for point in observed.get("data") or []:
+        timestamp = _parse_time(point.get("validTime"))
+        if timestamp is None:
+            continue
+        hour = timestamp - timestamp % _HOUR
+        if hour >= current_hour:
+            continue
+        for field, info in STATISTICS_PARAMETERS.items():
+            last = after.get(field)
+            if last is not None and hour <= last:
+                continue
+            value = _reading(point.get(info["key"]), multipliers[info["key"]])
+            if math.isnan(value):
+                continue
+            bucket = buckets[field].get(hour)
+            if bucket is None:
+                buckets[field][hour] = [value, 1, value, value]
+            else:
+                bucket[0] += value
+                bucket[1] += 1
+                if value < bucket[2]:
+                    bucket[2] = value
+                elif value > bucket[3]:
+                    bucket[3] = value
+    return {
+        field: [
+            (hour, total / count, low, high)
+            for hour, (total, count, low, high) in sorted(hours.items())
+        ]
+        for field, hours in buckets.items()
+    }
+
+
+def _decode_hourly(
+    body: bytes, after: Dict[str, Optional[float]], now: float
+) -> Dict[str, List[HourlyRow]]:
+    """Decode a payload and aggregate it; runs in the executor."""
+    return hourly_statistics(json_loads(body), after, now)
+
+
+class NWPSStatisticsImporter:
+    """Import hourly stage and flow statistics for every opted-in station.
+
+    Stations are processed one at a time by a single worker, first when they
+    are registered and then every STATISTICS_IMPORT_INTERVAL. Each station's
+    new hours go to the recorder as one batch per statistic, and while the
+    recorder has a backlog the worker waits, for a bounded time, before the
+    next station, so a backfill across hundreds of stations never floods
+    the queue. Only hours after the newest one already recorded are
+    imported.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self._stations: Dict[str, NWPSDataCoordinator] = {}
+        # Stations waiting for the worker, in order; a dict as an ordered set
+        self._queue: Dict[str, None] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        # statistic id -> start of the newest recorded hour, None if none
+        self._last_hour: Dict[str, Optional[float]] = {}
+        self.imported_hours = 0
+        self.imports = 0
+
+    @callback
+    def async_register(self, coordinator: NWPSDataCoordinator) -> None:
+        """Add a station and queue its backfill."""
+        self._stations[coordinator.station_id] = coordinator
+        if self._unsub_timer is None:
+            self._unsub_timer = async_track_time_interval(
+                self.hass, self._async_queue_all, timedelta(seconds=STATISTICS_IMPORT_INTERVAL)
+            )
+        self._async_enqueue(coordinator.station_id)
+
+    @callback
+    def async_unregister(self, station_id: str) -> None:
+        """Stop importing a station; its recorded statistics are kept."""
+        self._stations.pop(station_id, None)
+        self._queue.pop(station_id, None)
+        if not self._stations and self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_queue_all(self, _now: Any) -> None:
+        """Queue every station for an incremental import."""
+        for station_id in self._stations:
+            self._async_enqueue(station_id)
+
+    @callback
+    def _async_enqueue(self, station_id: str) -> None:
+        """Queue a station, starting the worker if it is idle."""
+        self._queue[station_id] = None
+        if self._worker is None or self._worker.done():
+            self._worker = self.hass.async_create_background_task(
+                self._async_work(), f"{DOMAIN} statistics import"
+            )
+
+    async def _async_work(self) -> None:
+        """Import queued stations one after another."""
+        while self._queue:
+            station_id = next(iter(self._queue))
+            del self._queue[station_id]
+            coordinator = self._stations.get(station_id)
+            if coordinator is None:
+                continue
+            if get_circuit_breaker(self.hass).state != STATE_CLOSED:
+                _LOGGER.debug("NWPS unreachable, skipping statistics import for %s", station_id)
+                continue
+            try:
+                await self._async_import(coordinator)
+            except (NWPSError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+                _LOGGER.warning("Could not import statistics for station %s: %s", station_id, err)
+
+    async def _async_last_hour(self, stat_id: str) -> Optional[float]:
+        """Return the start of the newest recorded hour of a statistic."""
+        if stat_id in self._last_hour:
+            return self._last_hour[stat_id]
+        from homeassistant.components.recorder import get_instance
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        result = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, stat_id, False, {"max"}
+        )
+        rows = result.get(stat_id)
+        last: Optional[float] = None
+        if rows:
+            start = rows[0]["start"]
+            last = start if isinstance(start, (int, float)) else start.timestamp()
+        self._last_hour[stat_id] = last
+        return last
+
+    async def _async_import(self, coordinator: NWPSDataCoordinator) -> None:
+        """Fetch a station's observed history and import its new hours."""
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        try:
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:  # Home Assistant before 2025.4 only knows has_mean
+            StatisticMeanType = None
+
+        station_id = coordinator.station_id
+        ids = {field: statistic_id(station_id, field) for field in STATISTICS_PARAMETERS}
+        after = {field: await self._async_last_hour(stat_id) for field, stat_id in ids.items()}
+
+        hub = get_hub(self.hass)
+        response = await hub.async_get(
+            f"{hub.station_url(station_id)}/stageflow/observed", timeout=STATISTICS_TIMEOUT
+        )
+        hours = await self.hass.async_add_executor_job(
+            _decode_hourly, response.body, after, time.time()
+        )
+
+        name = coordinator.get_device_name()
+        imported = 0
+        for field, rows in hours.items():
+            if not rows:
+                continue
+            info = STATISTICS_PARAMETERS[field]
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{name} {info['name']}",
+                source=DOMAIN,
+                statistic_id=ids[field],
+                unit_of_measurement=info["unit"],
+            )
+            if StatisticMeanType is not None:
+                metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+            async_add_external_statistics(
+                self.hass,
+                metadata,
+                [
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(hour),
+                        mean=round(mean, 3),
+                        min=round(low, 3),
+                        max=round(high, 3),
+                    )
+                    for hour, mean, low, high in rows
+                ],
+            )
+            self._last_hour[ids[field]] = rows[-1][0]
+            imported += len(rows)
+        if not imported:
+            return
+        self.imports += 1
+        self.imported_hours += imported
+        _LOGGER.debug("Imported %s hourly statistics for station %s", imported, station_id)
+        await self._async_wait_for_recorder()
+
+    async def _async_wait_for_recorder(self) -> None:
+        """Wait while the recorder has a backlog, up to a time limit.
+
+        A busy recorder slows the import down but never stops it.
+        """
+        from homeassistant.components.recorder import get_instance
+
+        recorder = get_instance(self.hass)
+        deadline = time.monotonic() + STATISTICS_BACKLOG_MAX_WAIT
+        while recorder.backlog > STATISTICS_MAX_BACKLOG and time.monotonic() < deadline:
+            await asyncio.sleep(STATISTICS_BACKLOG_POLL)
+
+
+@callback
+def get_statistics_importer(hass: HomeAssistant) -> NWPSStatisticsImporter:
+    """Return the domain statistics importer, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    importer = domain_data.get(DATA_STATISTICS)
+    if importer is None:
+        importer = domain_data[DATA_STATISTICS] = NWPSStatisticsImporter(hass)
+    return importer
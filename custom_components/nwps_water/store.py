@@ -0,0 +1,95 @@
+"""Persisted last-good station snapshots used to hydrate entities on boot."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_SNAPSHOTS, DOMAIN, SNAPSHOT_SAVE_DELAY, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.snapshots"
+
+
+class NWPSSnapshotStore:
+    """Keep every station's last parsed snapshot in one storage file.
+
+    Writes are debounced through Store.async_delay_save, so a poll cycle
+    across hundreds of stations results in a single disk write.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[Dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load persisted snapshots from disk."""
+        data = await self._store.async_load()
+        if data:
+            self._snapshots = data.get("stations", {})
+        _LOGGER.debug("Loaded %s persisted NWPS snapshots", len(self._snapshots))
+
+    def get(self, station_id: str) -> Optional[Dict[str, Any]]:
+        """Return the persisted snapshot for a station, if any."""
+        return self._snapshots.get(station_id)
+
+    @callback
+    def async_save_snapshot(self, station_id: str, snapshot: Dict[str, Any]) -> None:
+        """Record a station snapshot and schedule a batched write."""
+        self._snapshots[station_id] = snapshot
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_confirm(self, station_id: str, updated: str) -> bool:
+        """Record that a station's snapshot was confirmed current at updated.
+
+        Returns False if the station has no persisted snapshot to update.
+        """
+        snapshot = self._snapshots.get(station_id)
+        if snapshot is None:
+            return False
+        snapshot["updated"] = updated
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+        return True
+
+    @callback
+    def async_remove(self, station_id: str) -> None:
+        """Forget a removed station."""
+        if self._snapshots.pop(station_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to write to disk."""
+        return {"stations": self._snapshots}
+
+
+async def async_get_snapshot_store(hass: HomeAssistant) -> NWPSSnapshotStore:
+    """Return the loaded domain snapshot store.
+
+    Entries set up concurrently share one load from disk. A failed load is
+    retried by the next caller.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    loader: Optional[asyncio.Future] = domain_data.get(DATA_SNAPSHOTS)
+    if loader is None:
+        store = NWPSSnapshotStore(hass)
+        loader = hass.async_create_task(_async_load(store))
+        domain_data[DATA_SNAPSHOTS] = loader
+    try:
+        return await asyncio.shield(loader)
+    except Exception:
+        if loader.done() and domain_data.get(DATA_SNAPSHOTS) is loader:
+            del domain_data[DATA_SNAPSHOTS]
+        raise
+
+
+async def _async_load(store: NWPSSnapshotStore) -> NWPSSnapshotStore:
+    """Load a store and return it."""
+    await store.async_load()
+    return store
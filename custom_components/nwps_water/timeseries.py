@@ -0,0 +1,245 @@
+"""Compact ring-buffer storage for NWPS stage/flow hydrograph series."""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .const import SERIES_SAMPLE_SPACING, SERIES_TREND_WINDOW
+from .parser import _k_prefix_to_multiplier
+
+_NAN = float("nan")
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    """Return an ISO-8601 timestamp as POSIX seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _reading(value: Any, multiplier: float = 1.0) -> float:
+    """Return a reading as float, mapping missing and -999 sentinels to NaN."""
+    try:
+        reading = float(value)
+    except (TypeError, ValueError):
+        return _NAN
+    if reading == -999:
+        return _NAN
+    return reading * multiplier
+
+
+class SeriesBuffer:
+    """Ring buffer of (time, stage, flow) samples.
+
+    Samples live in three parallel typed arrays rather than a list of dicts,
+    so a week of 15-minute data costs ~16 bytes per point. The capacity is
+    fixed unless the owner grows it, see StationSeries.
+    """
+
+    __slots__ = ("capacity", "_times", "_stage", "_flow", "_start", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty buffer holding at most `capacity` samples."""
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._stage = array("f", bytes(4 * capacity))
+        self._flow = array("f", bytes(4 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        """Return True if the next append overwrites the oldest sample."""
+        return self._size == self.capacity
+
+    @property
+    def first_time(self) -> Optional[float]:
+        """Return the timestamp of the oldest sample."""
+        if not self._size:
+            return None
+        return self._times[self._start]
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """Return the timestamp of the newest sample."""
+        if not self._size:
+            return None
+        return self._times[(self._start + self._size - 1) % self.capacity]
+
+    def clear(self) -> None:
+        """Drop all samples without releasing the arrays."""
+        self._start = 0
+        self._size = 0
+
+    def grow(self, capacity: int) -> None:
+        """Re-allocate for a larger capacity, keeping the samples in order."""
+        times, stage = self.ordered("stage")
+        _, flow = self.ordered("flow")
+        extra = capacity - len(times)
+        self._times = times + array("d", bytes(8 * extra))
+        self._stage = stage + array("f", bytes(4 * extra))
+        self._flow = flow + array("f", bytes(4 * extra))
+        self.capacity = capacity
+        self._start = 0
+
+    def append(self, timestamp: float, stage: float, flow: float) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[index] = timestamp
+        self._stage[index] = stage
+        self._flow[index] = flow
+
+    def prune_before(self, timestamp: float) -> None:
+        """Drop samples older than `timestamp`."""
+        while self._size and self._times[self._start] < timestamp:
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+
+    def samples(self) -> Iterator[Tuple[float, float, float]]:
+        """Yield (time, stage, flow) from oldest to newest."""
+        for offset in range(self._size):
+            index = (self._start + offset) % self.capacity
+            yield self._times[index], self._stage[index], self._flow[index]
+
+    def ordered(self, field: str, since: Optional[float] = None) -> Tuple[array, array]:
+        """Return copies of the times and `field` values, oldest first.
+
+        With `since`, only samples at or after that time are included.
+        """
+        values = self._stage if field == "stage" else self._flow
+        end = self._start + self._size
+        if end <= self.capacity:
+            times = self._times[self._start : end]
+            field_values = values[self._start : end]
+        else:
+            wrap = end - self.capacity
+            times = self._times[self._start :] + self._times[:wrap]
+            field_values = values[self._start :] + values[:wrap]
+        if since is not None:
+            skip = bisect_left(times, since)
+            times, field_values = times[skip:], field_values[skip:]
+        return times, field_values
+
+    def latest(self, field: str) -> Optional[float]:
+        """Return the newest non-missing value of `field`."""
+        values = self._stage if field == "stage" else self._flow
+        for offset in range(self._size - 1, -1, -1):
+            value = values[(self._start + offset) % self.capacity]
+            if not math.isnan(value):
+                return value
+        return None
+
+    def rate_of_rise(self, field: str, window: float = SERIES_TREND_WINDOW) -> Optional[float]:
+        """Return the least-squares slope of `field` per hour over the window."""
+        values = self._stage if field == "stage" else self._flow
+        end = self.last_time
+        if end is None:
+            return None
+        n = 0
+        sum_t = sum_v = sum_tt = sum_tv = 0.0
+        for offset in range(self._size - 1, -1, -1):
+            index = (self._start + offset) % self.capacity
+            t = self._times[index] - end
+            if t < -window:
+                break
+            v = values[index]
+            if math.isnan(v):
+                continue
+            n += 1
+            sum_t += t
+            sum_v += v
+            sum_tt += t * t
+            sum_tv += t * v
+        denominator = n * sum_tt - sum_t * sum_t
+        if n < 2 or denominator == 0:
+            return None
+        return (n * sum_tv - sum_t * sum_v) / denominator * 3600
+
+
+class StationSeries:
+    """Observed and forecast hydrograph series for one station."""
+
+    __slots__ = ("retention", "observed", "forecast", "forecast_issued")
+
+    def __init__(self, retention_days: int) -> None:
+        """Size the buffers for 15-minute spacing.
+
+        Gauges that report more often grow them on ingest, so the observed
+        buffer always covers the retention and is evicted by time.
+        """
+        self.retention = retention_days * 86400
+        self.observed = SeriesBuffer(self.retention // SERIES_SAMPLE_SPACING)
+        # Forecasts cover a few days and are replaced on every issuance
+        self.forecast = SeriesBuffer(7 * 86400 // SERIES_SAMPLE_SPACING)
+        self.forecast_issued: Optional[str] = None
+
+    def ingest(self, stageflow: Dict[str, Any]) -> int:
+        """Merge a /stageflow payload and return the number of new samples."""
+        added = 0
+        observed = stageflow.get("observed") or {}
+        multiplier = _k_prefix_to_multiplier(observed.get("secondaryUnits"))
+        last = self.observed.last_time
+        for point in observed.get("data") or []:
+            timestamp = _parse_time(point.get("validTime"))
+            # Only points newer than what we already hold
+            if timestamp is None or (last is not None and timestamp <= last):
+                continue
+            if self.observed.full and self.observed.first_time > timestamp - self.retention:
+                # Denser than SERIES_SAMPLE_SPACING; keep the whole retention
+                self.observed.grow(self.observed.capacity * 2)
+            self.observed.append(
+                timestamp,
+                _reading(point.get("primary")),
+                _reading(point.get("secondary"), multiplier),
+            )
+            last = timestamp
+            added += 1
+        if last is not None:
+            self.observed.prune_before(last - self.retention)
+
+        forecast = stageflow.get("forecast") or {}
+        issued = forecast.get("issuedTime")
+        if issued and issued != self.forecast_issued:
+            self.forecast.clear()
+            multiplier = _k_prefix_to_multiplier(forecast.get("secondaryUnits"))
+            for point in forecast.get("data") or []:
+                timestamp = _parse_time(point.get("validTime"))
+                if timestamp is None:
+                    continue
+                if self.forecast.full:
+                    self.forecast.grow(self.forecast.capacity * 2)
+                self.forecast.append(
+                    timestamp,
+                    _reading(point.get("primary")),
+                    _reading(point.get("secondary"), multiplier),
+                )
+                added += 1
+            self.forecast_issued = issued
+        return added
+
+    def trend_attributes(self, field: str) -> Dict[str, Any]:
+        """Return rate-of-rise and trend attributes for stage or flow."""
+        rate = self.observed.rate_of_rise(field)
+        if rate is None:
+            return {}
+        latest = self.observed.latest(field) or 0.0
+        # Changes under 0.5% of the current reading per hour count as steady
+        steady = abs(rate) < abs(latest) * 0.005
+        trend = "steady" if steady else "rising" if rate > 0 else "falling"
+        return {"rate_of_rise": round(rate, 3), "trend": trend}
+
@@ -0,0 +1 @@
+"""Tests for the NWPS Water integration."""
@@ -0,0 +1,8 @@
+"""Fixtures for the NWPS Water tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Let Home Assistant load the integration from custom_components."""
+    yield
@@ -0,0 +1,140 @@
+"""Tests for the forecast analytics batcher."""
+from array import array
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.nwps_water import analytics as analytics_module
+from custom_components.nwps_water.analytics import (
+    AnalyticsInput,
+    ForecastAnalyticsBatcher,
+    compute_batch,
+)
+from custom_components.nwps_water.const import ANALYTICS_FIRST_PASS_DELAY
+
+HOUR = 3600.0
+
+
+def _input(times, stages, thresholds=(None, None, None)) -> AnalyticsInput:
+    return AnalyticsInput(
+        array("d", times), array("f", stages), array("d"), array("f"), thresholds
+    )
+
+
+def _coordinator(station_id: str, scan_interval: float, analytics=object()) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.station_id = station_id
+    coordinator.scan_interval = scan_interval
+    coordinator.analytics = analytics
+    return coordinator
+
+
+@pytest.fixture
+def call_later():
+    """Record the passes the batcher arms instead of waiting for them."""
+    with patch.object(analytics_module, "async_call_later") as mock_call_later:
+        yield mock_call_later
+
+
+async def test_short_interval_station_is_not_held_up(hass, call_later):
+    """Mixed intervals with one unchanged series: the due station decides."""
+    batcher = ForecastAnalyticsBatcher(hass)
+    slow = _coordinator("SLOW1", HOUR)
+    fast = _coordinator("FAST1", 300)
+    # Its /stageflow came back 304, so it never queues
+    unchanged = _coordinator("SAME1", 300)
+    for coordinator in (slow, fast, unchanged):
+        batcher.async_register(coordinator)
+
+    batcher.async_schedule(fast)
+
+    call_later.assert_called_once()
+    assert call_later.call_args.args[1] == 300
+
+    # A later station with a longer interval does not push the pass back
+    batcher.async_schedule(slow)
+    call_later.assert_called_once()
+
+
+async def test_earlier_deadline_rearms_the_pass(hass, call_later):
+    """A station due sooner than the armed pass brings it forward."""
+    batcher = ForecastAnalyticsBatcher(hass)
+    slow = _coordinator("SLOW1", HOUR)
+    fast = _coordinator("FAST1", 300)
+    for coordinator in (slow, fast, _coordinator("SAME1", 300)):
+        batcher.async_register(coordinator)
+
+    batcher.async_schedule(slow)
+    assert call_later.call_args.args[1] == HOUR
+    batcher.async_schedule(fast)
+
+    call_later.return_value.assert_called_once()
+    assert call_later.call_args.args[1] == 300
+
+
+async def test_first_results_are_computed_soon_after_setup(hass, call_later):
+    """Stations without results yet wait only the first pass delay."""
+    batcher = ForecastAnalyticsBatcher(hass)
+    new = _coordinator("NEW1", HOUR, analytics=None)
+    batcher.async_register(new)
+    batcher.async_register(_coordinator("SAME1", HOUR))
+
+    batcher.async_schedule(new)
+
+    assert call_later.call_args.args[1] == ANALYTICS_FIRST_PASS_DELAY
+
+
+async def test_pass_runs_at_once_when_every_station_queued(hass, call_later):
+    """With the whole fleet queued there is nothing to wait for."""
+    batcher = ForecastAnalyticsBatcher(hass)
+    stations = [_coordinator("A", HOUR), _coordinator("B", 300)]
+    for coordinator in stations:
+        batcher.async_register(coordinator)
+
+    for coordinator in stations:
+        batcher.async_schedule(coordinator)
+
+    assert call_later.call_args.args[1] == 0
+
+
+async def test_pass_hands_results_to_each_queued_station(hass, call_later):
+    """The pass analyses queued stations only and resets the queue."""
+    batcher = ForecastAnalyticsBatcher(hass)
+    queued = _coordinator("A", 300)
+    queued.analytics_input.return_value = _input([0.0, HOUR], [5.0, 7.0])
+    idle = _coordinator("B", 300)
+    batcher.async_register(queued)
+    batcher.async_register(idle)
+
+    batcher.async_schedule(queued)
+    call_later.call_args.args[2](None)
+
+    queued.async_set_analytics.assert_called_once()
+    idle.async_set_analytics.assert_not_called()
+    assert batcher.batches == 1
+    assert batcher.last_batch_size == 1
+
+
+def test_compute_batch_crest_and_onset():
+    """The crest and the first time at or above each threshold."""
+    (result,) = compute_batch(
+        [
+            _input(
+                [0.0, HOUR, 2 * HOUR, 3 * HOUR],
+                [5.0, 9.0, 12.0, 8.0],
+                (8.0, 11.0, 15.0),
+            )
+        ]
+    )
+
+    assert result.forecast_crest == 12.0
+    assert result.forecast_crest_time.timestamp() == 2 * HOUR
+    assert result.minor_flood_time.timestamp() == HOUR
+    assert result.moderate_flood_time.timestamp() == 2 * HOUR
+    assert result.major_flood_time is None
+    assert result.stage_rate_of_rise is None
+
+
+def test_compute_batch_empty():
+    """No stations, no results."""
+    assert compute_batch([]) == []
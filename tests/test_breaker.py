@@ -0,0 +1,154 @@
+"""Tests for the domain circuit breaker."""
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.nwps_water import breaker as breaker_module
+from custom_components.nwps_water.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    NWPSCircuitBreaker,
+)
+from custom_components.nwps_water.const import (
+    BREAKER_BASE_BACKOFF,
+    BREAKER_FAILURE_WINDOW,
+)
+
+
+@pytest.fixture
+def clock():
+    """Freeze the breaker's monotonic clock and take the full backoff."""
+    with patch.object(breaker_module, "time") as mock_time, patch.object(
+        breaker_module, "random"
+    ) as mock_random:
+        mock_time.monotonic.return_value = 1000.0
+        mock_random.uniform.side_effect = lambda low, high: high
+        yield mock_time
+
+
+def _breaker(hass, *station_ids: str) -> NWPSCircuitBreaker:
+    breaker = NWPSCircuitBreaker(hass)
+    for station_id in station_ids:
+        breaker.async_register(station_id)
+    return breaker
+
+
+async def test_opens_once_enough_stations_fail(hass, clock):
+    """Three failing stations open the breaker for everyone."""
+    breaker = _breaker(hass, "A", "B", "C", "D")
+
+    breaker.async_record_failure("A")
+    breaker.async_record_failure("B")
+    breaker.async_record_failure("A")
+    assert breaker.state == STATE_CLOSED
+
+    breaker.async_record_failure("C")
+    assert breaker.state == STATE_OPEN
+    assert breaker.trips == 1
+    assert breaker.retry_in == BREAKER_BASE_BACKOFF
+    assert not breaker.async_allow("D")
+    assert breaker.rejected == 1
+
+
+async def test_success_resets_a_stations_failure(hass, clock):
+    """A station that succeeds no longer counts towards opening."""
+    breaker = _breaker(hass, "A", "B", "C")
+
+    breaker.async_record_failure("A")
+    breaker.async_record_failure("B")
+    breaker.async_record_success("A")
+    breaker.async_record_failure("C")
+
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_failures_outside_the_window_do_not_count(hass, clock):
+    """Only failures within BREAKER_FAILURE_WINDOW open the breaker."""
+    breaker = _breaker(hass, "A", "B", "C")
+
+    breaker.async_record_failure("A")
+    clock.monotonic.return_value += BREAKER_FAILURE_WINDOW + 1
+    breaker.async_record_failure("B")
+    breaker.async_record_failure("C")
+
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_single_station_never_opens(hass, clock):
+    """One failing station is not evidence of an outage."""
+    breaker = _breaker(hass, "A")
+
+    for _ in range(5):
+        breaker.async_record_failure("A")
+
+    assert breaker.state == STATE_CLOSED
+
+
+async def test_two_stations_open_with_both_failing(hass, clock):
+    """With fewer stations than the threshold, all of them must fail."""
+    breaker = _breaker(hass, "A", "B")
+
+    breaker.async_record_failure("A")
+    assert breaker.state == STATE_CLOSED
+    breaker.async_record_failure("B")
+    assert breaker.state == STATE_OPEN
+
+
+async def test_probe_failure_doubles_the_backoff(hass, clock):
+    """A failed probe reopens the breaker for twice as long."""
+    breaker = _breaker(hass, "A", "B", "C")
+    for station_id in ("A", "B", "C"):
+        breaker.async_record_failure(station_id)
+
+    clock.monotonic.return_value += BREAKER_BASE_BACKOFF
+    assert breaker.async_allow("B")
+    assert breaker.state == STATE_HALF_OPEN
+    # Only the prober goes through while half open
+    assert not breaker.async_allow("C")
+    assert breaker.async_allow("B")
+
+    # Failures of other stations do not decide the probe
+    breaker.async_record_failure("C")
+    assert breaker.state == STATE_HALF_OPEN
+
+    breaker.async_record_failure("B")
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in == 2 * BREAKER_BASE_BACKOFF
+    assert breaker.trips == 1
+
+
+async def test_probe_success_closes_the_breaker(hass, clock):
+    """A successful probe resumes requests and resets the backoff."""
+    breaker = _breaker(hass, "A", "B", "C")
+    for station_id in ("A", "B", "C"):
+        breaker.async_record_failure(station_id)
+
+    clock.monotonic.return_value += BREAKER_BASE_BACKOFF
+    assert breaker.async_allow("A")
+    breaker.async_record_success("A")
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.retry_in is None
+    assert breaker.async_allow("C")
+
+    # The next outage starts again from the base backoff
+    for station_id in ("A", "B", "C"):
+        breaker.async_record_failure(station_id)
+    assert breaker.retry_in == BREAKER_BASE_BACKOFF
+    assert breaker.trips == 2
+
+
+async def test_unregistering_the_prober_releases_the_probe(hass, clock):
+    """A removed prober lets the next station probe at once."""
+    breaker = _breaker(hass, "A", "B", "C")
+    for station_id in ("A", "B", "C"):
+        breaker.async_record_failure(station_id)
+    clock.monotonic.return_value += BREAKER_BASE_BACKOFF
+    assert breaker.async_allow("A")
+
+    breaker.async_unregister("A")
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.async_allow("B")
+    assert breaker.state == STATE_HALF_OPEN
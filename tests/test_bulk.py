@@ -0,0 +1,52 @@
+"""Tests for the shared gauge listing queries."""
+from custom_components.nwps_water.bulk import group_stations, parse_status_rows
+from custom_components.nwps_water.const import BULK_MARGIN_DEGREES
+
+
+def test_group_stations_by_grid_cell():
+    """Stations in one cell share a query; the box covers just them."""
+    locations = {
+        "AAA1": (45.2, -122.8),
+        "AAA2": (45.9, -122.1),
+        "BBB1": (47.6, -122.3),
+    }
+
+    groups = group_stations(locations, cell=2.0)
+
+    assert sorted(sorted(members) for _, members in groups) == [["AAA1", "AAA2"], ["BBB1"]]
+    box = next(box for box, members in groups if "AAA1" in members)
+    assert box == (
+        -122.8 - BULK_MARGIN_DEGREES,
+        45.2 - BULK_MARGIN_DEGREES,
+        -122.1 + BULK_MARGIN_DEGREES,
+        45.9 + BULK_MARGIN_DEGREES,
+    )
+
+
+def test_group_stations_cell_boundaries():
+    """Cells are floored, so negative coordinates do not share cell zero."""
+    locations = {"EAST": (0.5, 0.5), "WEST": (0.5, -0.5), "SOUTH": (-0.5, 0.5)}
+
+    groups = group_stations(locations, cell=2.0)
+
+    assert len(groups) == 3
+
+
+def test_group_stations_empty():
+    """No stations make no queries."""
+    assert group_stations({}) == []
+
+
+def test_parse_status_rows_keeps_wanted_rows_with_status():
+    """Only configured gauges with a status block are parsed."""
+    body = (
+        b'{"gauges": ['
+        b'{"lid": "aaa1", "status": {"observed": {"primary": 3.2, "floodCategory": "minor"}}},'
+        b'{"lid": "AAA2"},'
+        b'{"lid": "OTHER", "status": {"observed": {"primary": 1.0}}}'
+        b"]}"
+    )
+
+    rows = parse_status_rows(body, frozenset({"AAA1", "AAA2"}))
+
+    assert list(rows) == ["AAA1"]
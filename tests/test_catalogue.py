@@ -0,0 +1,101 @@
+"""Tests for the gauge catalogue."""
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.nwps_water import catalogue as catalogue_module
+from custom_components.nwps_water.catalogue import (
+    CatalogueGauge,
+    GaugeCatalogue,
+    GaugeIndex,
+    parse_listing,
+)
+from custom_components.nwps_water.const import CATALOGUE_MAX_BYTES
+from custom_components.nwps_water.hub import NWPSResponse
+
+GAUGES = [
+    CatalogueGauge("COCO3", "Columbia River at Portland", "OR", 45.62, -122.67),
+    CatalogueGauge("VANW1", "Columbia River at Vancouver", "WA", 45.62, -122.68),
+    CatalogueGauge("SALO3", "Willamette River at Salem", "OR", 44.94, -123.04),
+    CatalogueGauge("NOLOC", "Portland Creek", "OR", None, None),
+]
+
+
+@pytest.fixture
+def index() -> GaugeIndex:
+    """Return an index over a few gauges around Portland."""
+    return GaugeIndex(GAUGES)
+
+
+def _lids(results) -> list:
+    return [gauge.lid for gauge, _ in results]
+
+
+def test_every_query_word_prefixes_a_name_word_or_lid(index):
+    """Words match name words and LIDs by prefix, and all must match."""
+    assert _lids(index.search(query="colum riv")) == ["COCO3", "VANW1"]
+    assert _lids(index.search(query="coco")) == ["COCO3"]
+    assert _lids(index.search(query="portland")) == ["COCO3", "NOLOC"]
+    assert index.search(query="columbia salem") == []
+
+
+def test_state_narrows_a_query(index):
+    """State matching ignores case and spacing."""
+    assert _lids(index.search(query="columbia", state=" or ")) == ["COCO3"]
+    assert _lids(index.search(state="OR")) == ["COCO3", "NOLOC", "SALO3"]
+
+
+def test_radius_search_is_nearest_first(index):
+    """Gauges in range come with their distance, nearest first."""
+    results = index.search(near=(45.62, -122.675), radius_km=5)
+
+    assert _lids(results) == ["COCO3", "VANW1"]
+    assert all(distance < 1 for _, distance in results)
+    assert _lids(index.search(query="river", near=(44.94, -123.04), radius_km=5)) == ["SALO3"]
+
+
+def test_no_criteria_returns_nothing(index):
+    """An empty search is not a listing of every gauge."""
+    assert index.search() == []
+    assert index.search(query="  ") == []
+
+
+def test_parse_listing_skips_bad_rows():
+    """Rows without a LID are dropped and bad coordinates become None."""
+    body = json.dumps(
+        {
+            "gauges": [
+                {
+                    "lid": "coco3",
+                    "name": "Portland",
+                    "state": {"abbreviation": "or"},
+                    "latitude": 45.6,
+                    "longitude": -122.7,
+                },
+                {"name": "No LID"},
+                {"lid": "NOLOC", "latitude": "unknown", "longitude": None},
+            ]
+        }
+    ).encode()
+
+    assert parse_listing(body) == [
+        CatalogueGauge("COCO3", "Portland", "OR", 45.6, -122.7),
+        CatalogueGauge("NOLOC", "NOLOC", None, None, None),
+    ]
+
+
+async def test_download_is_size_limited_and_indexed(hass):
+    """The listing download carries the catalogue byte limit."""
+    body = json.dumps([{"lid": "COCO3", "name": "Portland", "state": "OR"}]).encode()
+    catalogue = GaugeCatalogue(hass)
+    catalogue._store = MagicMock(async_save=AsyncMock())
+
+    with patch.object(catalogue_module, "get_hub") as get_hub:
+        get_hub.return_value.async_get = AsyncMock(return_value=NWPSResponse(200, body))
+        await catalogue.async_refresh()
+
+    assert get_hub.return_value.async_get.call_args.kwargs["max_bytes"] == CATALOGUE_MAX_BYTES
+    assert "coco3" in catalogue
+    assert not catalogue.stale
+    catalogue._store.async_save.assert_awaited_once()
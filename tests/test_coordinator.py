@@ -0,0 +1,97 @@
+"""Tests for the station coordinator's adaptive polling."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nwps_water.const import (
+    ADAPTIVE_FLOOD_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_PUBLISH_LAG,
+    CONF_ADAPTIVE_POLLING,
+    CONF_STATION,
+    DOMAIN,
+)
+from custom_components.nwps_water.coordinator import NWPSDataCoordinator
+from custom_components.nwps_water.models import StationSnapshot
+
+SCAN_INTERVAL = 300
+
+
+@pytest.fixture
+def coordinator(hass) -> NWPSDataCoordinator:
+    """Return an adaptive coordinator whose station has no poll phase offset."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_STATION: "COCO3"},
+        options={"scan_interval": SCAN_INTERVAL, CONF_ADAPTIVE_POLLING: True},
+    )
+    entry.add_to_hass(hass)
+    coordinator = NWPSDataCoordinator(hass, "COCO3", entry)
+    with patch.object(coordinator._hub, "phase_fraction", return_value=0.0):
+        yield coordinator
+
+
+def _observe(coordinator, *minutes_ago: float) -> None:
+    now = dt_util.utcnow()
+    for minutes in minutes_ago:
+        coordinator._record_observation((now - timedelta(minutes=minutes)).isoformat())
+
+
+def test_unknown_cadence_uses_the_scan_interval(coordinator):
+    """Until two observations are seen the configured interval applies."""
+    _observe(coordinator, 10)
+
+    assert coordinator._adaptive_poll_delay() == SCAN_INTERVAL
+
+
+def test_poll_lands_after_the_next_expected_observation(coordinator):
+    """The learned cadence plus the publish lag sets the next poll."""
+    _observe(coordinator, 40, 25, 10)
+
+    delay = coordinator._adaptive_poll_delay()
+
+    assert delay == pytest.approx(5 * 60 + ADAPTIVE_PUBLISH_LAG, abs=1)
+
+
+def test_station_phase_spreads_the_publish_lag(coordinator):
+    """Stations sharing a cadence poll at different points of the lag."""
+    _observe(coordinator, 40, 25, 10)
+
+    with patch.object(coordinator._hub, "phase_fraction", return_value=0.5):
+        delay = coordinator._adaptive_poll_delay()
+
+    assert delay == pytest.approx(5 * 60 + 1.5 * ADAPTIVE_PUBLISH_LAG, abs=1)
+
+
+def test_quiet_gauges_back_off_exponentially(coordinator):
+    """Each poll without a new observation doubles the overdue delay."""
+    _observe(coordinator, 60, 45, 30)
+    # The same observation again counts as a quiet poll
+    latest = coordinator._observation_times[-1].isoformat()
+    coordinator._record_observation(latest)
+    coordinator._record_observation(latest)
+    assert coordinator._quiet_polls == 2
+
+    assert coordinator._adaptive_poll_delay() == SCAN_INTERVAL * 4
+
+    coordinator._quiet_polls = 10
+    assert coordinator._adaptive_poll_delay() == ADAPTIVE_MAX_INTERVAL
+
+    _observe(coordinator, 5)
+    assert coordinator._quiet_polls == 0
+
+
+@pytest.mark.parametrize("field", ["observed_flood_category", "forecast_flood_category"])
+def test_flooding_caps_the_interval(coordinator, field):
+    """An action-or-worse category polls at least every flood interval."""
+    _observe(coordinator, 60, 45, 30)
+    coordinator._quiet_polls = 4
+    coordinator._cached_data = StationSnapshot(**{field: "Minor"})
+
+    assert coordinator._adaptive_poll_delay() == ADAPTIVE_FLOOD_INTERVAL
+
+    coordinator._cached_data = StationSnapshot(**{field: "No Flooding"})
+    assert coordinator._adaptive_poll_delay() == ADAPTIVE_MAX_INTERVAL
@@ -0,0 +1,89 @@
+"""Tests for station group entries."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.nwps_water.group import NWPSStationGroup, parse_station_list
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("", []),
+        ("  \n ", []),
+        ("coco3", ["COCO3"]),
+        ("coco3, lkwa1\nCOCO3", ["COCO3", "LKWA1"]),
+        ("coco3 lkwa1\tbrnm5", ["COCO3", "LKWA1", "BRNM5"]),
+        ("coco3;lkwa1", ["COCO3", "LKWA1"]),
+        # Header naming the id column
+        ("name,lid\nColumbia River,coco3\nLake Washington,lkwa1", ["COCO3", "LKWA1"]),
+        ("Gauge_ID\tName\ncoco3\tColumbia River", ["COCO3"]),
+        # No header: rows of equal width are read from the first column
+        ("coco3,Columbia River\nlkwa1,Lake Washington", ["COCO3", "LKWA1"]),
+        # Rows of different widths are a pasted list
+        ("coco3,lkwa1\nbrnm5", ["COCO3", "LKWA1", "BRNM5"]),
+    ],
+)
+def test_parse_station_list(text, expected):
+    """Pasted lists and CSV files give unique, upper case station ids."""
+    assert parse_station_list(text) == expected
+
+
+def _group(hass, *station_ids: str) -> NWPSStationGroup:
+    group = NWPSStationGroup(hass, MagicMock())
+    for station_id in station_ids:
+        group.coordinators[station_id] = MagicMock(name=station_id)
+    return group
+
+
+async def test_timer_follows_the_earliest_poll(hass):
+    """One timer is armed, always for the earliest pending poll."""
+    group = _group(hass, "A", "B")
+    now = hass.loop.time()
+
+    group.async_schedule("A", 100)
+    group.async_schedule("B", 50)
+    assert group._timer.when() == pytest.approx(now + 50, abs=1)
+
+    # Rescheduling leaves a stale heap entry that must be skipped
+    group.async_schedule("B", 200)
+    assert group._timer.when() == pytest.approx(now + 100, abs=1)
+
+    group.async_unschedule("A")
+    assert group._timer.when() == pytest.approx(now + 200, abs=1)
+
+    group.async_unschedule("B")
+    assert group._timer is None
+    assert not group._heap
+
+
+async def test_fire_polls_only_due_stations(hass):
+    """Due stations are refreshed; the timer moves to the next one."""
+    group = _group(hass, "A", "B")
+    entry = group.entry
+
+    group.async_schedule("A", 0.01)
+    group.async_schedule("B", 100)
+    await asyncio.sleep(0.05)
+
+    assert group.polls == 1
+    group.coordinators["A"].async_refresh.assert_called_once()
+    group.coordinators["B"].async_refresh.assert_not_called()
+    assert entry.async_create_background_task.call_count == 1
+    assert group._timer.when() == pytest.approx(hass.loop.time() + 100, abs=1)
+
+    group.async_shutdown()
+    assert group._timer is None
+
+
+async def test_removed_station_is_not_polled(hass):
+    """A due station that left the group is skipped."""
+    group = _group(hass, "A")
+
+    group.async_schedule("A", 0.01)
+    del group.coordinators["A"]
+    await asyncio.sleep(0.05)
+
+    assert group.polls == 0
+    assert group._timer is None
@@ -0,0 +1,146 @@
+"""Tests for the shared fetch hub."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.nwps_water import hub as hub_module
+from custom_components.nwps_water.hub import NWPSFetchHub
+
+BASE_URL = "http://nwps.test/nwps/v1/gauges"
+
+
+def _hub(hass, **kwargs) -> NWPSFetchHub:
+    return NWPSFetchHub(hass, base_url=BASE_URL, **kwargs)
+
+
+async def test_identical_requests_are_coalesced(hass, aioclient_mock):
+    """Concurrent requests for one URL share a single fetch."""
+    url = f"{BASE_URL}/COCO3"
+    aioclient_mock.get(url, content=b'{"lid": "COCO3"}')
+    hub = _hub(hass)
+
+    first, second = await asyncio.gather(hub.async_get(url), hub.async_get(url))
+
+    assert aioclient_mock.call_count == 1
+    assert hub.coalesced == 1
+    assert first.body == second.body == b'{"lid": "COCO3"}'
+
+
+async def test_conditional_requests_are_not_coalesced_with_plain_ones(hass, aioclient_mock):
+    """Requests with different validators are separate fetches."""
+    url = f"{BASE_URL}/COCO3"
+    aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass)
+
+    await asyncio.gather(hub.async_get(url), hub.async_get(url, etag='"abc"'))
+
+    assert aioclient_mock.call_count == 2
+    assert hub.coalesced == 0
+
+
+@pytest.mark.parametrize(
+    "options", [{"max_bytes": 1024}, {"media": True}, {"cache": True}]
+)
+async def test_requests_with_other_options_are_not_coalesced(hass, aioclient_mock, options):
+    """A size limited, media or cached request never joins a plain one."""
+    url = f"{BASE_URL}/COCO3"
+    aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass)
+
+    with patch.object(NWPSFetchHub, "_async_read_limited", AsyncMock(return_value=b"{}")):
+        await asyncio.gather(hub.async_get(url), hub.async_get(url, **options))
+
+    assert aioclient_mock.call_count == 2
+    assert hub.coalesced == 0
+
+
+async def test_cache_serves_only_requests_that_ask_for_it(hass, aioclient_mock):
+    """A cached response is reused by cache requests and marked as such."""
+    url = f"{BASE_URL}/COCO3"
+    aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass)
+
+    fresh = await hub.async_get(url, cache=True)
+    cached = await hub.async_get(url, cache=True)
+    uncached = await hub.async_get(url)
+
+    assert aioclient_mock.call_count == 2
+    assert hub.cache_hits == 1
+    assert not fresh.from_cache
+    assert cached.from_cache
+    assert not uncached.from_cache
+
+
+async def test_uncached_requests_do_not_fill_the_cache(hass, aioclient_mock):
+    """Responses fetched without cache are not kept."""
+    url = f"{BASE_URL}/COCO3/stageflow"
+    aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass)
+
+    await hub.async_get(url)
+
+    assert hub.cache_entries == 0
+    assert hub.cache_bytes == 0
+
+
+async def test_cache_entries_expire_after_the_ttl(hass, aioclient_mock):
+    """A response older than cache_ttl is fetched again."""
+    url = f"{BASE_URL}/COCO3"
+    aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass, cache_ttl=30)
+
+    with patch.object(hub_module, "time") as mock_time:
+        mock_time.monotonic.return_value = 1000.0
+        await hub.async_get(url, cache=True)
+        mock_time.monotonic.return_value = 1029.0
+        assert (await hub.async_get(url, cache=True)).from_cache
+        mock_time.monotonic.return_value = 1030.0
+        assert not (await hub.async_get(url, cache=True)).from_cache
+
+    assert aioclient_mock.call_count == 2
+    assert hub.cache_entries == 1
+
+
+async def test_cache_evicts_the_least_recently_used_response(hass, aioclient_mock):
+    """Past the entry limit the response used longest ago is dropped."""
+    urls = [f"{BASE_URL}/GAUGE{index}" for index in range(3)]
+    for url in urls:
+        aioclient_mock.get(url, content=b"{}")
+    hub = _hub(hass)
+
+    with patch.object(hub_module, "RESPONSE_CACHE_MAX_ENTRIES", 2):
+        await hub.async_get(urls[0], cache=True)
+        await hub.async_get(urls[1], cache=True)
+        # Touch the first, so the second is the least recently used
+        await hub.async_get(urls[0], cache=True)
+        await hub.async_get(urls[2], cache=True)
+
+        assert hub.cache_entries == 2
+        assert (await hub.async_get(urls[0], cache=True)).from_cache
+        assert not (await hub.async_get(urls[1], cache=True)).from_cache
+
+
+async def test_cache_byte_limit(hass, aioclient_mock):
+    """Bodies over a quarter of the byte limit are never cached."""
+    small, large = f"{BASE_URL}/SMALL", f"{BASE_URL}/LARGE"
+    aioclient_mock.get(small, content=b"x" * 100)
+    aioclient_mock.get(large, content=b"x" * 300)
+    hub = _hub(hass)
+
+    with patch.object(hub_module, "RESPONSE_CACHE_MAX_BYTES", 1000):
+        await hub.async_get(small, cache=True)
+        await hub.async_get(large, cache=True)
+
+    assert hub.cache_entries == 1
+    assert hub.cache_bytes == 100
+
+
+async def test_async_configure_applies_to_an_existing_hub(hass):
+    """The YAML settings replace those the hub was created with."""
+    hub = _hub(hass, max_concurrent=8)
+
+    hub.async_configure(2, "http://other.test/gauges/")
+
+    assert hub.station_url("COCO3") == "http://other.test/gauges/COCO3"
+    assert hub._max_concurrent == 2
@@ -0,0 +1,45 @@
+"""Tests for the image entities."""
+from unittest.mock import MagicMock
+
+from custom_components.nwps_water.image import _station_images
+from custom_components.nwps_water.models import StationSnapshot
+
+
+def _photos(count: int):
+    return [
+        {"url": f"https://water.noaa.gov/photos/{number}.jpg", "caption": None, "date": None}
+        for number in range(1, count + 1)
+    ]
+
+
+async def test_photos_added_to_the_gauge_get_entities(hass):
+    """New photos get an entity with the next update, without a reload."""
+    coordinator = MagicMock()
+    coordinator.hass = hass
+    coordinator.station_id = "COCO3"
+    coordinator.last_update_success = True
+    coordinator.data = StationSnapshot(photos=_photos(1))
+    entry = MagicMock()
+    add_entities = MagicMock()
+
+    entities = _station_images(entry, coordinator, MagicMock(), add_entities)
+    assert [entity.unique_id for entity in entities if "photo" in entity.unique_id] == [
+        "nwps_COCO3_photo_1"
+    ]
+    listener = coordinator.async_add_listener.call_args.args[0]
+    entry.async_on_unload.assert_called_once_with(coordinator.async_add_listener.return_value)
+
+    coordinator.data = StationSnapshot(photos=_photos(3))
+    listener()
+    (added,) = add_entities.call_args.args
+    assert [entity.unique_id for entity in added] == [
+        "nwps_COCO3_photo_2",
+        "nwps_COCO3_photo_3",
+    ]
+
+    # Photos dropped and seen again are not added twice
+    coordinator.data = StationSnapshot(photos=_photos(2))
+    listener()
+    coordinator.data = StationSnapshot(photos=_photos(3))
+    listener()
+    assert add_entities.call_count == 1
@@ -0,0 +1,91 @@
+"""Tests for the on-disk image cache."""
+import hashlib
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.nwps_water import image_cache as image_cache_module
+from custom_components.nwps_water.const import IMAGE_MAX_BYTES
+from custom_components.nwps_water.hub import NWPSResponse
+from custom_components.nwps_water.image_cache import NWPSImageCache, async_get_image_cache
+
+URL = "https://water.noaa.gov/resources/hydrographs/{}_hg.png"
+
+
+def _response(body: bytes, etag=None) -> NWPSResponse:
+    return NWPSResponse(
+        200, body, etag=etag, digest=hashlib.blake2b(body, digest_size=16).digest()
+    )
+
+
+@pytest.fixture
+def mock_hub():
+    """Serve image downloads from a mock hub."""
+    with patch.object(image_cache_module, "get_hub") as get_hub:
+        get_hub.return_value.async_get = AsyncMock()
+        yield get_hub.return_value
+
+
+@pytest.fixture
+def cache(hass, tmp_path):
+    """Return an image cache in a temporary directory, capped at 250 bytes."""
+    cache = NWPSImageCache(hass, max_bytes=250)
+    cache.directory = str(tmp_path)
+    with patch.object(NWPSImageCache, "_async_schedule_save"):
+        yield cache
+
+
+async def test_least_recently_served_image_is_evicted(cache, mock_hub, tmp_path):
+    """Past the size cap the image viewed longest ago is deleted."""
+    urls = [URL.format(lid) for lid in ("aaa1", "bbb1", "ccc1")]
+    mock_hub.async_get.side_effect = [_response(bytes([index]) * 100) for index in range(3)]
+
+    await cache.async_image(urls[0])
+    await cache.async_image(urls[1])
+    # Viewing the first makes the second the least recently served
+    assert await cache.async_image(urls[0]) == (b"\x00" * 100, "image/png")
+    await cache.async_image(urls[2])
+
+    assert urls[1] not in cache
+    assert urls[0] in cache and urls[2] in cache
+    assert cache.size == 200
+    assert cache.hits == 1
+    assert cache.evictions == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+
+async def test_downloads_are_size_limited(cache, mock_hub):
+    """Each image download carries the per-image byte limit."""
+    mock_hub.async_get.return_value = _response(b"x" * 10)
+
+    await cache.async_image(URL.format("aaa1"))
+
+    assert mock_hub.async_get.call_args.kwargs["max_bytes"] == IMAGE_MAX_BYTES
+    assert mock_hub.async_get.call_args.kwargs["media"]
+
+
+async def test_refresh_revalidates_with_the_stored_validators(cache, mock_hub):
+    """An unchanged image costs a 304 and keeps its file."""
+    url = URL.format("aaa1")
+    mock_hub.async_get.side_effect = [
+        _response(b"x" * 10, etag='"v1"'),
+        NWPSResponse(304, etag='"v1"'),
+    ]
+
+    await cache.async_image(url)
+    assert not await cache.async_refresh(url)
+
+    assert mock_hub.async_get.call_args.kwargs["etag"] == '"v1"'
+    assert cache.not_modified == 1
+    assert cache.downloads == 1
+
+
+async def test_failed_load_is_retried(hass):
+    """A load error is not cached for every later setup."""
+    with patch.object(NWPSImageCache, "async_load", side_effect=[OSError("disk"), None]):
+        with pytest.raises(OSError):
+            await async_get_image_cache(hass)
+        cache = await async_get_image_cache(hass)
+
+    assert await async_get_image_cache(hass) is cache
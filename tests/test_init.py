@@ -0,0 +1,86 @@
+"""Tests for applying options to a running entry."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nwps_water import async_update_listener
+from custom_components.nwps_water.const import (
+    CONF_PARAMETERS,
+    CONF_STAGE_DEADBAND,
+    CONF_STATION,
+    CONF_STATIONS,
+    CONF_TIMESERIES,
+    DOMAIN,
+)
+from custom_components.nwps_water.group import NWPSStationGroup
+
+OPTIONS = {"scan_interval": 300, CONF_PARAMETERS: ["stage"], CONF_TIMESERIES: False}
+
+
+def _coordinator(options) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.options = dict(options)
+    return coordinator
+
+
+@pytest.fixture
+def mock_reload(hass):
+    """Record entry reloads instead of performing them."""
+    with patch.object(hass.config_entries, "async_reload", AsyncMock()) as reload:
+        yield reload
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"scan_interval": 600},
+        {CONF_PARAMETERS: ["stage", "flow"]},
+        {CONF_STAGE_DEADBAND: 0.1},
+    ],
+)
+async def test_options_applied_in_place(hass, mock_reload, changes):
+    """Most options reach the running coordinator without a reload."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_STATION: "COCO3"}, options=OPTIONS)
+    entry.add_to_hass(hass)
+    coordinator = _coordinator(OPTIONS)
+    hass.data[DOMAIN] = {entry.entry_id: coordinator}
+    hass.config_entries.async_update_entry(entry, options={**OPTIONS, **changes})
+
+    await async_update_listener(hass, entry)
+
+    mock_reload.assert_not_called()
+    coordinator.async_apply_options.assert_called_once_with(entry.options)
+
+
+async def test_reload_options_reload_the_entry(hass, mock_reload):
+    """Options that change what is fetched reload the entry."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_STATION: "COCO3"}, options=OPTIONS)
+    entry.add_to_hass(hass)
+    coordinator = _coordinator(OPTIONS)
+    hass.data[DOMAIN] = {entry.entry_id: coordinator}
+    hass.config_entries.async_update_entry(entry, options={**OPTIONS, CONF_TIMESERIES: True})
+
+    await async_update_listener(hass, entry)
+
+    mock_reload.assert_awaited_once_with(entry.entry_id)
+    coordinator.async_apply_options.assert_not_called()
+
+
+async def test_group_station_changes_reload_the_entry(hass, mock_reload):
+    """Adding a station to a group reloads it; options alone do not."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_STATIONS: ["COCO3"]}, options=OPTIONS
+    )
+    entry.add_to_hass(hass)
+    group = NWPSStationGroup(hass, entry)
+    group.coordinators["COCO3"] = _coordinator(OPTIONS)
+    hass.data[DOMAIN] = {entry.entry_id: group}
+
+    await async_update_listener(hass, entry)
+    mock_reload.assert_not_called()
+    group.coordinators["COCO3"].async_apply_options.assert_called_once()
+
+    hass.config_entries.async_update_entry(entry, data={CONF_STATIONS: ["COCO3", "LKWA1"]})
+    await async_update_listener(hass, entry)
+    mock_reload.assert_awaited_once_with(entry.entry_id)
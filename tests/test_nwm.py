@@ -0,0 +1,153 @@
+"""Tests for the National Water Model forecasts."""
+import json
+import math
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.nwps_water import nwm as nwm_module
+from custom_components.nwps_water.const import NWM_MAX_PAYLOAD_BYTES, NWM_RETRY_BACKOFF
+from custom_components.nwps_water.hub import NWPSError, NWPSResponse
+from custom_components.nwps_water.nwm import (
+    StationNWM,
+    _percentiles_python,
+    build_forecast,
+    summarize,
+)
+
+
+def _member(flows, reference="2026-03-01T00:00:00Z", units="ft³/s") -> dict:
+    return {
+        "referenceTime": reference,
+        "units": units,
+        "data": [
+            {"validTime": f"2026-03-01T{hour:02d}:00:00Z", "flow": flow}
+            for hour, flow in enumerate(flows)
+        ],
+    }
+
+
+ENSEMBLE = {
+    "mediumRange": {
+        "mean": _member([0.0, 0.0, 0.0]),
+        "member2": _member([200.0, 400.0, 300.0]),
+        "member1": _member([100.0, 300.0, -999]),
+        "member3": _member([300.0, 500.0, 200.0]),
+    }
+}
+
+
+def test_members_share_one_time_axis():
+    """Members are ordered by number and sentinels are left as NaN."""
+    forecast = build_forecast(ENSEMBLE, "mediumRange")
+
+    assert forecast.members == 3
+    assert len(forecast.times) == 3
+    assert list(forecast.values[:2]) == [100.0, 300.0]
+    assert math.isnan(forecast.values[2])
+    assert list(forecast.values[3:6]) == [200.0, 400.0, 300.0]
+
+
+def test_unchanged_issuance_is_not_rebuilt():
+    """The previous reference time short-circuits the array work."""
+    assert build_forecast(ENSEMBLE, "mediumRange", "2026-03-01T00:00:00Z") is None
+    assert build_forecast(ENSEMBLE, "longRange") is None
+
+
+def test_short_range_series_and_metric_units():
+    """A lone series is one member; cubic metres are converted to cfs."""
+    payload = {"shortRange": {"series": _member([1.0, 2.0], units="m³/s")}}
+
+    forecast = build_forecast(payload, "shortRange")
+
+    assert forecast.members == 1
+    assert forecast.values[1] == pytest.approx(2 * 35.3147)
+
+
+def test_summary_peaks_per_percentile():
+    """The median peak and its time come from the same forecast step."""
+    with patch.object(nwm_module, "np", None):
+        summary = summarize(build_forecast(ENSEMBLE, "mediumRange"))
+
+    assert summary.peak == 400.0
+    assert summary.peak_time.hour == 1
+    assert summary.peak_low == 320.0
+    assert summary.peak_high == 480.0
+    assert summary.members == 3
+
+
+def test_numpy_percentiles_match_the_fallback():
+    """Both percentile implementations interpolate the same way."""
+    pytest.importorskip("numpy")
+    forecast = build_forecast(ENSEMBLE, "mediumRange")
+
+    expected = _percentiles_python(forecast, (10, 50, 90))
+    actual = nwm_module._percentiles_numpy(forecast, (10, 50, 90))
+
+    for row, values in zip(expected, actual):
+        assert values == pytest.approx(row)
+
+
+@pytest.fixture
+def hub():
+    """Return a mock hub answering every range with 304."""
+    hub = MagicMock()
+    hub.async_get = AsyncMock(return_value=NWPSResponse(304))
+    return hub
+
+
+async def test_failed_range_backs_off_and_keeps_its_schedule(hass, hub):
+    """A failure is retried after the backoff and only answers mark it checked."""
+    station = StationNWM()
+    body = json.dumps({"shortRange": {"series": _member([10.0, 20.0])}}).encode()
+
+    with patch.object(nwm_module, "time") as mock_time:
+        mock_time.monotonic.return_value = 1000.0
+        hub.async_get.side_effect = [NWPSError("boom"), NWPSResponse(304), NWPSResponse(304)]
+        assert not await station.async_update(hass, hub, "123")
+        assert station.ranges["short_range"].failures == 1
+        assert station.ranges["short_range"].checked == -math.inf
+        assert station.ranges["medium_range"].checked == 1000.0
+        assert hub.async_get.call_args.kwargs["max_bytes"] == NWM_MAX_PAYLOAD_BYTES
+
+        # Still backing off: nothing is due
+        hub.async_get.reset_mock(side_effect=True)
+        mock_time.monotonic.return_value = 1000.0 + NWM_RETRY_BACKOFF - 1
+        assert not await station.async_update(hass, hub, "123")
+        hub.async_get.assert_not_called()
+
+        hub.async_get.return_value = NWPSResponse(200, body, etag='"v1"')
+        mock_time.monotonic.return_value = 1000.0 + NWM_RETRY_BACKOFF
+        assert await station.async_update(hass, hub, "123")
+
+    assert hub.async_get.call_count == 1
+    state = station.ranges["short_range"]
+    assert (state.failures, state.checked, state.etag) == (0, 1000.0 + NWM_RETRY_BACKOFF, '"v1"')
+    assert station.summary("short_range").peak == 20.0
+
+
+async def test_backoff_doubles_up_to_the_range_interval(hass, hub):
+    """Repeated failures wait longer, but never past the range interval."""
+    station = StationNWM()
+    hub.async_get.side_effect = NWPSError("boom")
+
+    with patch.object(nwm_module, "time") as mock_time:
+        now = 0.0
+        for _ in range(4):
+            mock_time.monotonic.return_value = now
+            await station.async_update(hass, hub, "123")
+            now = station.ranges["short_range"].retry_at
+
+    # 300, 600, then capped at the 1800 s short range interval
+    assert now == 300 + 600 + 1200 + 1800
+
+
+async def test_new_reach_starts_over(hass, hub):
+    """Changing reach drops the held issuances."""
+    station = StationNWM()
+    station.ranges["short_range"].etag = '"old"'
+
+    await station.async_update(hass, hub, "456")
+
+    assert station.reach_id == "456"
+    assert station.ranges["short_range"].etag is None
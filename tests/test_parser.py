@@ -0,0 +1,90 @@
+"""Tests for the compiled gauge payload parser."""
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.nwps_water.const import FIELD_SPECS, STATUS_FIELDS
+from custom_components.nwps_water.parser import (
+    compile_parser,
+    decode_station,
+    parse_station,
+    parse_status,
+)
+
+FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures"
+EXPECTED = json.loads((FIXTURES / "expected_snapshots.json").read_text())
+
+
+def _payload(name: str) -> dict:
+    return json.loads((FIXTURES / name).read_text())
+
+
+def test_every_fixture_has_expected_output():
+    """The expected snapshots cover every recorded payload."""
+    assert sorted(EXPECTED) == sorted(path.name for path in FIXTURES.glob("gauge_*.json"))
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_parse_station_matches_fixture(name):
+    """Every field parses as recorded from the hand-written parser."""
+    snapshot = parse_station(_payload(name)).as_dict()
+
+    for field, value in EXPECTED[name].items():
+        assert snapshot[field] == value, field
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_parse_status_matches_fixture(name):
+    """The status-only parse gives exactly the status fields."""
+    status = parse_status(_payload(name))
+
+    assert set(status) == set(STATUS_FIELDS)
+    for field in STATUS_FIELDS:
+        assert status[field] == EXPECTED[name][field], field
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_decode_station_matches_parse(name):
+    """Decoding the body gives the payload and the same snapshot."""
+    body = (FIXTURES / name).read_bytes()
+
+    payload, snapshot = decode_station(body)
+
+    assert payload == _payload(name)
+    assert snapshot == parse_station(payload)
+
+
+def test_sentinels_and_kilo_units():
+    """-999 readings are dropped and kcfs flows are scaled to cfs."""
+    status = parse_status(
+        {
+            "status": {
+                "observed": {"primary": -999, "secondary": 1.25, "secondaryUnit": "kcfs"},
+                "forecast": {"primary": "7.5", "secondary": -999.0, "secondaryUnit": "kcfs"},
+            }
+        }
+    )
+
+    assert status["stage"] is None
+    assert status["flow"] == 1250.0
+    assert status["forecast_stage"] == 7.5
+    assert status["forecast_flow"] is None
+
+
+@pytest.mark.parametrize("payload", [{}, {"status": None}, {"status": {"observed": []}}])
+def test_missing_or_malformed_blocks(payload):
+    """Missing or wrongly typed blocks parse as empty."""
+    assert parse_station(payload).stage is None
+    assert all(value is None for value in parse_status(payload).values())
+
+
+def test_unknown_field_kind_is_rejected():
+    """A typo in the spec table fails at compile time."""
+    with pytest.raises(ValueError):
+        compile_parser({"stage": {"paths": (("stage",),), "kind": "number"}}, dict)
+
+
+def test_specs_cover_every_status_field():
+    """The status tier only names fields the spec table defines."""
+    assert set(STATUS_FIELDS) <= set(FIELD_SPECS)
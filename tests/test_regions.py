@@ -0,0 +1,94 @@
+"""Tests for the regional flood summaries."""
+from custom_components.nwps_water.regions import CategoryIndex, NWPSRegionSummary
+
+
+def test_category_index_moves_and_highest():
+    """Stations move between categories; the most severe one wins."""
+    index = CategoryIndex()
+    index.move("A", None, "action")
+    index.move("B", None, "moderate")
+    index.move("C", None, "no_flooding")
+
+    assert index.highest() == "moderate"
+    assert index.counts() == {"action": 1, "moderate": 1, "no_flooding": 1}
+
+    index.move("B", "moderate", "minor")
+    index.move("C", "no_flooding", None)
+    assert index.highest() == "minor"
+    assert index.counts() == {"action": 1, "minor": 1}
+
+
+def test_category_index_unranked_categories():
+    """Categories outside the ranking are reported when nothing else is."""
+    index = CategoryIndex()
+    index.move("A", None, "not_defined")
+
+    assert index.highest() == "not_defined"
+
+
+def test_in_flood_excludes_action_stage():
+    """Only minor flood or worse counts as in flood, most severe first."""
+    index = CategoryIndex()
+    index.move("A", None, "action")
+    index.move("B", None, "minor")
+    index.move("C", None, "major")
+
+    assert index.in_flood_count() == 2
+    assert index.in_flood() == ["C", "B"]
+
+
+async def test_counters_follow_station_updates(hass):
+    """Each region counts its stations' current categories."""
+    summary = NWPSRegionSummary(hass)
+
+    summary.async_update_station("A", "entry", "OR", "minor", "major")
+    summary.async_update_station("B", "entry", "OR", "action", None)
+    summary.async_update_station("C", "entry", "WA", "no_flooding", "no_flooding")
+
+    oregon = summary.regions["or"]
+    assert oregon.observed.counts() == {"minor": 1, "action": 1}
+    assert oregon.observed.in_flood_count() == 1
+    assert oregon.forecast.highest() == "major"
+    assert summary.regions["wa"].observed.in_flood_count() == 0
+
+    summary.async_update_station("B", "entry", "OR", "Moderate", None)
+    assert oregon.observed.counts() == {"minor": 1, "moderate": 1}
+    assert oregon.observed.in_flood() == ["B", "A"]
+
+
+async def test_unchanged_reports_are_ignored(hass):
+    """A station reporting the same categories costs no update."""
+    summary = NWPSRegionSummary(hass)
+
+    summary.async_update_station("A", "entry", "OR", "minor", None)
+    summary.async_update_station("A", "entry", "OR", "minor", None)
+
+    assert summary.updates == 1
+
+
+async def test_region_names_that_slugify_alike_are_merged(hass):
+    """Names differing only in case or punctuation share one region."""
+    summary = NWPSRegionSummary(hass)
+
+    summary.async_update_station("A", "entry", "Upper Basin", "minor", None)
+    summary.async_update_station("B", "entry", "upper-basin", "major", None)
+
+    assert list(summary.regions) == ["upper_basin"]
+    region = summary.regions["upper_basin"]
+    assert region.name == "Upper Basin"
+    assert list(region.stations) == ["A", "B"]
+
+
+async def test_stations_leave_their_old_region(hass):
+    """Moving or dropping stations updates both regions; empty ones go."""
+    summary = NWPSRegionSummary(hass)
+    summary.async_update_station("A", "entry", "OR", "minor", None)
+    summary.async_update_station("B", "entry", "OR", "major", None)
+
+    summary.async_update_station("B", "entry", "Basin", "major", None)
+    assert summary.regions["or"].observed.counts() == {"minor": 1}
+    assert summary.regions["basin"].observed.counts() == {"major": 1}
+
+    summary.async_update_station("A", "entry", None, None, None)
+    summary.async_remove_station("B")
+    assert summary.regions == {}
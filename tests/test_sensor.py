@@ -0,0 +1,88 @@
+"""Tests for the station sensors."""
+from unittest.mock import MagicMock
+
+from custom_components.nwps_water.models import StationSnapshot
+from custom_components.nwps_water.sensor import NWPSWaterSensor
+
+
+def _coordinator(**fields) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.data = StationSnapshot(**fields)
+    coordinator.last_update_success = True
+    coordinator.stale = False
+    coordinator.upstream = ()
+    coordinator.staleness_attributes.return_value = {}
+    coordinator.get_device_name.return_value = "Test Station"
+    return coordinator
+
+
+def _sensor(coordinator, parameter: str, deadband: float = 0.0) -> NWPSWaterSensor:
+    sensor = NWPSWaterSensor(coordinator, "TEST1", parameter, deadband)
+    sensor.async_write_ha_state = MagicMock()
+    return sensor
+
+
+def _update(sensor: NWPSWaterSensor, **fields) -> None:
+    sensor.coordinator.data = StationSnapshot(
+        **{**sensor.coordinator.data.as_dict(), **fields}
+    )
+    sensor._handle_coordinator_update()
+
+
+def test_changes_within_the_deadband_write_no_state():
+    """Readings closer than the deadband to the last state are dropped."""
+    sensor = _sensor(_coordinator(stage=10.0), "stage", deadband=0.1)
+
+    _update(sensor, stage=10.05)
+    _update(sensor, stage=9.95)
+    sensor.async_write_ha_state.assert_not_called()
+    assert sensor.native_value == 10.0
+
+    _update(sensor, stage=10.2)
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 10.2
+
+
+def test_deadband_is_measured_from_the_last_written_state():
+    """Slow drift is written once it adds up to the deadband."""
+    sensor = _sensor(_coordinator(stage=10.0), "stage", deadband=0.1)
+
+    for stage in (10.04, 10.08, 10.12):
+        _update(sensor, stage=stage)
+
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 10.12
+
+
+def test_attribute_changes_are_written_within_the_deadband():
+    """A new threshold is written even when the reading barely moved."""
+    sensor = _sensor(_coordinator(stage=10.0, flood_minor_stage=12.0), "stage", deadband=0.1)
+
+    _update(sensor, stage=10.01, flood_minor_stage=11.5)
+
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 10.0
+    assert sensor.extra_state_attributes["flood_minor"] == 11.5
+
+
+def test_without_deadband_every_change_is_written():
+    """With no deadband any new reading is written, repeats are not."""
+    sensor = _sensor(_coordinator(flow=1200.0), "flow")
+
+    _update(sensor, flow=1200.5)
+    _update(sensor, flow=1200.5)
+
+    sensor.async_write_ha_state.assert_called_once()
+
+
+def test_set_deadband_applies_from_the_next_update():
+    """Changing the deadband in the options needs no new entity."""
+    sensor = _sensor(_coordinator(flow=1200.0), "flow")
+
+    sensor.set_deadband(50.0)
+    _update(sensor, flow=1230.0)
+    sensor.async_write_ha_state.assert_not_called()
+
+    sensor.set_deadband(0.0)
+    _update(sensor, flow=1230.0)
+    sensor.async_write_ha_state.assert_called_once()
@@ -0,0 +1,61 @@
+"""Tests for the long-term statistics import."""
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.nwps_water.statistics import hourly_statistics, statistic_id
+
+
+def _ts(hour: int, minute: int = 0) -> float:
+    return datetime(2026, 3, 1, hour, minute, tzinfo=timezone.utc).timestamp()
+
+
+def _point(hour: int, minute: int, stage, flow) -> dict:
+    return {
+        "validTime": f"2026-03-01T{hour:02d}:{minute:02d}:00Z",
+        "primary": stage,
+        "secondary": flow,
+    }
+
+
+PAYLOAD = {
+    "observed": {
+        "secondaryUnits": "kcfs",
+        "data": [
+            _point(10, 0, 5.0, 1.0),
+            _point(10, 30, 7.0, -999),
+            _point(11, 0, 6.0, 1.5),
+            _point(11, 45, 4.0, 2.5),
+            # The current hour is incomplete and left for the next run
+            _point(12, 15, 9.0, 3.0),
+        ],
+    }
+}
+
+
+def test_hourly_mean_min_max():
+    """Complete hours become mean, min and max rows, oldest first."""
+    hours = hourly_statistics(PAYLOAD, {}, _ts(12, 30))
+
+    assert hours["stage"] == [(_ts(10), 6.0, 5.0, 7.0), (_ts(11), 5.0, 4.0, 6.0)]
+    # kcfs readings are scaled to cfs; -999 sentinels are skipped
+    assert hours["flow"] == [(_ts(10), 1000.0, 1000.0, 1000.0), (_ts(11), 2000.0, 1500.0, 2500.0)]
+
+
+def test_only_hours_after_the_last_recorded_one():
+    """An incremental import skips hours already recorded."""
+    hours = hourly_statistics(PAYLOAD, {"stage": _ts(10), "flow": None}, _ts(12, 30))
+
+    assert [row[0] for row in hours["stage"]] == [_ts(11)]
+    assert [row[0] for row in hours["flow"]] == [_ts(10), _ts(11)]
+
+
+@pytest.mark.parametrize("payload", [None, [], {"observed": None}, {"observed": {}}])
+def test_malformed_payloads_give_no_rows(payload):
+    """Anything without observed data imports nothing."""
+    assert hourly_statistics(payload, {}, _ts(12)) == {"stage": [], "flow": []}
+
+
+def test_statistic_id():
+    """External statistic ids are lower case and scoped to the domain."""
+    assert statistic_id("COCO3", "stage") == "nwps_water:coco3_stage"
@@ -0,0 +1,58 @@
+"""Tests for the persisted station snapshots."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.nwps_water.const import DATA_SNAPSHOTS, DOMAIN
+from custom_components.nwps_water.store import NWPSSnapshotStore, async_get_snapshot_store
+
+
+@pytest.fixture
+def store(hass) -> NWPSSnapshotStore:
+    """Return a snapshot store that does not write to disk."""
+    store = NWPSSnapshotStore(hass)
+    store._store = MagicMock()
+    return store
+
+
+async def test_confirm_moves_the_persisted_timestamp(store):
+    """An unchanged poll persists when the data was last confirmed."""
+    store.async_save_snapshot("COCO3", {"data": {}, "updated": "2026-03-01T10:00:00+00:00"})
+
+    assert store.async_confirm("COCO3", "2026-03-01T11:00:00+00:00")
+
+    assert store.get("COCO3")["updated"] == "2026-03-01T11:00:00+00:00"
+    assert store._store.async_delay_save.call_count == 2
+    assert store._data_to_save()["stations"]["COCO3"]["updated"] == "2026-03-01T11:00:00+00:00"
+
+
+async def test_confirm_without_a_snapshot(store):
+    """Stations never persisted report it, so the caller saves in full."""
+    assert not store.async_confirm("COCO3", "2026-03-01T11:00:00+00:00")
+    store._store.async_delay_save.assert_not_called()
+
+
+async def test_remove_forgets_the_station(store):
+    """A removed station's snapshot is dropped from the next write."""
+    store.async_save_snapshot("COCO3", {"data": {}, "updated": "2026-03-01T10:00:00+00:00"})
+
+    store.async_remove("COCO3")
+
+    assert store.get("COCO3") is None
+    assert store._data_to_save() == {"stations": {}}
+
+
+async def test_failed_load_is_retried(hass):
+    """A load error is not cached for every later setup."""
+    with patch.object(
+        NWPSSnapshotStore, "async_load", side_effect=[OSError("disk"), None]
+    ) as mock_load:
+        with pytest.raises(OSError):
+            await async_get_snapshot_store(hass)
+        assert DATA_SNAPSHOTS not in hass.data[DOMAIN]
+
+        store = await async_get_snapshot_store(hass)
+
+    assert isinstance(store, NWPSSnapshotStore)
+    assert mock_load.call_count == 2
+    assert await async_get_snapshot_store(hass) is store
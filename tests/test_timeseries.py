@@ -0,0 +1,128 @@
+"""Tests for the hydrograph ring buffers."""
+import math
+from datetime import datetime, timezone
+
+from custom_components.nwps_water.timeseries import SeriesBuffer, StationSeries
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc).timestamp()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _observed(times, stage=1.0, flow=1.0, units="kcfs") -> dict:
+    return {
+        "observed": {
+            "secondaryUnits": units,
+            "data": [
+                {"validTime": _iso(t), "primary": stage, "secondary": flow} for t in times
+            ],
+        }
+    }
+
+
+def test_ring_buffer_overwrites_the_oldest_sample():
+    """A full buffer drops its oldest sample and still reads in order."""
+    buffer = SeriesBuffer(3)
+    for offset in range(5):
+        buffer.append(START + offset, offset, -offset)
+
+    assert len(buffer) == 3
+    assert buffer.full
+    assert [sample[1] for sample in buffer.samples()] == [2.0, 3.0, 4.0]
+    times, flow = buffer.ordered("flow", since=START + 3)
+    assert list(times) == [START + 3, START + 4]
+    assert list(flow) == [-3.0, -4.0]
+
+
+def test_grow_keeps_wrapped_samples_in_order():
+    """Growing a wrapped buffer unrolls it before adding room."""
+    buffer = SeriesBuffer(3)
+    for offset in range(4):
+        buffer.append(START + offset, offset, offset)
+
+    buffer.grow(6)
+    buffer.append(START + 4, 4, 4)
+
+    assert buffer.capacity == 6
+    assert [sample[0] - START for sample in buffer.samples()] == [1, 2, 3, 4]
+
+
+def test_missing_readings_are_skipped_by_latest():
+    """-999 sentinels are stored as NaN and ignored by latest."""
+    series = StationSeries(1)
+    series.ingest(_observed([START], stage=5.0))
+    series.ingest(_observed([START + 900], stage=-999, flow=None))
+
+    assert math.isnan(series.observed.ordered("stage")[1][-1])
+    assert series.observed.latest("stage") == 5.0
+    assert series.observed.latest("flow") == 1000.0
+
+
+def test_ingest_only_adds_newer_points():
+    """Overlapping payloads add each observation once."""
+    series = StationSeries(1)
+
+    assert series.ingest(_observed([START, START + 900])) == 2
+    assert series.ingest(_observed([START, START + 900, START + 1800])) == 1
+    assert len(series.observed) == 3
+
+
+def test_dense_gauges_keep_the_whole_retention():
+    """Five-minute data grows the buffer rather than losing old samples."""
+    series = StationSeries(1)
+    capacity = series.observed.capacity
+    times = [START + 300 * step for step in range(2 * capacity)]
+
+    series.ingest(_observed(times))
+
+    assert series.observed.capacity > capacity
+    assert len(series.observed) == 2 * capacity
+    assert series.observed.first_time == START
+
+
+def test_old_samples_are_pruned_by_time():
+    """Samples older than the retention are dropped on ingest."""
+    series = StationSeries(1)
+    series.ingest(_observed([START, START + 900]))
+    series.ingest(_observed([START + 86400 + 900]))
+
+    assert series.observed.first_time == START + 900
+
+
+def test_a_new_forecast_issuance_replaces_the_old():
+    """Forecast points are kept per issuance, not merged."""
+    series = StationSeries(1)
+    forecast = {
+        "issuedTime": "2026-03-01T00:00:00Z",
+        "data": [{"validTime": _iso(START + 3600 * h), "primary": 2.0} for h in range(3)],
+    }
+    assert series.ingest({"forecast": forecast}) == 3
+    # The same issuance polled again adds nothing
+    assert series.ingest({"forecast": forecast}) == 0
+
+    forecast = {**forecast, "issuedTime": "2026-03-01T06:00:00Z", "data": forecast["data"][:1]}
+    assert series.ingest({"forecast": forecast}) == 1
+    assert len(series.forecast) == 1
+
+
+def test_trend_attributes():
+    """A steady climb is rising; an unchanged reading is steady."""
+    series = StationSeries(1)
+    series.ingest(
+        {
+            "observed": {
+                "data": [
+                    {"validTime": _iso(START + 900 * step), "primary": 10.0 + step * 0.25}
+                    for step in range(5)
+                ]
+            }
+        }
+    )
+    assert series.trend_attributes("stage") == {"rate_of_rise": 1.0, "trend": "rising"}
+
+    flat = StationSeries(1)
+    flat.ingest(_observed([START + 900 * step for step in range(5)]))
+    assert flat.trend_attributes("flow") == {"rate_of_rise": 0.0, "trend": "steady"}
+    assert StationSeries(1).trend_attributes("stage") == {}